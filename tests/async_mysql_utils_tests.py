@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from utilbox.database_utils import SqliteUtils
+from utilbox.database_utils import AsyncMysqlUtils
+
+try:
+    import asyncio
+except ImportError:
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio = None
+
+try:
+    import concurrent.futures
+except ImportError:
+    asyncio = None
+
+
+@unittest.skipIf(asyncio is None, "asyncio (or trollius) and concurrent.futures are required")
+class AsyncMysqlUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.test_dir = tempfile.mkdtemp()
+
+        template = SqliteUtils(os.path.join(self.test_dir, "test.db"))
+        template.connect()
+        template.execute_statement("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT);")
+        template.disconnect()
+
+        self.loop = asyncio.new_event_loop()
+        self.db = AsyncMysqlUtils(template, pool_size=2, loop=self.loop, acquire_timeout_sec=0.1)
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        self.loop.run_until_complete(self.db.disconnect())
+        self.loop.close()
+
+        shutil.rmtree(self.test_dir)
+
+
+class AsyncMysqlUtilsTestMethodReturnValue(AsyncMysqlUtilsTest):
+    """
+    Class for testing return values of all methods against known values.
+    """
+
+    def test_run_query(self):
+        """
+        Test if queries run on the pooled connections.
+        """
+
+        self.assertTrue(self.loop.run_until_complete(self.db.connect()))
+        self.assertEqual(self.loop.run_until_complete(
+            self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (1, "name1"))), 1)
+        self.assertEqual(self.loop.run_until_complete(self.db.run_query("SELECT name FROM test_table;")), "name1")
+
+    def test_run_query_not_connected(self):
+        """
+        Test if a query fails at once when the pool has no connections.
+        """
+
+        with self.assertRaisesRegexp(RuntimeError, "empty"):
+            self.loop.run_until_complete(self.db.run_query("SELECT 1;"))
+
+    def test_run_query_timeout(self):
+        """
+        Test if a query fails after the timeout when every pooled connection is borrowed.
+        """
+
+        self.loop.run_until_complete(self.db.connect())
+
+        conn_list = [self.db.conn_pool.get(), self.db.conn_pool.get()]
+
+        with self.assertRaisesRegexp(RuntimeError, "within"):
+            self.db._call_pooled("run_query", ("SELECT 1;",))
+
+        for conn in conn_list:
+            self.db.conn_pool.put(conn)
+
+        self.assertEqual(self.db._call_pooled("run_query", ("SELECT 1;",)), "1")
+
+    def test_run_query_closed(self):
+        """
+        Test if a query fails once the pool is closed.
+        """
+
+        self.loop.run_until_complete(self.db.connect())
+        self.loop.run_until_complete(self.db.disconnect())
+
+        with self.assertRaisesRegexp(RuntimeError, "closed"):
+            self.db._call_pooled("run_query", ("SELECT 1;",))
+
+
+if __name__ == '__main__':
+    unittest.main()
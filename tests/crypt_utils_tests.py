@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import unittest
+from utilbox.crypt_utils import FileCipher
+from utilbox.crypt_utils import CipherContext
+from utilbox.crypt_utils import MerkleTree
+from utilbox.crypt_utils import CryptUtils
+
+
+class CryptUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, "plain.bin")
+        self.test_data = os.urandom(100000)
+        self.key = FileCipher.generate_key()
+
+        with open(self.test_file, "wb") as test_file:
+            test_file.write(self.test_data)
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        shutil.rmtree(self.test_dir)
+
+    def read_file(self, file_name):
+        with open(os.path.join(self.test_dir, file_name), "rb") as test_file:
+            return test_file.read()
+
+
+class FileCipherTestMethodReturnValue(CryptUtilsTest):
+    """
+    Class for testing return values of FileCipher methods against known values.
+    """
+
+    def test_round_trip(self):
+        """
+        Test if files decrypt to their original content, sequentially and on a thread pool.
+        """
+
+        for thread_count in [1, 3]:
+            encrypted_file = os.path.join(self.test_dir, "encrypted.bin")
+            decrypted_file = os.path.join(self.test_dir, "decrypted.bin")
+
+            self.assertTrue(CryptUtils.encrypt_file(self.test_file, encrypted_file, self.key, 4096, thread_count))
+            self.assertTrue(CryptUtils.decrypt_file(encrypted_file, decrypted_file, self.key, thread_count))
+            self.assertEqual(self.read_file("decrypted.bin"), self.test_data)
+
+    def test_tampering(self):
+        """
+        Test if modified and truncated files fail verification.
+        """
+
+        file_cipher = FileCipher(self.key, 4096)
+        encrypted_file = os.path.join(self.test_dir, "encrypted.bin")
+        decrypted_file = os.path.join(self.test_dir, "decrypted.bin")
+
+        self.assertTrue(file_cipher.encrypt_file(self.test_file, encrypted_file))
+        encrypted_data = self.read_file("encrypted.bin")
+
+        for tampered_data in [encrypted_data[:100] + chr(ord(encrypted_data[100]) ^ 1) + encrypted_data[101:],
+                              encrypted_data[:-(4096 + 16) - 1]]:
+            with open(encrypted_file, "wb") as test_file:
+                test_file.write(tampered_data)
+
+            self.assertFalse(file_cipher.decrypt_file(encrypted_file, decrypted_file))
+            self.assertFalse(os.path.exists(decrypted_file))
+
+
+class CipherContextTestMethodReturnValue(CryptUtilsTest):
+    """
+    Class for testing return values of CipherContext methods against known values.
+    """
+
+    def test_batch(self):
+        """
+        Test if batches of values decrypt to the original values in both output formats, and tampering is detected.
+        """
+
+        value_list = ["", "secret", u"caf\xe9", self.test_data[:1000]]
+
+        for output_format in ["base64", "binary"]:
+            cipher_context = CipherContext(self.key, output_format)
+            record_list = cipher_context.encrypt_batch(value_list)
+
+            self.assertNotEqual(record_list[1], cipher_context.encrypt("secret"))
+            self.assertEqual(cipher_context.decrypt_batch(record_list),
+                             ["", "secret", u"caf\xe9".encode("utf-8"), self.test_data[:1000]])
+
+        binary_record = CipherContext(self.key, "binary").encrypt("secret")
+
+        self.assertEqual(len(binary_record), len("secret") + 28)
+        self.assertFalse(CipherContext(self.key, "binary").decrypt(binary_record[:-1] + "x"))
+        self.assertFalse(CipherContext(FileCipher.generate_key(), "binary").decrypt(binary_record))
+
+
+class HashingTestMethodReturnValue(CryptUtilsTest):
+    """
+    Class for testing return values of CryptUtils hashing methods and MerkleTree against known values.
+    """
+
+    def test_hash_file(self):
+        """
+        Test if file hashes match hashes of the file content, with and without memory maps.
+        """
+
+        import hashlib
+
+        expected_digest = hashlib.sha256(self.test_data).hexdigest()
+
+        self.assertEqual(CryptUtils.hash_file(self.test_file), expected_digest)
+        self.assertEqual(CryptUtils.hash_file(self.test_file, use_mmap=False, block_size=4096), expected_digest)
+        self.assertEqual(CryptUtils.hash_files([self.test_file, self.test_file + ".missing"]),
+                         {self.test_file: expected_digest, self.test_file + ".missing": False})
+
+    def test_merkle_tree(self):
+        """
+        Test if changed chunks are located, and updating them gives the root hash of the changed file.
+        """
+
+        merkle_tree = CryptUtils.hash_file_tree(self.test_file, 4096)
+        changed_data = bytearray(self.test_data)
+        changed_data[5000] ^= 1
+        changed_data[99999] ^= 1
+
+        with open(self.test_file, "wb") as test_file:
+            test_file.write(changed_data)
+
+        changed_tree = MerkleTree.from_file(self.test_file, 4096, thread_count=1)
+
+        self.assertEqual(merkle_tree.verify_chunks(self.test_file), [1, 24])
+        self.assertEqual(merkle_tree.find_changed_chunks(changed_tree), [1, 24])
+        self.assertEqual(merkle_tree.update_chunks(self.test_file, [1, 24]), changed_tree.get_root_hash())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,290 @@
+import json
+import decimal
+import datetime
+import unittest
+import StringIO
+import collections
+from utilbox.json_utils import JsonUtils
+from utilbox.json_utils import JsonBackend
+from utilbox.json_utils import JsonSchemaDecoder
+from utilbox.json_utils import JsonStreamParser
+from utilbox.json_utils import JsonStreamWriter
+from utilbox.json_utils import JsonTypeRegistry
+
+
+class JsonUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.test_records = [{"id": record_id, "name": "record " + str(record_id)} for record_id in range(100)]
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        pass
+
+
+class JsonStreamWriterTestMethodReturnValue(JsonUtilsTest):
+    """
+    Class for testing return values of JsonStreamWriter methods against known values.
+    """
+
+    def test_write_array(self):
+        """
+        Test if records written through a small buffer form a valid JSON array.
+        """
+
+        output_file = StringIO.StringIO()
+
+        self.assertEqual(JsonUtils.write_json_stream(iter(self.test_records), output_file, buffer_size=64), 100)
+        self.assertEqual(json.loads(output_file.getvalue()), self.test_records)
+
+    def test_write_lines_compressed(self):
+        """
+        Test if records are written as gzip-compressed JSON Lines.
+        """
+
+        import gzip
+
+        output_file = StringIO.StringIO()
+
+        with JsonStreamWriter(output_file, output_format="lines", compress=True) as json_writer:
+            json_writer.write_all(self.test_records)
+
+        output_file.seek(0)
+        output_lines = gzip.GzipFile(fileobj=output_file).read().splitlines()
+
+        self.assertEqual([json.loads(output_line) for output_line in output_lines], self.test_records)
+
+
+    def test_write_aborted(self):
+        """
+        Test if an exception within the block leaves the array unterminated, and removes a file opened from a path.
+        """
+
+        import os
+        import shutil
+        import tempfile
+
+        output_file = StringIO.StringIO()
+
+        with self.assertRaises(KeyError):
+            with JsonStreamWriter(output_file) as json_writer:
+                json_writer.write_all(self.test_records[:5])
+                raise KeyError("id")
+
+        self.assertRaises(ValueError, json.loads, output_file.getvalue())
+        self.assertEqual(json.loads(output_file.getvalue() + "]"), self.test_records[:5])
+
+        test_dir = tempfile.mkdtemp()
+        output_path = os.path.join(test_dir, "export.json")
+
+        try:
+            with self.assertRaises(KeyError):
+                JsonUtils.write_json_stream(({"id": record["missing"]} for record in self.test_records), output_path)
+
+            self.assertFalse(os.path.exists(output_path))
+        finally:
+            shutil.rmtree(test_dir)
+
+
+class JsonStreamParserTestMethodReturnValue(JsonUtilsTest):
+    """
+    Class for testing return values of JsonStreamParser methods against known values.
+    """
+
+    def test_iterate_items(self):
+        """
+        Test if values are selected by path from a document read in very small chunks.
+        """
+
+        input_file = StringIO.StringIO(json.dumps({"count": 100, "items": self.test_records}))
+
+        json_parser = JsonStreamParser(input_file, chunk_size=7)
+
+        self.assertEqual(list(json_parser.iterate_items("items.*.id")), range(100))
+
+        input_file.seek(0)
+
+        self.assertEqual(list(json_parser.iterate_items("items.5")), [self.test_records[5]])
+
+    def test_iterate_lines(self):
+        """
+        Test if JSON Lines are decoded in batches, and if an invalid line is reported by number.
+        """
+
+        input_file = StringIO.StringIO("\n".join(json.dumps(record) for record in self.test_records))
+
+        self.assertEqual(list(JsonUtils.iterate_json_lines(input_file, batch_size=30)), self.test_records)
+
+        input_file = StringIO.StringIO('{"id": 0}\n\n{"id": }\n')
+
+        with self.assertRaisesRegexp(ValueError, "^Line 3"):
+            list(JsonUtils.iterate_json_lines(input_file))
+
+        input_file = StringIO.StringIO('[1\n2],3\n')
+
+        with self.assertRaisesRegexp(ValueError, "^Line 1"):
+            list(JsonUtils.iterate_json_lines(input_file))
+
+        input_file = StringIO.StringIO(' {"id": 0} \n{"id": 1} {"id": 2}\n')
+
+        with self.assertRaisesRegexp(ValueError, "^Line 2"):
+            list(JsonUtils.iterate_json_lines(input_file))
+
+
+class JsonBackendTestMethodReturnValue(JsonUtilsTest):
+    """
+    Class for testing return values of JsonBackend methods against known values.
+    """
+
+    def test_convert_to_json(self):
+        """
+        Test if the selected backend reproduces the standard library output, including non-string keys.
+        """
+
+        data_obj = {"records": self.test_records, 10: u"caf\u00e9", 2: None, True: [0.1, 2 ** 70]}
+
+        for sort_keys in (False, True):
+            for separators in (None, (",", ":")):
+                self.assertEqual(JsonUtils.convert_to_json(data_obj, sort_keys, separators),
+                                 json.dumps(data_obj, sort_keys=sort_keys, separators=separators))
+
+    def test_convert_from_json(self):
+        """
+        Test if decoding matches the standard library, and if invalid JSON raises ValueError.
+        """
+
+        json_text = json.dumps(self.test_records + [u"caf\u00e9", 2 ** 70, 1.0 / 3])
+
+        self.assertEqual(JsonUtils.convert_from_json(json_text), json.loads(json_text))
+        self.assertRaises(ValueError, JsonUtils.convert_from_json, '{"id": }')
+
+    def test_benchmark(self):
+        """
+        Test if the benchmark reports every installed backend for every payload.
+        """
+
+        result_list = JsonBackend.benchmark({"records": self.test_records}, min_duration=0.001)
+
+        self.assertTrue(all(result["ENCODE_MB_PER_SEC"] > 0 and result["DECODE_MB_PER_SEC"] > 0
+                            for result in result_list))
+        self.assertEqual(sorted(result["BACKEND"] for result in result_list),
+                         sorted(JsonBackend.get_available_backends()))
+
+
+class JsonTypeRegistryTestMethodReturnValue(JsonUtilsTest):
+    """
+    Class for testing return values of JsonTypeRegistry methods against known values.
+    """
+
+    def test_encode_row_types(self):
+        """
+        Test if namedtuple rows holding database types are encoded as objects.
+        """
+
+        row_type = collections.namedtuple("Row", ["id", "amount", "created", "tags", "blob"])
+        row_list = [row_type(1, decimal.Decimal("10.10"), datetime.datetime(2020, 1, 2, 3, 4, 5), set(["b", "a"]),
+                             "\xff\x00")]
+
+        self.assertEqual(json.loads(JsonUtils.convert_to_json(row_list)),
+                         [{"id": 1, "amount": "10.10", "created": "2020-01-02T03:04:05", "tags": ["a", "b"],
+                           "blob": "/wA="}])
+
+    def test_register(self):
+        """
+        Test if registered converters apply to subclasses, and if '__slots__' classes are encoded as objects.
+        """
+
+        class Point(object):
+            __slots__ = ("x", "y")
+
+            def __init__(self, x, y):
+                self.x = x
+                self.y = y
+
+        class LocalDate(datetime.date):
+            pass
+
+        type_registry = JsonTypeRegistry(decimal_format="float")
+        type_registry.register(datetime.date, lambda value: value.strftime("%d/%m/%Y"))
+        json_encoder = type_registry.get_encoder(sort_keys=True)
+
+        self.assertEqual(json_encoder.encode([Point(1, 2), LocalDate(2020, 1, 2), decimal.Decimal("1.5")]),
+                         '[{"x": 1, "y": 2}, "02/01/2020", 1.5]')
+        self.assertRaises(TypeError, json_encoder.encode, object())
+
+    def test_register_converter_error(self):
+        """
+        Test if an error raised within a converter is propagated, rather than reported as an unknown type.
+        """
+
+        type_registry = JsonTypeRegistry()
+        type_registry.register(complex, lambda value: {}["real"])
+
+        self.assertRaises(KeyError, type_registry.get_encoder().encode, [1j])
+
+
+class JsonSchemaDecoderTestMethodReturnValue(JsonUtilsTest):
+    """
+    Class for testing return values of JsonSchemaDecoder methods against known values.
+    """
+
+    def test_read_records(self):
+        """
+        Test if objects are decoded into slots records and namedtuples, with coercion and defaults.
+        """
+
+        field_list = [("id", int), ("name", str), ("price", float, 0.0)]
+        input_text = json.dumps({"records": self.test_records})
+
+        for record_format in ("slots", "tuple"):
+            record_list = JsonUtils.read_json_records(StringIO.StringIO(input_text), field_list, record_format,
+                                                      path="records.*")
+
+            self.assertEqual(len(record_list), 100)
+            self.assertEqual((record_list[5].id, record_list[5].name, record_list[5].price), (5, "record 5", 0.0))
+            self.assertIs(type(record_list[5].name), str)
+
+        self.assertRaisesRegexp(ValueError, "^Record 1, field 'id'", JsonSchemaDecoder(field_list).decode,
+                                '[{"id": 1, "name": "a"}, {"id": "x", "name": "b"}]')
+
+    def test_read_records_float_string(self):
+        """
+        Test if floats decoded into string fields keep all their significant digits.
+        """
+
+        record_list = JsonSchemaDecoder([("code", str), ("label", unicode)]).decode(
+            '[{"code": 1234567.891011121, "label": 0.1}]')
+
+        self.assertEqual((record_list[0].code, record_list[0].label), ("1234567.891011121", u"0.1"))
+
+    def test_read_columns(self):
+        """
+        Test if JSON Lines are decoded into typed arrays, and if a null value turns its column into a list.
+        """
+
+        input_file = StringIO.StringIO("\n".join(json.dumps(record) for record in self.test_records + [{"id": None}]))
+
+        column_map = JsonUtils.read_json_records(input_file, [("id", int, None), ("name", str, "")], "columns",
+                                                 "lines")
+
+        self.assertEqual(column_map.keys(), ["id", "name"])
+        self.assertEqual(column_map["id"], range(100) + [None])
+        self.assertEqual(column_map["name"][99:], ["record 99", ""])
+
+        column_map = JsonSchemaDecoder([("id", int)], "columns").decode_objects(self.test_records)
+
+        self.assertEqual(column_map["id"].typecode, "l")
+
+
+if __name__ == '__main__':
+    unittest.main()
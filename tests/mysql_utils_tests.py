@@ -0,0 +1,50 @@
+import unittest
+from utilbox.database_utils import MysqlUtils
+
+
+class MysqlUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        pass
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        pass
+
+
+class MysqlUtilsTestMethodReturnValue(MysqlUtilsTest):
+    """
+    Class for testing return values of all methods against known values.
+    """
+
+    def test_encode_tsv_row(self):
+        """
+        Test if values are encoded as a tab-separated line, with NULLs and special characters escaped.
+        """
+
+        self.assertEqual(MysqlUtils.encode_tsv_row([1, None, True, u"caf\xe9"]), "1\t\\N\t1\tcaf\xc3\xa9\n")
+        self.assertEqual(MysqlUtils.encode_tsv_row(["a\tb", "c\nd", "e\\f", "g\rh\0"]),
+                         "a\\tb\tc\\nd\te\\\\f\tg\\rh\\0\n")
+
+    def test_encode_tsv_row_float(self):
+        """
+        Test if floats are encoded without losing precision.
+        """
+
+        self.assertEqual(MysqlUtils.encode_tsv_row([0.1, 1234567.891011121, 1e-20]),
+                         "0.1\t1234567.891011121\t1e-20\n")
+        self.assertEqual(float(MysqlUtils.encode_tsv_row([2.0 / 3]).rstrip("\n")), 2.0 / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
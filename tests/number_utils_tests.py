@@ -0,0 +1,66 @@
+import random
+import unittest
+from utilbox.number_utils import GapFinder
+from utilbox.number_utils import NumberUtils
+
+
+class NumberUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.test_numbers = [number for number in range(1, 1001) if number % 100 not in (10, 11, 12)]
+        self.test_gaps = [(number, number + 2) for number in range(10, 1001, 100)]
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        pass
+
+
+class GapFinderTestMethodReturnValue(NumberUtilsTest):
+    """
+    Class for testing return values of GapFinder methods against known values.
+    """
+
+    def test_find_gaps(self):
+        """
+        Test if gaps are found as ranges in sorted, dense unsorted and sparse unsorted sequences.
+        """
+
+        shuffled_numbers = list(self.test_numbers)
+        random.shuffle(shuffled_numbers)
+
+        self.assertEqual(GapFinder.find_gaps(self.test_numbers), self.test_gaps)
+        self.assertEqual(GapFinder.find_gaps(shuffled_numbers), self.test_gaps)
+        self.assertEqual(GapFinder.find_gaps([10 ** 12, 5, 10 ** 9]), [(6, 10 ** 9 - 1), (10 ** 9 + 1, 10 ** 12 - 1)])
+        self.assertEqual(GapFinder.find_gaps(shuffled_numbers, start=-1, end=1005),
+                         [(-1, 0)] + self.test_gaps + [(1001, 1005)])
+
+    def test_iterate_gaps(self):
+        """
+        Test if a sorted stream is scanned in one pass, and if an unsorted stream raises ValueError.
+        """
+
+        self.assertEqual(list(GapFinder.iterate_gaps(iter(self.test_numbers), end=150)), self.test_gaps[:2])
+        self.assertEqual(GapFinder.count_missing(self.test_gaps), 30)
+        self.assertRaises(ValueError, list, GapFinder.iterate_gaps(iter([1, 3, 2])))
+
+    def test_get_missing_numbers(self):
+        """
+        Test if NumberUtils returns the missing numbers of an unsorted list of numeric strings.
+        """
+
+        self.assertEqual(NumberUtils.get_missing_numbers(["6", 1, "4"]), [2, 3, 5])
+        self.assertEqual(NumberUtils.get_missing_ranges([6, 1, 4]), [(2, 3), (5, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+from utilbox.database_utils import SqliteUtils
+from utilbox.database_utils import QueryInstrument
+
+
+class QueryInstrumentTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.test_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.test_dir, "slow_query.log")
+
+        self.db = SqliteUtils(":memory:")
+        self.db.connect()
+        self.db.execute_statement("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT);")
+
+        self.instrument = QueryInstrument(slow_query_threshold_ms=0, slow_query_log_path=self.log_path)
+        self.db.set_instrument(self.instrument)
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        self.db.disconnect()
+
+        shutil.rmtree(self.test_dir)
+
+
+class QueryInstrumentTestMethodReturnValue(QueryInstrumentTest):
+    """
+    Class for testing return values of all methods against known values.
+    """
+
+    def test_fingerprint(self):
+        """
+        Test if literals, comments and whitespace are normalized, and value lists collapsed.
+        """
+
+        self.assertEqual(QueryInstrument.fingerprint("SELECT * FROM users WHERE id IN (1, 2, 3) AND name='bob';"),
+                         "select * from users where id in (?+) and name=?")
+        self.assertEqual(QueryInstrument.fingerprint("SELECT  *\n FROM users /* hint */ WHERE id = 42 -- test"),
+                         "select * from users where id = ?")
+
+    def test_fingerprint_placeholders(self):
+        """
+        Test if parameterized queries share one fingerprint regardless of list length or row count.
+        """
+
+        self.assertEqual(QueryInstrument.fingerprint("SELECT * FROM users WHERE id IN (%s);"),
+                         QueryInstrument.fingerprint("SELECT * FROM users WHERE id IN (%s, %s, %s);"))
+        self.assertEqual(QueryInstrument.fingerprint("INSERT INTO users (id, name) VALUES (%s, %s), (%s, %s);"),
+                         "insert into users (id, name) values (?+)")
+        self.assertEqual(QueryInstrument.fingerprint("INSERT INTO users VALUES (?, ?), (?, ?), (?, ?);"),
+                         QueryInstrument.fingerprint("INSERT INTO users VALUES (?, ?);"))
+        self.assertEqual(QueryInstrument.fingerprint("SELECT id FROM users WHERE (id) IN (VALUES (?), (?));"),
+                         "select id from users where (id) in (values (?))")
+
+    def test_get_stats(self):
+        """
+        Test if executions of one fingerprint are counted together, with their rows and latency histogram.
+        """
+
+        for row_id in range(1, 4):
+            self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (row_id, "name" + str(row_id)))
+
+        stats_list = self.instrument.get_stats()
+
+        self.assertEqual(len(stats_list), 1)
+        self.assertEqual(stats_list[0]["FINGERPRINT"], "insert into test_table values (?+)")
+        self.assertEqual((stats_list[0]["COUNT"], stats_list[0]["ROWS"]), (3, 3))
+        self.assertEqual([bound for bound, count in stats_list[0]["HISTOGRAM"]][-2:], [10000, None])
+        self.assertEqual(sum([count for bound, count in stats_list[0]["HISTOGRAM"]]), 3)
+        self.assertTrue(stats_list[0]["MAX_MS"] >= stats_list[0]["AVG_MS"] >= 0)
+
+    def test_get_stats_error(self):
+        """
+        Test if a failing query is counted, with its latency, as an error.
+        """
+
+        self.assertFalse(self.db.fetch_row_count("SELECT * FROM missing_table;"))
+
+        stats_list = self.instrument.get_stats()
+
+        self.assertEqual((stats_list[0]["COUNT"], stats_list[0]["ERRORS"], stats_list[0]["ROWS"]), (1, 1, 0))
+        self.assertEqual(sum([count for bound, count in stats_list[0]["HISTOGRAM"]]), 1)
+
+    def test_slow_query_log(self):
+        """
+        Test if every query at or above the threshold is written to the slow-query log.
+        """
+
+        self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (1, "name1"))
+        self.db.fetch_row_count("SELECT   *\nFROM test_table;")
+
+        with open(self.log_path, "r") as log_file:
+            log_lines = log_file.read().splitlines()
+
+        self.assertEqual(len(log_lines), 2)
+        self.assertTrue(log_lines[0].endswith(" ms : 1 rows : INSERT INTO test_table VALUES (?, ?);"))
+        self.assertTrue(log_lines[1].endswith(" rows : SELECT * FROM test_table;"))
+        self.assertEqual(len(self.instrument.slow_queries), 2)
+
+    def test_reset(self):
+        """
+        Test if resetting discards statistics and slow queries.
+        """
+
+        self.db.fetch_row_count("SELECT * FROM test_table;")
+        self.instrument.reset()
+
+        self.assertEqual(self.instrument.get_stats(), [])
+        self.assertEqual(len(self.instrument.slow_queries), 0)
+
+        self.db.fetch_row_count("SELECT * FROM test_table;")
+
+        self.assertEqual(self.instrument.get_stats()[0]["COUNT"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from utilbox.database_utils import ReplicaRouter
+
+
+class StubMysqlUtils:
+    """
+    Stand-in for MysqlUtils, answering queries from preset values instead of a MySQL server.
+    """
+
+    def __init__(self, query_res="1", lag_sec=0, query_error=None):
+        self.conn_obj = object()
+        self.transaction_depth = 0
+        self.batch_open = False
+        self.last_error = None
+
+        self.query_res = query_res
+        self.lag_sec = lag_sec
+        self.query_error = query_error
+        self.query_list = []
+
+    def connect(self):
+        return True
+
+    def disconnect(self):
+        return True
+
+    def run_query(self, query_string):
+        self.query_list.append(query_string)
+
+        if self.query_error is not None:
+            self.last_error = self.query_error
+            return False
+
+        self.last_error = None
+
+        return self.query_res
+
+    def fetch_row_by_query(self, query_string):
+        self.last_error = None
+
+        return {"Seconds_Behind_Master": self.lag_sec}
+
+
+class ReplicaRouterTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.primary = StubMysqlUtils(query_res="primary")
+        self.replica = StubMysqlUtils(query_res="replica")
+        self.router = ReplicaRouter(self.primary, [self.replica], max_replica_lag_sec=30)
+        self.router.connect()
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        self.router.disconnect()
+
+
+class ReplicaRouterTestMethodReturnValue(ReplicaRouterTest):
+    """
+    Class for testing return values of all methods against known values.
+    """
+
+    def test_run_query_on_replica(self):
+        """
+        Test if a read is run on the healthy replica.
+        """
+
+        self.assertEqual(self.router.run_query("SELECT 1;"), "replica")
+        self.assertEqual(self.router.get_replica_health()[0]["QUERIES"], 1)
+
+    def test_run_query_empty_result(self):
+        """
+        Test if a read returning no rows keeps the replica in rotation, without rerunning it on the primary.
+        """
+
+        self.replica.query_res = False
+
+        self.assertFalse(self.router.run_query("SELECT name FROM test_table WHERE id=0;"))
+        self.assertEqual(self.primary.query_list, [])
+
+        replica_health = self.router.get_replica_health()[0]
+        self.assertTrue(replica_health["HEALTHY"])
+        self.assertEqual(replica_health["ERRORS"], 0)
+
+    def test_run_query_error(self):
+        """
+        Test if a failing read is rerun on the primary and drops the replica from rotation.
+        """
+
+        self.replica.query_error = Exception("Lost connection to MySQL server during query")
+
+        self.assertEqual(self.router.run_query("SELECT 1;"), "primary")
+
+        replica_health = self.router.get_replica_health()[0]
+        self.assertFalse(replica_health["HEALTHY"])
+        self.assertEqual(replica_health["ERRORS"], 1)
+
+        self.assertEqual(self.router.run_query("SELECT 1;"), "primary")
+        self.assertEqual(len(self.replica.query_list), 1)
+
+    def test_run_query_lagging_replica(self):
+        """
+        Test if reads are sent to the primary while the replica lags beyond the allowed delay.
+        """
+
+        self.replica.lag_sec = 120
+
+        self.assertEqual(self.router.check_replica_health(), 0)
+        self.assertEqual(self.router.run_query("SELECT 1;"), "primary")
+        self.assertEqual(self.replica.query_list, [])
+
+        self.replica.lag_sec = 5
+
+        self.assertEqual(self.router.check_replica_health(), 1)
+        self.assertEqual(self.router.run_query("SELECT 1;"), "replica")
+
+    def test_run_query_write(self):
+        """
+        Test if a locking read is run on the primary.
+        """
+
+        self.assertEqual(self.router.run_query("SELECT id FROM test_table FOR UPDATE;"), "primary")
+        self.assertEqual(self.replica.query_list, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
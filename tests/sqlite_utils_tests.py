@@ -0,0 +1,250 @@
+import types
+import unittest
+from utilbox.database_utils import SqlUtils
+from utilbox.database_utils import SqliteUtils
+
+
+class SqliteUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.db = SqliteUtils(":memory:")
+        self.db.connect()
+        self.db.execute_statement("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT);")
+
+        for row_id in range(1, 11):
+            self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (row_id, "name" + str(row_id)))
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        self.db.disconnect()
+
+
+class SqliteUtilsTestMethodReturnType(SqliteUtilsTest):
+    """
+    Class for testing return types of all methods.
+    """
+
+    def test_fetch_row_by_query(self):
+        """
+        Test if returned value is a dictionary.
+        """
+
+        self.assertIsInstance(self.db.fetch_row_by_query("SELECT * FROM test_table WHERE id=1;"),
+                              types.DictType)
+
+
+class SqliteUtilsTestMethodReturnValue(SqliteUtilsTest):
+    """
+    Class for testing return values of all methods against known values.
+    """
+
+    def test_fetch_row_count(self):
+        """
+        Test if all inserted rows are counted.
+        """
+
+        self.assertEqual(self.db.fetch_row_count("SELECT * FROM test_table;"), 10)
+
+    def test_run_query_last_error(self):
+        """
+        Test if a failing query records its error, while a query returning no rows does not.
+        """
+
+        self.assertFalse(self.db.run_query("SELECT name FROM test_table WHERE id=0;"))
+        self.assertIsNone(self.db.last_error)
+
+        self.assertFalse(self.db.run_query("SELECT name FROM missing_table;"))
+        self.assertIsNotNone(self.db.last_error)
+
+    def test_execute_statement_mysql_placeholders(self):
+        """
+        Test if a query written for MysqlUtils, with '%s' placeholders, runs unchanged.
+        """
+
+        query_string = "UPDATE test_table SET name=%s WHERE id IN (%s, %s) AND name NOT LIKE 'x%%';"
+
+        self.assertEqual(self.db.execute_statement(query_string, ("renamed", 1, 2)), 2)
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table WHERE name='renamed';"), "2")
+
+        self.assertEqual(SqlUtils.render_placeholders(query_string, "mysql"), query_string)
+        self.assertEqual(SqlUtils.render_placeholders(query_string, "sqlite"),
+                         "UPDATE test_table SET name=? WHERE id IN (?, ?) AND name NOT LIKE 'x%';")
+
+    def test_transaction_rollback(self):
+        """
+        Test if an error within a transaction discards its changes.
+        """
+
+        try:
+            with self.db.transaction():
+                self.db.execute_statement("DELETE FROM test_table WHERE id=5;")
+                self.db.execute_statement("INSERT INTO test_table VALUES (1, 'duplicate');")
+        except Exception:
+            pass
+
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "10")
+
+    def test_nested_transaction_rollback(self):
+        """
+        Test if an error within a nested transaction only discards the changes of the nested block.
+        """
+
+        with self.db.transaction():
+            self.db.execute_statement("DELETE FROM test_table WHERE id=1;")
+
+            try:
+                with self.db.transaction():
+                    self.db.execute_statement("DELETE FROM test_table WHERE id=2;")
+                    self.db.execute_statement("INSERT INTO test_table VALUES (3, 'duplicate');")
+            except Exception:
+                pass
+
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "9")
+
+    def test_batch_commit(self):
+        """
+        Test if all statements of a batch are committed, across several batch commits.
+        """
+
+        with self.db.batch(max_statements=3):
+            for row_id in range(11, 21):
+                self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (row_id, "name"))
+
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "20")
+
+    def test_batch_nested_transaction(self):
+        """
+        Test if the batch limit is checked when a transaction nested within the batch exits.
+        """
+
+        with self.db.batch(max_statements=3):
+            with self.db.transaction():
+                for row_id in range(11, 16):
+                    self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (row_id, "name"))
+
+                self.assertEqual(self.db.batch_pending, 5)
+
+            self.assertEqual(self.db.batch_pending, 0)
+
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "15")
+
+    def test_batch_rollback(self):
+        """
+        Test if an error within a batch only discards the statements not yet committed.
+        """
+
+        try:
+            with self.db.batch(max_statements=3):
+                for row_id in range(11, 16):
+                    self.db.execute_statement("INSERT INTO test_table VALUES (?, ?);", (row_id, "name"))
+
+                self.db.execute_statement("INSERT INTO test_table VALUES (1, 'duplicate');")
+        except Exception:
+            pass
+
+        self.assertFalse(self.db.batch_open)
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "13")
+
+    def test_savepoint(self):
+        """
+        Test if rolling back to a savepoint only discards the changes made after it.
+        """
+
+        self.assertTrue(self.db.begin_transaction())
+        self.db.execute_statement("DELETE FROM test_table WHERE id=1;")
+        self.assertTrue(self.db.create_savepoint("before_delete"))
+        self.db.execute_statement("DELETE FROM test_table WHERE id=2;")
+        self.assertTrue(self.db.rollback_to_savepoint("before_delete"))
+        self.assertTrue(self.db.release_savepoint("before_delete"))
+        self.assertTrue(self.db.commit_transaction())
+
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "9")
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table WHERE id=2;"), "1")
+
+    def test_iterate_table_chunks(self):
+        """
+        Test if keyset pagination returns every row exactly once, in key order.
+        """
+
+        key_list = []
+
+        for row_list in self.db.iterate_table_chunks("test_table", "id", chunk_size=3):
+            key_list.extend([row["id"] for row in row_list])
+
+        self.assertEqual(key_list, range(1, 11))
+
+    def test_export_table(self):
+        """
+        Test if the CSV header follows the order of the selected columns.
+        """
+
+        import os
+        import shutil
+        import tempfile
+
+        test_dir = tempfile.mkdtemp()
+        output_path = os.path.join(test_dir, "export.csv")
+
+        try:
+            self.assertEqual(self.db.export_table("test_table", "id", output_path, chunk_size=3), 10)
+
+            with open(output_path, "rb") as output_file:
+                self.assertEqual(output_file.read().splitlines()[:2], ["id,name", "1,name1"])
+
+            self.assertEqual(self.db.export_table("test_table", "id", output_path, column_list=["name", "id"]), 10)
+
+            with open(output_path, "rb") as output_file:
+                self.assertEqual(output_file.read().splitlines()[:2], ["name,id", "name1,1"])
+
+            self.assertRaises(ValueError, self.db.export_table_parallel, "test_table", "id", output_path,
+                              range_count=0)
+
+            self.db.execute_statement("DELETE FROM test_table;")
+
+            self.assertEqual(SqlUtils.build_key_range_query("test_table", "id"),
+                             "SELECT MIN(id), MAX(id) FROM test_table;")
+            self.assertEqual(self.db.export_table_parallel("test_table", "id", output_path), [])
+            self.assertRaises(ValueError, self.db.export_table, "test_table", "id", output_path, output_format="xml")
+            self.assertRaises(ValueError, self.db.export_table_parallel, "test_table", "id", output_path,
+                              output_format="xml")
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_upsert_rows(self):
+        """
+        Test if existing rows are updated and new rows are inserted, with matching counts.
+        """
+
+        row_list = [{"id": row_id, "name": "updated"} for row_id in range(6, 16)]
+
+        self.assertEqual(self.db.upsert_rows("test_table", row_list, ["id"], chunk_size=4),
+                         {"ROWS": 10, "INSERTED": 5, "UPDATED": 5, "UNCHANGED": 0})
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table WHERE name='updated';"), "10")
+
+    def test_upsert_rows_large_chunk(self):
+        """
+        Test if chunks binding more parameters than SQLite allows are written, and if keys repeated within a
+        chunk are counted once as inserted.
+        """
+
+        row_list = [{"id": row_id, "name": "upserted"} for row_id in range(1, 1001)]
+        row_list.extend([{"id": 1, "name": "repeated"}, {"id": 2000, "name": "new"}, {"id": 2000, "name": "new"}])
+
+        self.assertEqual(self.db.upsert_rows("test_table", row_list, ["id"], chunk_size=2000),
+                         {"ROWS": 1003, "INSERTED": 991, "UPDATED": 12, "UNCHANGED": 0})
+        self.assertEqual(self.db.run_query("SELECT COUNT(*) FROM test_table;"), "1001")
+        self.assertEqual(self.db.run_query("SELECT name FROM test_table WHERE id=1;"), "repeated")
+
+
+if __name__ == '__main__':
+    unittest.main()
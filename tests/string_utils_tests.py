@@ -0,0 +1,282 @@
+import unittest
+import StringIO
+from utilbox.string_utils import LineIndex
+from utilbox.string_utils import LineEditor
+from utilbox.string_utils import StringUtils
+from utilbox.string_utils import KeywordMatcher
+from utilbox.string_utils import TextSanitizer
+from utilbox.string_utils import FileGrep
+from utilbox.string_utils import TextDiff
+from utilbox.string_utils import LookupIndex
+from utilbox.string_utils import TextPipeline
+
+
+class StringUtilsTest(unittest.TestCase):
+    """
+    Base class for all tests, which defined common 'setUp' and 'tearDown' methods.
+    """
+
+    def setUp(self):
+        """
+        Prepare environment to run automated tests.
+        """
+
+        self.test_text = "first line\nsecond line\n\nfourth line\n"
+
+    def tearDown(self):
+        """
+        Restore environment to pre-test conditions.
+        """
+
+        pass
+
+
+class LineIndexTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of LineIndex methods against known values.
+    """
+
+    def test_get_line(self):
+        """
+        Test if every line matches the result of splitting the text.
+        """
+
+        line_index = LineIndex(self.test_text)
+        text_lines = self.test_text.split("\n")
+
+        self.assertEqual(line_index.get_line_count(), len(text_lines))
+        self.assertEqual([line_index.get_line(line_number) for line_number in range(1, len(text_lines) + 1)],
+                         text_lines)
+
+    def test_get_lines(self):
+        """
+        Test if a range of lines is extracted inclusive of both ends.
+        """
+
+        self.assertEqual(LineIndex(self.test_text).get_lines(2, 4), ["second line", "", "fourth line"])
+
+    def test_get_line_number(self):
+        """
+        Test if offsets are mapped to the lines containing them, newline characters included.
+        """
+
+        line_index = LineIndex(self.test_text)
+
+        self.assertEqual(line_index.get_line_number(0), 1)
+        self.assertEqual(line_index.get_line_number(10), 1)
+        self.assertEqual(line_index.get_line_number(11), 2)
+        self.assertEqual(line_index.get_line_number(len(self.test_text)), 5)
+
+
+class LineEditorTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of LineEditor methods against known values.
+    """
+
+    def test_apply(self):
+        """
+        Test if all selections refer to the line numbers of the original text.
+        """
+
+        line_editor = LineEditor().delete_lines([1]).delete_range(3, 3).replace_line(4, "last line")
+
+        self.assertEqual(line_editor.apply(self.test_text), "second line\nlast line\n")
+
+    def test_apply_relative(self):
+        """
+        Test if negative line numbers count back from the last line.
+        """
+
+        self.assertEqual(LineEditor().delete_range(-3, -1).apply(self.test_text), "first line\nsecond line")
+
+
+class KeywordMatcherTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of KeywordMatcher methods against known values.
+    """
+
+    def test_find_all(self):
+        """
+        Test if overlapping keywords and keywords contained within others are all found.
+        """
+
+        keyword_matcher = KeywordMatcher(["he", "she", "hers"])
+
+        self.assertEqual(list(keyword_matcher.find_all("ushers")), [(1, "she"), (2, "he"), (2, "hers")])
+
+    def test_find_in_lines(self):
+        """
+        Test if matches are reported with their line numbers, regardless of case.
+        """
+
+        keyword_matcher = KeywordMatcher(["LINE", "fourth"], ignore_case=True)
+
+        self.assertEqual(list(keyword_matcher.find_in_lines(self.test_text)),
+                         [(1, "LINE"), (2, "LINE"), (4, "fourth"), (4, "LINE")])
+
+
+class TextSanitizerTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of TextSanitizer methods against known values.
+    """
+
+    def test_sanitize(self):
+        """
+        Test if control characters are removed, newlines replaced and whitespace collapsed.
+        """
+
+        text_sanitizer = TextSanitizer(newline_mode="space", normalize_whitespace=True)
+
+        self.assertEqual(text_sanitizer.sanitize("a\x00 \tb\nc"), "a b c")
+        self.assertEqual(text_sanitizer.sanitize_batch([u"a\x85b", "c  d"]), [u"ab", "c d"])
+
+    def test_sanitize_stream(self):
+        """
+        Test if multi-byte characters and runs of spaces split between chunks are handled.
+        """
+
+        text_sanitizer = TextSanitizer(normalize_whitespace=True)
+
+        output_file = StringIO.StringIO()
+
+        self.assertEqual(text_sanitizer.sanitize_stream(StringIO.StringIO(u"caf\xe9  au lait".encode("utf-8")),
+                                                        output_file, chunk_size=1, encoding="utf-8"), 12)
+        self.assertEqual(output_file.getvalue().decode("utf-8"), u"caf\xe9 au lait")
+
+
+class FileGrepTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of FileGrep methods against known values.
+    """
+
+    def test_search_tree(self):
+        """
+        Test if matching lines of all files in a tree are found, with their line numbers.
+        """
+
+        import os
+        import shutil
+        import tempfile
+
+        test_dir = tempfile.mkdtemp()
+
+        try:
+            os.makedirs(os.path.join(test_dir, "sub"))
+
+            for file_path in [os.path.join(test_dir, "a.log"), os.path.join(test_dir, "sub", "b.log")]:
+                with open(file_path, "w") as test_file:
+                    test_file.write(self.test_text)
+
+            file_grep = FileGrep(r"^\w+ line$")
+
+            self.assertEqual(file_grep.literal, " line")
+            self.assertEqual([(os.path.basename(file_path), line_number, line)
+                              for file_path, line_number, line in file_grep.search_tree(test_dir, process_count=1)],
+                             [("a.log", 1, "first line"), ("a.log", 2, "second line"), ("a.log", 4, "fourth line"),
+                              ("b.log", 1, "first line"), ("b.log", 2, "second line"), ("b.log", 4, "fourth line")])
+        finally:
+            shutil.rmtree(test_dir)
+
+
+    def test_search_file_inline_flag(self):
+        """
+        Test if a pattern setting the inline ignore-case flag has no literal prefilter, and matches in any case.
+        """
+
+        import os
+        import tempfile
+
+        file_handle, file_path = tempfile.mkstemp()
+
+        try:
+            os.write(file_handle, "INFO started\nERROR timeout\n")
+            os.close(file_handle)
+
+            file_grep = FileGrep(r"(?i)error")
+
+            self.assertIsNone(file_grep.literal)
+            self.assertEqual([(line_number, line) for _, line_number, line in file_grep.search_file(file_path)],
+                             [(2, "ERROR timeout")])
+        finally:
+            os.remove(file_path)
+
+
+class TextDiffTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of TextDiff methods against known values.
+    """
+
+    def test_get_unified_diff(self):
+        """
+        Test if both algorithms produce the expected unified diff.
+        """
+
+        for algorithm in ["patience", "myers"]:
+            text_diff = TextDiff.from_texts(self.test_text, "first line\nthird line\n\nfourth line\nfifth line\n",
+                                            algorithm)
+
+            self.assertEqual(text_diff.get_unified_diff(context_size=1),
+                             "--- old\n+++ new\n@@ -1,5 +1,6 @@\n first line\n-second line\n+third line\n \n"
+                             " fourth line\n+fifth line\n ")
+
+
+class LookupIndexTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of LookupIndex methods against known values.
+    """
+
+    def test_lookup(self):
+        """
+        Test if names are found regardless of case, by prefix and by similarity.
+        """
+
+        lookup_index = LookupIndex(["India", "Indonesia", "Iceland", "INDIA"])
+
+        self.assertTrue(lookup_index.contains_ignore_case(" india"))
+        self.assertEqual(lookup_index.get_matches_ignore_case("india"), ["India", "INDIA"])
+        self.assertEqual(lookup_index.find_prefix("ind"), ["India", "INDIA", "Indonesia"])
+        self.assertEqual(lookup_index.suggest("Icelnad", threshold=0.4), "Iceland")
+
+
+class TextPipelineTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of TextPipeline methods against known values.
+    """
+
+    def test_write_to(self):
+        """
+        Test if all stages are applied in a single pass, writing to a file object.
+        """
+
+        import StringIO
+
+        output_file = StringIO.StringIO()
+        text_pipeline = TextPipeline.from_text("\n \n" + self.test_text + "\n")
+
+        self.assertEqual(text_pipeline.strip_blank_edges().sanitize().drop_lines([2]).write_to(output_file), 3)
+        self.assertEqual(output_file.getvalue(), "first line\n\nfourth line\n")
+
+
+class StringUtilsTestMethodReturnValue(StringUtilsTest):
+    """
+    Class for testing return values of StringUtils methods against known values.
+    """
+
+    def test_remove_lines_list(self):
+        """
+        Test if the indexed lines are removed, rather than the first equal lines or shifted indices.
+        """
+
+        self.assertEqual(StringUtils.remove_lines_list("a\nb\na\nc", [0, 2]), "b\nc")
+
+    def test_remove_lines(self):
+        """
+        Test if lines are removed from the beginning for positive counts and from the end for negative counts.
+        """
+
+        self.assertEqual(StringUtils.remove_lines("a\nb\nc", 2), "c")
+        self.assertEqual(StringUtils.remove_lines("a\nb\nc", -2), "a")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,9 @@
+from file_cipher import FileCipher
+from cipher_context import CipherContext
+from merkle_tree import MerkleTree
 from crypt_utils import CryptUtils
 
-__all__ = ["CryptUtils"]
+__all__ = ["FileCipher",
+           "CipherContext",
+           "MerkleTree",
+           "CryptUtils"]
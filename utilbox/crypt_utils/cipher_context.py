@@ -0,0 +1,197 @@
+"""
+Utility module to encrypt and decrypt many small values with a single key.
+"""
+
+import os
+import hmac
+import base64
+import struct
+import hashlib
+import binascii
+
+from Crypto.Cipher import AES
+from Crypto.Util.strxor import strxor
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# length of the random nonce starting every record
+NONCE_SIZE = 12
+
+# length of the truncated HMAC-SHA256 tag ending every record
+TAG_SIZE = 16
+
+
+class CipherContext:
+    """
+    Utility class holding a key and its derived ciphers, to encrypt and decrypt records such as database fields.
+
+    Each record is encrypted with AES-256 in CTR mode under its own random nonce and authenticated with
+    HMAC-SHA256, so equal values give different records and modified records are rejected.
+
+    The encryption and authentication keys are derived from the caller's key once, when the context is
+    created, and a single AES key schedule and keyed HMAC state are reused for every record. The CTR keystream
+    of a whole batch is produced by one block cipher call over the counter blocks of all its records.
+
+    A record is the nonce, the ciphertext and the tag: 28 bytes more than the value, with no padding. Records
+    are returned as Base64 strings, or as raw bytes with the 'binary' output format.
+
+    Example:
+        cipher_context = CipherContext(key)
+        encrypted_list = cipher_context.encrypt_batch(["4111111111111111", "5500000000000004"])
+        decrypted_list = cipher_context.decrypt_batch(encrypted_list)
+    """
+
+    def __init__(self, key, output_format="base64"):
+        """
+        :param key: The 32-byte key.
+        :param output_format: The record format, either 'base64' or 'binary'.
+        """
+
+        if len(key) != 32:
+            raise ValueError("Key must be 32 bytes long.")
+
+        if output_format not in ("base64", "binary"):
+            raise ValueError("Unsupported output format: " + str(output_format))
+
+        self.output_format = output_format
+        self.block_cipher = AES.new(hmac.new(key, "record encryption", hashlib.sha256).digest(), AES.MODE_ECB)
+        self.mac_template = hmac.new(hmac.new(key, "record authentication", hashlib.sha256).digest(),
+                                     digestmod=hashlib.sha256)
+
+    def encrypt(self, value):
+        """
+        Encrypts a single value.
+
+        :param value: The value to be encrypted. Unicode values are encoded as UTF-8.
+
+        :return: The encrypted record.
+        :rtype: str
+        """
+
+        return self.encrypt_batch([value])[0]
+
+    def decrypt(self, record):
+        """
+        Verifies and decrypts a single record.
+
+        :param record: The encrypted record, in the output format of the context.
+
+        :return: The decrypted value, False if the record is malformed or not authentic.
+        :rtype: str
+        """
+
+        return self.decrypt_batch([record])[0]
+
+    def encrypt_batch(self, value_list):
+        """
+        Encrypts a list of values, drawing the random nonces of all values at once.
+
+        :param value_list: The values to be encrypted.
+
+        :return: List of the encrypted records, in the same order.
+        :rtype: list
+        """
+
+        value_list = [value.encode("utf-8") if isinstance(value, unicode) else value for value in value_list]
+        nonce_block = os.urandom(NONCE_SIZE * len(value_list))
+        nonce_list = [nonce_block[i:i + NONCE_SIZE] for i in xrange(0, len(nonce_block), NONCE_SIZE)]
+        encoded = self.output_format == "base64"
+        record_list = []
+
+        for nonce, encrypted_value in zip(nonce_list, self._apply_keystream(nonce_list, value_list)):
+            record = nonce + encrypted_value
+
+            record_mac = self.mac_template.copy()
+            record_mac.update(record)
+            record += record_mac.digest()[:TAG_SIZE]
+
+            record_list.append(base64.b64encode(record) if encoded else record)
+
+        return record_list
+
+    def decrypt_batch(self, record_list):
+        """
+        Verifies and decrypts a list of records.
+
+        :param record_list: The encrypted records.
+
+        :return: List of the decrypted values, in the same order, with False for records which are malformed or
+                 not authentic.
+        :rtype: list
+        """
+
+        # positions, nonces and ciphertexts of the authentic records
+        position_list = []
+        nonce_list = []
+        encrypted_value_list = []
+
+        for position, record in enumerate(record_list):
+            record = self._verify_record(record)
+
+            if record is not False:
+                position_list.append(position)
+                nonce_list.append(record[:NONCE_SIZE])
+                encrypted_value_list.append(record[NONCE_SIZE:-TAG_SIZE])
+
+        value_list = [False] * len(record_list)
+
+        for position, value in zip(position_list, self._apply_keystream(nonce_list, encrypted_value_list)):
+            value_list[position] = value
+
+        return value_list
+
+    def _verify_record(self, record):
+        """
+        Decodes a record and verifies its tag.
+
+        :return: The raw record, False if the record is malformed or not authentic.
+        :rtype: str
+        """
+
+        if self.output_format == "base64":
+            try:
+                record = base64.b64decode(record)
+            except (TypeError, binascii.Error):
+                return False
+
+        if len(record) < NONCE_SIZE + TAG_SIZE:
+            return False
+
+        record_mac = self.mac_template.copy()
+        record_mac.update(record[:-TAG_SIZE])
+
+        if not hmac.compare_digest(record_mac.digest()[:TAG_SIZE], record[-TAG_SIZE:]):
+            return False
+
+        return record
+
+    def _apply_keystream(self, nonce_list, data_list):
+        """
+        Encrypts or decrypts values in CTR mode, each under its nonce, with a single block cipher call.
+
+        The counter blocks of a value are its nonce followed by a 32-bit big-endian block counter from 0.
+
+        :return: List of the transformed values, in the same order.
+        :rtype: list
+        """
+
+        counter_block_list = []
+
+        for nonce, data in zip(nonce_list, data_list):
+            counter_block_list.extend([nonce + struct.pack(">I", block_index)
+                                       for block_index in xrange((len(data) + 15) // 16)])
+
+        keystream = self.block_cipher.encrypt("".join(counter_block_list)) if counter_block_list else ""
+        result_list = []
+        offset = 0
+
+        for data in data_list:
+            if data:
+                result_list.append(strxor(data, keystream[offset:offset + len(data)]))
+                offset += (len(data) + 15) // 16 * 16
+            else:
+                result_list.append("")
+
+        return result_list
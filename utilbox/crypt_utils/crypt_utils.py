@@ -3,9 +3,14 @@ Utility module for handling cryptographic operations.
 """
 
 import os
+import mmap
 import base64
+import hashlib
 from Crypto.Cipher import AES
 
+from utilbox.crypt_utils.file_cipher import FileCipher
+from utilbox.crypt_utils.merkle_tree import MerkleTree
+
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
 __status__ = "Alpha"
@@ -57,3 +62,137 @@ class CryptUtils:
         encrypted_data = CryptUtils.encode_string(cipher, data, block_size, padding_string)
 
         return encrypted_data
+
+    @staticmethod
+    def encrypt_file(source_path, destination_path, key, chunk_size=1048576, thread_count=1):
+        """
+        Encrypts a file of any size with AES-256, in independently authenticated chunks. See FileCipher.
+
+        :param source_path: The full path of the file to be encrypted.
+        :param destination_path: The full path of the encrypted file to be written.
+        :param key: The 32-byte key, see FileCipher.generate_key and FileCipher.derive_key.
+        :param chunk_size: The plaintext size of each chunk, in bytes.
+        :param thread_count: The number of threads encrypting chunks.
+
+        :return: True if the encryption was successful, False otherwise.
+        :rtype: bool
+        """
+
+        return FileCipher(key, chunk_size, thread_count).encrypt_file(source_path, destination_path)
+
+    @staticmethod
+    def decrypt_file(source_path, destination_path, key, thread_count=1):
+        """
+        Decrypts and verifies a file encrypted by 'encrypt_file'.
+
+        :param source_path: The full path of the encrypted file.
+        :param destination_path: The full path of the decrypted file to be written.
+        :param key: The 32-byte key the file was encrypted with.
+        :param thread_count: The number of threads decrypting chunks.
+
+        :return: True if the file was authentic and decrypted, False otherwise.
+        :rtype: bool
+        """
+
+        return FileCipher(key, thread_count=thread_count).decrypt_file(source_path, destination_path)
+
+    @staticmethod
+    def hash_string(data, algorithm="sha256"):
+        """
+        Computes the hash of a string.
+
+        :param data: The data to be hashed.
+        :param algorithm: The name of the hashlib algorithm, e.g. 'md5', 'sha1', 'sha256'.
+
+        :return: The hexadecimal digest.
+        :rtype: str
+        """
+
+        return hashlib.new(algorithm, data).hexdigest()
+
+    @staticmethod
+    def hash_file(file_path, algorithm="sha256", use_mmap=True, block_size=1048576):
+        """
+        Computes the hash of a file without reading it into memory.
+
+        By default the file is memory-mapped and hashed in a single call. Otherwise, or for files which cannot
+        be mapped, it is read in large blocks.
+
+        :param file_path: The full path of the file to be hashed.
+        :param algorithm: The name of the hashlib algorithm, e.g. 'md5', 'sha1', 'sha256'.
+        :param use_mmap: If True, hashes the file through a memory map.
+        :param block_size: The size of each block read, in bytes, when not using a memory map.
+
+        :return: The hexadecimal digest if the file could be read, False otherwise.
+        :rtype: str
+        """
+
+        file_hash = hashlib.new(algorithm)
+
+        try:
+            with open(file_path, "rb") as file_handle:
+                if use_mmap and os.fstat(file_handle.fileno()).st_size > 0:
+                    try:
+                        file_map = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (mmap.error, ValueError):
+                        file_map = None
+
+                    if file_map is not None:
+                        try:
+                            file_hash.update(file_map)
+                        finally:
+                            file_map.close()
+
+                        return file_hash.hexdigest()
+
+                block = file_handle.read(block_size)
+
+                while block:
+                    file_hash.update(block)
+                    block = file_handle.read(block_size)
+
+            return file_hash.hexdigest()
+        except (IOError, OSError):
+            return False
+
+    @staticmethod
+    def hash_files(file_path_list, algorithm="sha256", thread_count=4):
+        """
+        Computes the hashes of many files concurrently, on a thread pool.
+
+        :param file_path_list: The full paths of the files to be hashed.
+        :param algorithm: The name of the hashlib algorithm, e.g. 'md5', 'sha1', 'sha256'.
+        :param thread_count: The number of threads hashing files.
+
+        :return: Dictionary mapping each file path to its hexadecimal digest, or False if it could not be read.
+        :rtype: dict
+        """
+
+        from multiprocessing.pool import ThreadPool
+
+        thread_pool = ThreadPool(thread_count)
+
+        try:
+            digest_list = thread_pool.map(lambda file_path: CryptUtils.hash_file(file_path, algorithm),
+                                          file_path_list)
+        finally:
+            thread_pool.terminate()
+            thread_pool.join()
+
+        return dict(zip(file_path_list, digest_list))
+
+    @staticmethod
+    def hash_file_tree(file_path, chunk_size=4194304, algorithm="sha256", thread_count=4):
+        """
+        Computes the Merkle tree hash of a large file, hashing its chunks in parallel. See MerkleTree.
+
+        :param file_path: The full path of the file to be hashed.
+        :param chunk_size: The size of each chunk, in bytes.
+        :param algorithm: The name of the hashlib algorithm.
+        :param thread_count: The number of threads hashing chunks.
+
+        :return: The hash tree of the file, whose root hash is given by 'get_root_hash'.
+        :rtype: MerkleTree
+        """
+
+        return MerkleTree.from_file(file_path, chunk_size, algorithm, thread_count)
@@ -0,0 +1,309 @@
+"""
+Utility module to encrypt and decrypt large files in independently authenticated chunks.
+"""
+
+import os
+import hmac
+import struct
+import hashlib
+
+from Crypto.Cipher import AES
+from Crypto.Util import Counter
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# file signature and format version, written at the start of every encrypted file
+FILE_MAGIC = "UBXC"
+FILE_VERSION = 1
+
+# header layout: magic, version, chunk size, random file salt
+HEADER_FORMAT = ">4sBI16s"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# length of the truncated HMAC-SHA256 tag following every chunk
+TAG_SIZE = 16
+
+
+class FileCipher:
+    """
+    Utility class which encrypts files with AES-256 in CTR mode, authenticating every chunk with HMAC-SHA256.
+
+    An encrypted file is a 25-byte header followed by the chunks of the plaintext, each encrypted separately
+    and followed by a 16-byte tag. A random salt in the header derives per-file encryption and authentication
+    keys from the master key, so one master key can safely encrypt any number of files. Each chunk is
+    encrypted with its index as nonce, and its tag covers its index and whether it is the last chunk, so
+    modified, reordered, duplicated and truncated chunks are all detected.
+
+    As chunks do not depend on each other, they are encrypted and decrypted on a thread pool when
+    'thread_count' is above 1, reading ahead a bounded number of chunks per thread.
+
+    Example:
+        key = FileCipher.generate_key()
+        file_cipher = FileCipher(key, thread_count=4)
+        file_cipher.encrypt_file("backup.tar", "backup.tar.enc")
+        file_cipher.decrypt_file("backup.tar.enc", "backup.tar")
+    """
+
+    def __init__(self, key, chunk_size=1048576, thread_count=1):
+        """
+        :param key: The 32-byte master key.
+        :param chunk_size: The plaintext size of each chunk, in bytes.
+        :param thread_count: The number of threads encrypting or decrypting chunks.
+        """
+
+        if len(key) != 32:
+            raise ValueError("Key must be 32 bytes long.")
+
+        self.key = key
+        self.chunk_size = chunk_size
+        self.thread_count = thread_count
+
+    @staticmethod
+    def generate_key():
+        """
+        Generates a random master key.
+
+        :return: The 32-byte key.
+        :rtype: str
+        """
+
+        return os.urandom(32)
+
+    @staticmethod
+    def derive_key(passphrase, salt, iteration_count=200000):
+        """
+        Derives a master key from a passphrase with PBKDF2-HMAC-SHA256.
+
+        :param passphrase: The passphrase.
+        :param salt: A random salt of at least 16 bytes, to be stored alongside the encrypted files.
+        :param iteration_count: The number of PBKDF2 iterations.
+
+        :return: The 32-byte key.
+        :rtype: str
+        """
+
+        return hashlib.pbkdf2_hmac("sha256", passphrase, salt, iteration_count, 32)
+
+    def encrypt_file(self, source, destination):
+        """
+        Encrypts a file.
+
+        :param source: The full path of the plaintext file, or a file object opened for reading.
+        :param destination: The full path of the encrypted file, or a file object opened for writing.
+
+        :return: True if the encryption was successful, False otherwise.
+        :rtype: bool
+        """
+
+        source_handle = None
+        destination_handle = None
+
+        try:
+            source_handle = open(source, "rb") if isinstance(source, basestring) else source
+            destination_handle = open(destination, "wb") if isinstance(destination, basestring) else destination
+
+            file_salt = os.urandom(16)
+            destination_handle.write(struct.pack(HEADER_FORMAT, FILE_MAGIC, FILE_VERSION, self.chunk_size,
+                                                 file_salt))
+
+            cipher_keys = self._derive_file_keys(file_salt)
+            chunk_iter = FileCipher._read_chunks(source_handle, self.chunk_size)
+
+            for encrypted_chunk in self._map_chunks(self._encrypt_chunk, cipher_keys, chunk_iter):
+                destination_handle.write(encrypted_chunk)
+
+            return True
+        except (IOError, OSError):
+            return False
+        finally:
+            FileCipher._close_handles(source, source_handle, destination, destination_handle)
+
+    def decrypt_file(self, source, destination):
+        """
+        Decrypts a file, verifying every chunk before it is written.
+
+        If verification fails, the chunks preceding the failed chunk have already been written, and a
+        destination given by path is removed.
+
+        :param source: The full path of the encrypted file, or a file object opened for reading.
+        :param destination: The full path of the plaintext file, or a file object opened for writing.
+
+        :return: True if the file was authentic and decrypted, False otherwise.
+        :rtype: bool
+        """
+
+        source_handle = None
+        destination_handle = None
+        is_decrypted = False
+
+        try:
+            source_handle = open(source, "rb") if isinstance(source, basestring) else source
+
+            header = source_handle.read(HEADER_SIZE)
+
+            if len(header) != HEADER_SIZE:
+                return False
+
+            file_magic, file_version, chunk_size, file_salt = struct.unpack(HEADER_FORMAT, header)
+
+            if file_magic != FILE_MAGIC or file_version != FILE_VERSION:
+                return False
+
+            destination_handle = open(destination, "wb") if isinstance(destination, basestring) else destination
+
+            cipher_keys = self._derive_file_keys(file_salt)
+            chunk_iter = FileCipher._read_chunks(source_handle, chunk_size + TAG_SIZE)
+
+            for plain_chunk in self._map_chunks(self._decrypt_chunk, cipher_keys, chunk_iter):
+                destination_handle.write(plain_chunk)
+
+            is_decrypted = True
+
+            return True
+        except (IOError, OSError, ValueError):
+            return False
+        finally:
+            FileCipher._close_handles(source, source_handle, destination, destination_handle)
+
+            if not is_decrypted and destination_handle is not None and destination_handle is not destination:
+                os.remove(destination)
+
+    def _derive_file_keys(self, file_salt):
+        """
+        Derives the encryption and authentication keys of a file from the master key and the file salt.
+
+        :return: Tuple of the encryption key and the authentication key.
+        :rtype: tuple
+        """
+
+        return (hmac.new(self.key, file_salt + "encryption", hashlib.sha256).digest(),
+                hmac.new(self.key, file_salt + "authentication", hashlib.sha256).digest())
+
+    @staticmethod
+    def _encrypt_chunk(cipher_keys, chunk_index, chunk, is_last):
+        """
+        Encrypts a chunk and appends its tag.
+
+        :return: The encrypted chunk.
+        :rtype: str
+        """
+
+        encryption_key, authentication_key = cipher_keys
+        cipher = AES.new(encryption_key, AES.MODE_CTR,
+                         counter=Counter.new(64, prefix=struct.pack(">Q", chunk_index), initial_value=0))
+        encrypted_chunk = cipher.encrypt(chunk)
+
+        return encrypted_chunk + FileCipher._compute_tag(authentication_key, chunk_index, is_last, encrypted_chunk)
+
+    @staticmethod
+    def _decrypt_chunk(cipher_keys, chunk_index, chunk, is_last):
+        """
+        Verifies the tag of an encrypted chunk and decrypts it.
+
+        :return: The plaintext chunk.
+        :rtype: str
+
+        :raises ValueError: Raised if the chunk is not authentic.
+        """
+
+        encryption_key, authentication_key = cipher_keys
+        encrypted_chunk = chunk[:-TAG_SIZE]
+        expected_tag = FileCipher._compute_tag(authentication_key, chunk_index, is_last, encrypted_chunk)
+
+        if len(chunk) < TAG_SIZE or not hmac.compare_digest(chunk[-TAG_SIZE:], expected_tag):
+            raise ValueError("Chunk " + str(chunk_index) + " failed authentication.")
+
+        cipher = AES.new(encryption_key, AES.MODE_CTR,
+                         counter=Counter.new(64, prefix=struct.pack(">Q", chunk_index), initial_value=0))
+
+        return cipher.decrypt(encrypted_chunk)
+
+    @staticmethod
+    def _compute_tag(authentication_key, chunk_index, is_last, encrypted_chunk):
+        """
+        Computes the tag of an encrypted chunk, bound to its position and to whether it ends the file.
+
+        :return: The truncated tag.
+        :rtype: str
+        """
+
+        chunk_mac = hmac.new(authentication_key, struct.pack(">QB", chunk_index, is_last), hashlib.sha256)
+        chunk_mac.update(encrypted_chunk)
+
+        return chunk_mac.digest()[:TAG_SIZE]
+
+    def _map_chunks(self, chunk_func, cipher_keys, chunk_iter):
+        """
+        Applies a chunk function to every chunk, in order, on a thread pool if more than one thread is used.
+
+        At most four chunks per thread are read ahead, so memory use does not depend on the file size.
+
+        :return: Generator yielding the results, in chunk order.
+        :rtype: generator
+        """
+
+        if self.thread_count <= 1:
+            for chunk_index, chunk, is_last in chunk_iter:
+                yield chunk_func(cipher_keys, chunk_index, chunk, is_last)
+
+            return
+
+        from multiprocessing.pool import ThreadPool
+
+        thread_pool = ThreadPool(self.thread_count)
+        window_size = self.thread_count * 4
+
+        try:
+            chunk_window = []
+
+            for chunk_entry in chunk_iter:
+                chunk_window.append(chunk_entry)
+
+                if len(chunk_window) == window_size:
+                    for result in thread_pool.map(lambda entry: chunk_func(cipher_keys, *entry), chunk_window):
+                        yield result
+
+                    chunk_window = []
+
+            for result in thread_pool.map(lambda entry: chunk_func(cipher_keys, *entry), chunk_window):
+                yield result
+        finally:
+            thread_pool.terminate()
+            thread_pool.join()
+
+    @staticmethod
+    def _read_chunks(file_handle, chunk_size):
+        """
+        Reads a file in chunks, reading one chunk ahead to flag the last one. An empty file has one empty chunk.
+
+        :return: Generator yielding (chunk index, chunk, is last) tuples.
+        :rtype: generator
+        """
+
+        chunk_index = 0
+        chunk = file_handle.read(chunk_size)
+
+        while True:
+            next_chunk = file_handle.read(chunk_size) if len(chunk) == chunk_size else ""
+
+            yield chunk_index, chunk, not next_chunk
+
+            if not next_chunk:
+                break
+
+            chunk_index += 1
+            chunk = next_chunk
+
+    @staticmethod
+    def _close_handles(source, source_handle, destination, destination_handle):
+        """
+        Closes the file handles opened from paths, leaving supplied file objects open.
+        """
+
+        if source_handle is not None and source_handle is not source:
+            source_handle.close()
+
+        if destination_handle is not None and destination_handle is not destination:
+            destination_handle.close()
@@ -0,0 +1,251 @@
+"""
+Utility module to hash very large files as a tree of fixed-size chunk hashes.
+"""
+
+import os
+import mmap
+import hashlib
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# prefixes separating leaf hashes from node hashes, so a node can never be passed off as a chunk
+LEAF_PREFIX = "\x00"
+NODE_PREFIX = "\x01"
+
+
+class MerkleTree:
+    """
+    Hash tree over the fixed-size chunks of a file.
+
+    Every chunk is hashed separately, and pairs of hashes are hashed together level by level up to a single root
+    hash, which identifies the whole file. A level with an odd number of hashes carries its last hash up
+    unchanged. Chunks are hashed on a thread pool straight from a memory-mapped file, as hashlib releases the
+    GIL while hashing.
+
+    Keeping the tree of a file allows checking or updating it later by re-hashing only some chunks, and comparing
+    two trees locates their differing chunks by descending only into differing subtrees.
+
+    Example:
+        merkle_tree = MerkleTree.from_file("disk.img", chunk_size=4194304, thread_count=8)
+        print merkle_tree.get_root_hash()
+        print merkle_tree.verify_chunks("disk.img", [10, 11])
+    """
+
+    def __init__(self, leaf_hash_list, chunk_size, file_size, algorithm="sha256"):
+        """
+        :param leaf_hash_list: The digests of the chunks, in file order.
+        :param chunk_size: The size of each chunk, in bytes, the last chunk being shorter.
+        :param file_size: The size of the file, in bytes.
+        :param algorithm: The name of the hashlib algorithm.
+        """
+
+        self.chunk_size = chunk_size
+        self.file_size = file_size
+        self.algorithm = algorithm
+
+        # hash levels, from the chunk hashes up to the root
+        self.level_list = [list(leaf_hash_list)]
+
+        while len(self.level_list[-1]) > 1:
+            child_level = self.level_list[-1]
+            self.level_list.append([self._hash_node(child_level, i) for i in xrange(0, len(child_level), 2)])
+
+    @staticmethod
+    def from_file(file_path, chunk_size=4194304, algorithm="sha256", thread_count=4):
+        """
+        Builds the hash tree of a file.
+
+        :param file_path: The full path of the file to be hashed.
+        :param chunk_size: The size of each chunk, in bytes.
+        :param algorithm: The name of the hashlib algorithm.
+        :param thread_count: The number of threads hashing chunks.
+
+        :return: The hash tree of the file.
+        :rtype: MerkleTree
+        """
+
+        file_size = os.path.getsize(file_path)
+        chunk_count = max(1, (file_size + chunk_size - 1) // chunk_size)
+        leaf_hash_list = MerkleTree._hash_chunks(file_path, range(chunk_count), chunk_size, algorithm, thread_count)
+
+        return MerkleTree(leaf_hash_list, chunk_size, file_size, algorithm)
+
+    def get_root_hash(self):
+        """
+        Returns the root hash, identifying the content of the whole file.
+
+        :return: The hexadecimal root hash.
+        :rtype: str
+        """
+
+        return self.level_list[-1][0].encode("hex")
+
+    def get_chunk_count(self):
+        """
+        Returns the number of chunks in the tree.
+
+        :return: The chunk count.
+        :rtype: int
+        """
+
+        return len(self.level_list[0])
+
+    def get_chunk_hashes(self):
+        """
+        Returns the hashes of all chunks, to be stored for later verification.
+
+        :return: List of hexadecimal chunk hashes.
+        :rtype: list
+        """
+
+        return [leaf_hash.encode("hex") for leaf_hash in self.level_list[0]]
+
+    def verify_chunks(self, file_path, chunk_indices=None, thread_count=4):
+        """
+        Re-hashes chunks of a file and compares them with the tree.
+
+        :param file_path: The full path of the file to be verified.
+        :param chunk_indices: The indices of the chunks to be verified, all chunks if not supplied.
+        :param thread_count: The number of threads hashing chunks.
+
+        :return: List of the indices of the chunks which differ, empty if all verified chunks match.
+        :rtype: list
+        """
+
+        if chunk_indices is None:
+            chunk_indices = range(self.get_chunk_count())
+
+        chunk_indices = [chunk_index for chunk_index in chunk_indices if chunk_index < self.get_chunk_count()]
+        leaf_hash_list = MerkleTree._hash_chunks(file_path, chunk_indices, self.chunk_size, self.algorithm,
+                                                 thread_count)
+
+        return [chunk_index for chunk_index, leaf_hash in zip(chunk_indices, leaf_hash_list)
+                if leaf_hash != self.level_list[0][chunk_index]]
+
+    def update_chunks(self, file_path, chunk_indices, thread_count=4):
+        """
+        Re-hashes the supplied chunks of a file which has changed in place, updating only their paths to the root.
+
+        The file size must be unchanged. Otherwise, the tree has to be rebuilt with 'from_file'.
+
+        :param file_path: The full path of the changed file.
+        :param chunk_indices: The indices of the changed chunks.
+        :param thread_count: The number of threads hashing chunks.
+
+        :return: The new hexadecimal root hash.
+        :rtype: str
+
+        :raises ValueError: Raised if the file size has changed.
+        """
+
+        if os.path.getsize(file_path) != self.file_size:
+            raise ValueError("File size has changed, the tree must be rebuilt.")
+
+        chunk_indices = sorted(set(chunk_indices))
+        leaf_hash_list = MerkleTree._hash_chunks(file_path, chunk_indices, self.chunk_size, self.algorithm,
+                                                 thread_count)
+
+        for chunk_index, leaf_hash in zip(chunk_indices, leaf_hash_list):
+            self.level_list[0][chunk_index] = leaf_hash
+
+        # recompute the parents of the changed nodes only, level by level
+        changed_indices = chunk_indices
+
+        for level_number in xrange(1, len(self.level_list)):
+            child_level = self.level_list[level_number - 1]
+            changed_indices = sorted(set([child_index // 2 for child_index in changed_indices]))
+
+            for node_index in changed_indices:
+                self.level_list[level_number][node_index] = self._hash_node(child_level, node_index * 2)
+
+        return self.get_root_hash()
+
+    def find_changed_chunks(self, other_tree):
+        """
+        Compares this tree with the tree of another version of the file, of the same size and chunk size.
+
+        Only subtrees whose hashes differ are descended into, so few changes cost few comparisons.
+
+        :param other_tree: The tree to compare with.
+
+        :return: List of the indices of the chunks which differ.
+        :rtype: list
+
+        :raises ValueError: Raised if the trees do not have the same shape.
+        """
+
+        if other_tree.chunk_size != self.chunk_size or other_tree.get_chunk_count() != self.get_chunk_count():
+            raise ValueError("Trees of different chunk sizes or chunk counts cannot be compared.")
+
+        top_level = len(self.level_list) - 1
+        pending_list = [(top_level, 0)]
+        changed_indices = []
+
+        while pending_list:
+            level_number, node_index = pending_list.pop()
+
+            if self.level_list[level_number][node_index] == other_tree.level_list[level_number][node_index]:
+                continue
+
+            if level_number == 0:
+                changed_indices.append(node_index)
+                continue
+
+            for child_index in (node_index * 2, node_index * 2 + 1):
+                if child_index < len(self.level_list[level_number - 1]):
+                    pending_list.append((level_number - 1, child_index))
+
+        return sorted(changed_indices)
+
+    def _hash_node(self, child_level, left_index):
+        """
+        Computes the hash of the parent of two adjacent hashes, carrying a lone last hash up unchanged.
+
+        :return: The digest of the parent node.
+        :rtype: str
+        """
+
+        if left_index + 1 >= len(child_level):
+            return child_level[left_index]
+
+        return hashlib.new(self.algorithm, NODE_PREFIX + child_level[left_index] + child_level[left_index + 1]).digest()
+
+    @staticmethod
+    def _hash_chunks(file_path, chunk_indices, chunk_size, algorithm, thread_count):
+        """
+        Hashes chunks of a file, straight from a memory map, on a thread pool.
+
+        :return: List of the chunk digests, in the order of 'chunk_indices'.
+        :rtype: list
+        """
+
+        with open(file_path, "rb") as file_handle:
+            if os.fstat(file_handle.fileno()).st_size == 0:
+                # empty files cannot be memory-mapped, and have a single, empty chunk
+                return [hashlib.new(algorithm, LEAF_PREFIX).digest() for _ in chunk_indices]
+
+            file_map = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+            def hash_chunk(chunk_index):
+                chunk_hash = hashlib.new(algorithm, LEAF_PREFIX)
+                chunk_hash.update(buffer(file_map, chunk_index * chunk_size, chunk_size))
+
+                return chunk_hash.digest()
+
+            try:
+                if thread_count <= 1 or len(chunk_indices) <= 1:
+                    return [hash_chunk(chunk_index) for chunk_index in chunk_indices]
+
+                from multiprocessing.pool import ThreadPool
+
+                thread_pool = ThreadPool(thread_count)
+
+                try:
+                    return thread_pool.map(hash_chunk, chunk_indices)
+                finally:
+                    thread_pool.terminate()
+                    thread_pool.join()
+            finally:
+                file_map.close()
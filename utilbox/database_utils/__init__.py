@@ -1,5 +1,13 @@
 from sql_utils import SqlUtils
 from mysql_utils import MysqlUtils
+from sqlite_utils import SqliteUtils
+from replica_router import ReplicaRouter
+from async_mysql_utils import AsyncMysqlUtils
+from query_instrument import QueryInstrument
 
 __all__ = ["SqlUtils",
-           "MysqlUtils"]
+           "MysqlUtils",
+           "SqliteUtils",
+           "ReplicaRouter",
+           "AsyncMysqlUtils",
+           "QueryInstrument"]
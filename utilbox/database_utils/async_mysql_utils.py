@@ -0,0 +1,338 @@
+"""
+Utility module to query MySQL databases from asyncio applications without blocking the event loop.
+
+Usage requires the 'asyncio' module, or its 'trollius' backport together with the 'futures' package on Python 2.
+"""
+
+import Queue
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class AsyncMysqlUtils:
+    """
+    Utility class exposing the query methods of MysqlUtils as futures.
+
+    Queries run on a dedicated, bounded thread pool, each worker thread borrowing a connection from a pool of
+    the same size. At most 'pool_size' queries therefore run at once, and any number of coroutines can share
+    the pool: their queries wait in the executor queue, not in the event loop.
+
+    Every method returns a future which can be waited on from a trollius coroutine ('yield From(...)').
+    Connections are borrowed and returned by the worker thread itself, so cancelling the waiting
+    coroutine never leaks a connection: a query which has not started yet is dropped, and a query which is
+    already running completes on its thread and returns its connection before the result is discarded.
+
+    Example:
+        db = AsyncMysqlUtils(MysqlUtils(host, user, password, database), pool_size=8)
+        yield From(db.connect())
+        row_count = yield From(db.fetch_row_count("SELECT * FROM users;"))
+    """
+
+    def __init__(self, template, pool_size=4, loop=None, acquire_timeout_sec=30):
+        """
+        :param template: MysqlUtils (or SqliteUtils) instance whose settings are cloned for every pooled connection.
+        :param pool_size: Number of pooled connections, and of queries which may run concurrently.
+        :param loop: The event loop to run on, the current event loop if not supplied.
+        :param acquire_timeout_sec: Longest time a worker thread waits for a pooled connection before failing.
+        """
+
+        try:
+            import asyncio
+        except ImportError:
+            import trollius as asyncio
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.template = template
+        self.pool_size = pool_size
+        self.acquire_timeout_sec = acquire_timeout_sec
+        self.loop = loop if loop is not None else asyncio.get_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=pool_size)
+        self.conn_pool = Queue.Queue()
+        self.conn_list = []
+        self.is_closed = False
+
+    def connect(self):
+        """
+        Creates and connects all pooled connections.
+
+        :return: Future resolving to True if all connections were successful, False otherwise.
+        :rtype: Future
+        """
+
+        return self.loop.run_in_executor(self.executor, self._connect_pool)
+
+    def disconnect(self):
+        """
+        Disconnects all pooled connections and shuts down the thread pool, once running queries complete.
+
+        Queries which have not started yet fail with a RuntimeError, as do queries submitted afterwards.
+
+        :return: Future resolving to True when all connections are closed.
+        :rtype: Future
+        """
+
+        self.is_closed = True
+
+        return self.loop.run_in_executor(None, self._disconnect_pool)
+
+    def run_query(self, query_string):
+        """
+        Runs a query on a pooled connection, see MysqlUtils.run_query.
+
+        :return: Future resolving to the query result.
+        :rtype: Future
+        """
+
+        return self._submit("run_query", query_string)
+
+    def fetch_row_count(self, query_string):
+        """
+        Counts rows of a query on a pooled connection, see MysqlUtils.fetch_row_count.
+
+        :return: Future resolving to the row count.
+        :rtype: Future
+        """
+
+        return self._submit("fetch_row_count", query_string)
+
+    def fetch_row_by_query(self, query_string):
+        """
+        Retrieves a single row on a pooled connection, see MysqlUtils.fetch_row_by_query.
+
+        :return: Future resolving to the row dictionary.
+        :rtype: Future
+        """
+
+        return self._submit("fetch_row_by_query", query_string)
+
+    def execute_statement(self, statement_string, param_list=None):
+        """
+        Executes a data-modifying statement on a pooled connection, see MysqlUtils.execute_statement.
+
+        :return: Future resolving to the count of affected rows.
+        :rtype: Future
+        """
+
+        return self._submit("execute_statement", statement_string, param_list)
+
+    def upsert_rows(self, table_name, row_list, key_field_list, update_field_list=None, chunk_size=500):
+        """
+        Upserts rows on a pooled connection, see MysqlUtils.upsert_rows.
+
+        :return: Future resolving to the upsert report.
+        :rtype: Future
+        """
+
+        return self._submit("upsert_rows", table_name, row_list, key_field_list, update_field_list, chunk_size)
+
+    def run_in_transaction(self, transaction_func):
+        """
+        Runs a function within a transaction, on a single pooled connection.
+
+        The function is called on a worker thread with the connection as its only argument, and may issue any
+        number of blocking MysqlUtils calls on it. The transaction is committed if the function returns and
+        rolled back if it raises, in which case the future raises the same exception.
+
+        :param transaction_func: The function to be run, receiving the connection.
+
+        :return: Future resolving to the value returned by the function.
+        :rtype: Future
+        """
+
+        return self.loop.run_in_executor(self.executor, self._run_pooled_transaction, transaction_func)
+
+    def stream_table(self, table_name, key_column, column_list=None, chunk_size=1000, start_after=None):
+        """
+        Creates a stream over all rows of a table in key order, fetched one keyset-paginated chunk at a time.
+
+        Each chunk is fetched by a separate call on any pooled connection, so an abandoned stream holds no
+        connection. Each chunk must be received before the next one is requested.
+
+        Example:
+            stream = db.stream_table("users", "id")
+            chunk = yield From(stream.next_chunk())
+            while chunk is not None:
+                process(chunk)
+                chunk = yield From(stream.next_chunk())
+
+        :param table_name: The table whose rows are to be retrieved.
+        :param key_column: The unique, indexed column used to order and page through the rows.
+        :param column_list: The list of columns to retrieve, all columns if not supplied.
+        :param chunk_size: The number of rows per chunk.
+        :param start_after: Exclusive lower bound for the key column.
+
+        :return: The table stream.
+        :rtype: AsyncTableStream
+        """
+
+        return AsyncTableStream(self, table_name, key_column, column_list, chunk_size, start_after)
+
+    def _submit(self, method_name, *arg_list):
+        """
+        Schedules a MysqlUtils method call on a pooled connection.
+
+        :return: Future resolving to the value returned by the method.
+        :rtype: Future
+        """
+
+        return self.loop.run_in_executor(self.executor, self._call_pooled, method_name, arg_list)
+
+    def _call_pooled(self, method_name, arg_list):
+        """
+        Calls a MysqlUtils method on a borrowed connection, on a worker thread.
+
+        :return: The value returned by the method.
+        """
+
+        conn = self._borrow_connection()
+
+        try:
+            return getattr(conn, method_name)(*arg_list)
+        finally:
+            self.conn_pool.put(conn)
+
+    def _run_pooled_transaction(self, transaction_func):
+        """
+        Runs a function within a transaction on a borrowed connection, on a worker thread.
+
+        :return: The value returned by the function.
+        """
+
+        conn = self._borrow_connection()
+
+        try:
+            with conn.transaction():
+                return transaction_func(conn)
+        finally:
+            self.conn_pool.put(conn)
+
+    def _fetch_chunk(self, table_name, key_column, column_list, chunk_size, start_after):
+        """
+        Fetches the chunk of rows following the supplied key, on a borrowed connection.
+
+        :return: List of row dictionaries, None if no rows remain.
+        :rtype: list
+        """
+
+        conn = self._borrow_connection()
+
+        try:
+            chunk_iter = conn.iterate_table_chunks(table_name, key_column, column_list, chunk_size, start_after)
+
+            return next(chunk_iter, None)
+        finally:
+            self.conn_pool.put(conn)
+
+    def _borrow_connection(self):
+        """
+        Takes a connection from the pool, waiting at most 'acquire_timeout_sec' for one to be returned.
+
+        :return: The borrowed connection, to be put back into the pool once used.
+        :rtype: MysqlUtils
+
+        :raises RuntimeError: Raised if the pool is closed, has no connections, or none was returned in time.
+        """
+
+        if self.is_closed:
+            raise RuntimeError("Connection pool is closed.")
+
+        if not self.conn_list:
+            raise RuntimeError("Connection pool is empty, 'connect' has not completed successfully.")
+
+        try:
+            return self.conn_pool.get(timeout=self.acquire_timeout_sec)
+        except Queue.Empty:
+            raise RuntimeError("No pooled connection became available within " + str(self.acquire_timeout_sec) +
+                               " seconds.")
+
+    def _connect_pool(self):
+        """
+        Creates and connects the pooled connections, on a worker thread.
+
+        :return: True if all connections were successful, False otherwise.
+        :rtype: bool
+        """
+
+        all_connected = True
+
+        while len(self.conn_list) < self.pool_size:
+            conn = self.template.clone()
+
+            if not conn.connect():
+                all_connected = False
+                break
+
+            self.conn_list.append(conn)
+            self.conn_pool.put(conn)
+
+        return all_connected
+
+    def _disconnect_pool(self):
+        """
+        Waits for running queries, then disconnects the pooled connections.
+
+        :return: True when all connections are closed.
+        :rtype: bool
+        """
+
+        self.executor.shutdown(wait=True)
+
+        for conn in self.conn_list:
+            conn.disconnect()
+
+        self.conn_list = []
+
+        return True
+
+
+class AsyncTableStream:
+    """
+    Keyset-paginated stream over the rows of a table, created by AsyncMysqlUtils.stream_table.
+    """
+
+    def __init__(self, async_db, table_name, key_column, column_list, chunk_size, start_after):
+        self.async_db = async_db
+        self.table_name = table_name
+        self.key_column = key_column
+        self.column_list = column_list
+        self.chunk_size = chunk_size
+        self.last_key = start_after
+        self.exhausted = False
+
+    def next_chunk(self):
+        """
+        Fetches the next chunk of rows.
+
+        :return: Future resolving to a list of row dictionaries, or None once all rows have been returned.
+        :rtype: Future
+        """
+
+        return self.async_db.loop.run_in_executor(self.async_db.executor, self._fetch_next)
+
+    def _fetch_next(self):
+        """
+        Fetches the next chunk of rows and advances the stream, on a worker thread.
+
+        :return: List of row dictionaries, None if no rows remain.
+        :rtype: list
+        """
+
+        if self.exhausted:
+            return None
+
+        row_list = self.async_db._fetch_chunk(self.table_name, self.key_column, self.column_list, self.chunk_size,
+                                              self.last_key)
+
+        if row_list is None:
+            self.exhausted = True
+            return None
+
+        self.last_key = row_list[-1][self.key_column]
+
+        if len(row_list) < self.chunk_size:
+            self.exhausted = True
+
+        return row_list
@@ -2,12 +2,32 @@
 Utility module to work with MySQL databases.
 """
 
-import MySQLdb
+import os
+import re
+import csv
+import json
+import time
+import tempfile
+import itertools
+import threading
+import contextlib
+
+from sql_utils import SqlUtils
 
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
 __status__ = "Alpha"
 
+# characters which must be escaped within a field of MySQL tab-separated data, with their escaped forms
+TSV_ESCAPE_MAP = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"}
+TSV_ESCAPE_PATTERN = re.compile(r"[\\\t\n\r\0]")
+
+# output formats supported by table exports
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# pattern to extract counters from the info string reported after LOAD DATA and multi-row INSERT statements
+LOAD_INFO_PATTERN = re.compile(r"(\w+): (\d+)")
+
 
 class MysqlUtils:
     """
@@ -32,15 +52,29 @@ class MysqlUtils:
     format SQL code for readability.
     """
 
-    def __init__(self, host, user, password, database):
+    def __init__(self, host, user, password, database, local_infile=False):
         # connection variables
         self.db_host = host
         self.db_user = user
         self.db_pass = password
         self.db_name = database
+        self.local_infile = local_infile
 
         # misc variables
         self.conn_obj = None
+        self.dialect = "mysql"
+        self.instrument = None
+
+        # exception raised by the last query method, None if it succeeded, as False may also mean no rows
+        self.last_error = None
+
+        # transaction variables
+        self.transaction_depth = 0
+        self.batch_open = False
+        self.batch_max_statements = 0
+        self.batch_max_interval_ms = 0
+        self.batch_pending = 0
+        self.batch_start_time = None
 
     def connect(self):
         """
@@ -52,8 +86,11 @@ class MysqlUtils:
         :raises ConnectionException: Raised if any error occurs during attempt of connection.
         """
 
+        import MySQLdb
+
         try:
-            self.conn_obj = MySQLdb.connect(self.db_host, self.db_user, self.db_pass, self.db_name)
+            self.conn_obj = MySQLdb.connect(self.db_host, self.db_user, self.db_pass, self.db_name,
+                                            local_infile=int(self.local_infile))
             self.conn_obj.autocommit(True)
             return True
         except Exception:
@@ -65,22 +102,28 @@ class MysqlUtils:
 
         :param query_string: The query to be executed on the database.
 
-        :return: Result object of the executed query. False if exception was raised.
+        :return: Result object of the executed query. False if exception was raised, or if no row was returned.
         :rtype: str
         """
 
+        self.last_error = None
+
         try:
             cursor = self.conn_obj.cursor()
-            cursor.execute(query_string)
+            self._execute(cursor, query_string)
 
             # extract results of the query from cursor
             query_res = cursor.fetchall()
             cursor.close()
-
-            return str(query_res[0][0])
         except Exception as ex:
+            self.last_error = ex
+            return False
+
+        if len(query_res) == 0:
             return False
 
+        return str(query_res[0][0])
+
     def fetch_row_count(self, query_string):
         """
         Returns count of rows received after executing supplied query.
@@ -91,9 +134,11 @@ class MysqlUtils:
         :rtype: int
         """
 
+        self.last_error = None
+
         try:
             cursor = self.conn_obj.cursor()
-            cursor.execute(query_string)
+            self._execute(cursor, query_string)
 
             # extract results of the query from cursor
             query_res = cursor.fetchall()
@@ -101,6 +146,7 @@ class MysqlUtils:
 
             return len(query_res)
         except Exception as ex:
+            self.last_error = ex
             return False
 
     def fetch_row_by_key(self, table_name, key):
@@ -134,10 +180,12 @@ class MysqlUtils:
         :raises Exception: Raises a general exception on encountering an error.
         """
 
+        self.last_error = None
+
         try:
             result_map = {}
             cursor = self.conn_obj.cursor()
-            cursor.execute(query_string)
+            self._execute(cursor, query_string)
 
             # obtain field names from the table and store in a list
             name_to_index = [i[0] for i in cursor.description]
@@ -158,8 +206,1053 @@ class MysqlUtils:
 
             return result_map
         except Exception as ex:
+            self.last_error = ex
+            return False
+
+    def execute_statement(self, statement_string, param_list=None):
+        """
+        Executes a data-modifying statement (INSERT, UPDATE, DELETE etc.) on the database.
+
+        Outside a transaction the statement is committed immediately, as the connection runs in autocommit mode.
+        Inside a transaction or batch, errors are re-raised instead of being reported as False, so that the
+        enclosing block can roll back.
+
+        :param statement_string: The statement to be executed.
+        :param param_list: Optional sequence of values to bind to the placeholders within the statement.
+
+        :return: Count of rows affected by the statement, False if exception was raised.
+        :rtype: int
+        """
+
+        try:
+            cursor = self.conn_obj.cursor()
+
+            self._execute(cursor, statement_string, param_list)
+
+            row_count = cursor.rowcount
+            cursor.close()
+        except Exception as ex:
+            if self.transaction_depth > 0 or self.batch_open:
+                raise
+
+            return False
+
+        if self.batch_open:
+            self.batch_pending += 1
+
+            if self.transaction_depth == 0:
+                self.check_batch()
+
+        return row_count
+
+    def begin_transaction(self):
+        """
+        Starts an explicit transaction, suspending autocommit until it is committed or rolled back.
+
+        :return: True if the transaction was started, False otherwise.
+        :rtype: bool
+        """
+
+        try:
+            self._execute_control(SqlUtils.build_begin_statement(self.dialect))
+            return True
+        except Exception as ex:
+            return False
+
+    def commit_transaction(self):
+        """
+        Commits the currently open transaction.
+
+        :return: True if the transaction was committed, False otherwise.
+        :rtype: bool
+        """
+
+        try:
+            self.conn_obj.commit()
+            return True
+        except Exception as ex:
+            return False
+
+    def rollback_transaction(self):
+        """
+        Rolls back the currently open transaction.
+
+        :return: True if the transaction was rolled back, False otherwise.
+        :rtype: bool
+        """
+
+        try:
+            self.conn_obj.rollback()
+            return True
+        except Exception as ex:
+            return False
+
+    def create_savepoint(self, savepoint_name):
+        """
+        Marks a named savepoint within the currently open transaction.
+
+        :param savepoint_name: The name of the savepoint to be created.
+
+        :return: True if the savepoint was created, False otherwise.
+        :rtype: bool
+        """
+
+        try:
+            self._execute_control(SqlUtils.build_savepoint_statement(savepoint_name))
+            return True
+        except Exception as ex:
+            return False
+
+    def rollback_to_savepoint(self, savepoint_name):
+        """
+        Discards all changes made after the named savepoint, keeping the transaction open.
+
+        :param savepoint_name: The name of the savepoint to roll back to.
+
+        :return: True if the changes were discarded, False otherwise.
+        :rtype: bool
+        """
+
+        try:
+            self._execute_control(SqlUtils.build_rollback_to_savepoint_statement(savepoint_name))
+            return True
+        except Exception as ex:
+            return False
+
+    def release_savepoint(self, savepoint_name):
+        """
+        Removes the named savepoint, keeping the changes made after it.
+
+        :param savepoint_name: The name of the savepoint to be released.
+
+        :return: True if the savepoint was released, False otherwise.
+        :rtype: bool
+        """
+
+        try:
+            self._execute_control(SqlUtils.build_release_savepoint_statement(savepoint_name))
+            return True
+        except Exception as ex:
+            return False
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Groups all statements executed within the block into a single transaction.
+
+        The transaction is committed when the block exits normally. If an exception is raised within the block,
+        the transaction is rolled back and the exception is re-raised.
+        Nested blocks, and blocks opened while a batch is active, are mapped onto savepoints, so that an error
+        within them only discards the changes made since the block was entered.
+
+        Example:
+            with db.transaction():
+                db.execute_statement("UPDATE accounts SET balance=balance-10 WHERE id=1;")
+                db.execute_statement("UPDATE accounts SET balance=balance+10 WHERE id=2;")
+
+        :return: The current instance, for use within the block.
+        :rtype: MysqlUtils
+        """
+
+        savepoint_name = None
+
+        if self.transaction_depth > 0 or self.batch_open:
+            savepoint_name = "utilbox_sp_" + str(self.transaction_depth + 1)
+            self._execute_control(SqlUtils.build_savepoint_statement(savepoint_name))
+        else:
+            self._execute_control(SqlUtils.build_begin_statement(self.dialect))
+
+        self.transaction_depth += 1
+
+        try:
+            yield self
+        except Exception:
+            self.transaction_depth -= 1
+
+            if savepoint_name is None:
+                self.conn_obj.rollback()
+            else:
+                self._execute_control(SqlUtils.build_rollback_to_savepoint_statement(savepoint_name))
+                self._execute_control(SqlUtils.build_release_savepoint_statement(savepoint_name))
+
+            raise
+        else:
+            self.transaction_depth -= 1
+
+            if savepoint_name is None:
+                self.conn_obj.commit()
+            else:
+                self._execute_control(SqlUtils.build_release_savepoint_statement(savepoint_name))
+
+                # statements of the block were counted towards the batch, but its limits could not be checked
+                if self.transaction_depth == 0:
+                    self.check_batch()
+
+    def begin_batch(self, max_statements=1000, max_interval_ms=1000):
+        """
+        Starts write-batching mode, in which statements run through 'execute_statement' share a single commit.
+
+        The open batch is committed, and a new one started, once 'max_statements' statements have been executed
+        or 'max_interval_ms' milliseconds have elapsed since it was started, whichever comes first.
+        Both limits are checked as each statement is executed, so an idle batch is not committed until the
+        next statement, or a call to 'flush_batch' or 'end_batch'.
+
+        :param max_statements: Maximum number of statements to group into one commit, 0 for no limit.
+        :param max_interval_ms: Maximum age of the open batch in milliseconds, 0 for no limit.
+
+        :return: True if batching mode was started, False otherwise.
+        :rtype: bool
+        """
+
+        if self.batch_open or self.transaction_depth > 0:
+            return False
+
+        if not self.begin_transaction():
+            return False
+
+        self.batch_open = True
+        self.batch_max_statements = max_statements
+        self.batch_max_interval_ms = max_interval_ms
+        self.batch_pending = 0
+        self.batch_start_time = time.time()
+
+        return True
+
+    def check_batch(self):
+        """
+        Commits the open batch if either of its limits has been reached.
+
+        :return: True if the batch was committed, False otherwise.
+        :rtype: bool
+        """
+
+        if not self.batch_open or self.batch_pending == 0:
             return False
 
+        if self.batch_max_statements > 0 and self.batch_pending >= self.batch_max_statements:
+            return self.flush_batch()
+
+        if self.batch_max_interval_ms > 0:
+            elapsed_ms = (time.time() - self.batch_start_time) * 1000.0
+
+            if elapsed_ms >= self.batch_max_interval_ms:
+                return self.flush_batch()
+
+        return False
+
+    def flush_batch(self):
+        """
+        Commits all statements of the open batch and starts a new one.
+
+        :return: True if the batch was committed, False otherwise.
+        :rtype: bool
+        """
+
+        if not self.batch_open or self.transaction_depth > 0:
+            return False
+
+        self.conn_obj.commit()
+        self._execute_control(SqlUtils.build_begin_statement(self.dialect))
+
+        self.batch_pending = 0
+        self.batch_start_time = time.time()
+
+        return True
+
+    def end_batch(self, commit=True):
+        """
+        Ends write-batching mode, returning the connection to autocommit behaviour.
+
+        :param commit: If True, pending statements are committed, otherwise they are rolled back.
+
+        :return: True if batching mode was ended, False otherwise.
+        :rtype: bool
+        """
+
+        if not self.batch_open:
+            return False
+
+        self.batch_open = False
+        self.batch_pending = 0
+        self.batch_start_time = None
+
+        if commit:
+            return self.commit_transaction()
+
+        return self.rollback_transaction()
+
+    @contextlib.contextmanager
+    def batch(self, max_statements=1000, max_interval_ms=1000):
+        """
+        Runs the block in write-batching mode, see 'begin_batch'.
+
+        Pending statements are committed when the block exits normally. If an exception is raised within the
+        block, the statements not yet committed are rolled back and the exception is re-raised.
+
+        :param max_statements: Maximum number of statements to group into one commit, 0 for no limit.
+        :param max_interval_ms: Maximum age of the open batch in milliseconds, 0 for no limit.
+
+        :return: The current instance, for use within the block.
+        :rtype: MysqlUtils
+        """
+
+        if not self.begin_batch(max_statements, max_interval_ms):
+            raise RuntimeError("Unable to start batch, a transaction or batch is already open.")
+
+        try:
+            yield self
+        except Exception:
+            self.end_batch(commit=False)
+            raise
+        else:
+            self.end_batch()
+
+    def clone(self):
+        """
+        Creates a new, unconnected instance using the same connection settings and query instrument.
+
+        :return: The new instance.
+        :rtype: MysqlUtils
+        """
+
+        new_instance = MysqlUtils(self.db_host, self.db_user, self.db_pass, self.db_name, self.local_infile)
+        new_instance.instrument = self.instrument
+
+        return new_instance
+
+    def iterate_table_chunks(self, table_name, key_column, column_list=None, chunk_size=1000,
+                             start_after=None, end_at=None):
+        """
+        Iterates over all rows of a table in key order, one chunk of rows at a time.
+
+        Pages are fetched using keyset pagination (WHERE key > last ORDER BY key LIMIT n), so each page costs the
+        same regardless of how far into the table it lies, and no more than one chunk is held in memory.
+
+        :param table_name: The table whose rows are to be retrieved.
+        :param key_column: The unique, indexed column used to order and page through the rows.
+        :param column_list: The list of columns to retrieve, all columns if not supplied.
+        :param chunk_size: The number of rows to fetch per query.
+        :param start_after: Exclusive lower bound for the key column, to start after a known key.
+        :param end_at: Inclusive upper bound for the key column.
+
+        :return: Generator yielding lists of dictionaries, mapping field names to row values.
+        :rtype: generator
+        """
+
+        for field_list, query_res in self._iterate_keyset_pages(table_name, key_column, column_list, chunk_size,
+                                                                start_after, end_at):
+            yield [dict(zip(field_list, row)) for row in query_res]
+
+    def _iterate_keyset_pages(self, table_name, key_column, column_list, chunk_size, start_after, end_at):
+        """
+        Iterates over all rows of a table in key order, one page of row tuples at a time.
+
+        :return: Generator yielding tuples of the field names, in result set order, and the list of rows.
+        :rtype: generator
+        """
+
+        if column_list is not None and len(column_list) > 0 and key_column not in column_list:
+            column_list = list(column_list) + [key_column]
+
+        last_key = start_after
+        key_index = None
+
+        while True:
+            query_string = SqlUtils.build_keyset_select_query(table_name,
+                                                              key_column,
+                                                              column_list,
+                                                              chunk_size,
+                                                              has_lower_bound=last_key is not None,
+                                                              has_upper_bound=end_at is not None,
+                                                              placeholder=SqlUtils.get_placeholder(self.dialect))
+            param_list = []
+
+            if last_key is not None:
+                param_list.append(last_key)
+
+            if end_at is not None:
+                param_list.append(end_at)
+
+            cursor = self.conn_obj.cursor()
+            self._execute(cursor, query_string, param_list)
+
+            # obtain field names from the table and store in a list
+            name_to_index = [i[0] for i in cursor.description]
+
+            # extract results of the query from cursor
+            query_res = cursor.fetchall()
+            cursor.close()
+
+            if len(query_res) == 0:
+                return
+
+            if key_index is None:
+                key_index = name_to_index.index(key_column)
+
+            last_key = query_res[-1][key_index]
+
+            yield name_to_index, query_res
+
+            if len(query_res) < chunk_size:
+                return
+
+    def export_table(self, table_name, key_column, output_path, output_format="csv", column_list=None,
+                     chunk_size=1000, checkpoint_path=None, start_after=None, end_at=None):
+        """
+        Exports all rows of a table to a CSV or JSON-lines file, streaming one chunk at a time.
+
+        If a checkpoint path is supplied, the last exported key is recorded there after every chunk. An
+        interrupted export, restarted with the same arguments, resumes after that key and appends to the
+        existing output file.
+
+        :param table_name: The table whose rows are to be exported.
+        :param key_column: The unique, indexed column used to order and page through the rows.
+        :param output_path: The full path of the output file.
+        :param output_format: The output format, either 'csv' or 'jsonl'.
+        :param column_list: The list of columns to export, all columns if not supplied.
+        :param chunk_size: The number of rows to fetch per query.
+        :param checkpoint_path: The full path of the checkpoint file, if the export is to be resumable.
+        :param start_after: Exclusive lower bound for the key column.
+        :param end_at: Inclusive upper bound for the key column.
+
+        :return: Count of rows exported by this call, False if exception was raised.
+        :rtype: int
+
+        :raises ValueError: Raised if the output format is not supported.
+        """
+
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError("Unsupported output format: " + str(output_format))
+
+        try:
+            resuming = False
+
+            if checkpoint_path is not None and os.path.isfile(checkpoint_path):
+                with open(checkpoint_path, "r") as checkpoint_file:
+                    checkpoint = json.load(checkpoint_file)
+
+                start_after = checkpoint["last_key"]
+                resuming = True
+
+            row_count = 0
+            csv_writer = None
+
+            with open(output_path, "ab" if resuming else "wb") as output_file:
+                for field_list, query_res in self._iterate_keyset_pages(table_name, key_column, column_list,
+                                                                        chunk_size, start_after, end_at):
+                    if output_format == "csv":
+                        # the header follows the column order of the result set, so exports are reproducible
+                        if csv_writer is None:
+                            csv_writer = csv.writer(output_file)
+
+                            if not resuming:
+                                csv_writer.writerow(field_list)
+
+                        csv_writer.writerows(query_res)
+                    else:
+                        output_file.write("".join([json.dumps(dict(zip(field_list, row)), default=str) + "\n"
+                                                   for row in query_res]))
+
+                    row_count += len(query_res)
+
+                    if checkpoint_path is not None:
+                        output_file.flush()
+                        os.fsync(output_file.fileno())
+                        self._write_checkpoint(checkpoint_path, query_res[-1][field_list.index(key_column)])
+
+            return row_count
+        except Exception as ex:
+            return False
+
+    def export_table_parallel(self, table_name, key_column, output_path, output_format="csv", column_list=None,
+                              chunk_size=1000, checkpoint_path=None, range_count=4):
+        """
+        Exports all rows of a table by splitting its key space into disjoint ranges, exported concurrently.
+
+        Each range is exported on its own connection, to its own part file named after the output path
+        (output_path.part0, output_path.part1 ...), and is independently resumable through its own checkpoint.
+        The key column must be an integer column.
+
+        :param table_name: The table whose rows are to be exported.
+        :param key_column: The unique, indexed integer column used to split and page through the rows.
+        :param output_path: The full path from which part file names are derived.
+        :param output_format: The output format, either 'csv' or 'jsonl'.
+        :param column_list: The list of columns to export, all columns if not supplied.
+        :param chunk_size: The number of rows to fetch per query.
+        :param checkpoint_path: The full path from which part checkpoint file names are derived, if resumable.
+        :param range_count: The number of key ranges, and connections, to export concurrently.
+
+        :return: List of part file paths in key order, False if any range failed to export.
+        :rtype: list
+
+        :raises ValueError: Raised if the output format is not supported, or the range count is lower than 1.
+        """
+
+        from multiprocessing.pool import ThreadPool
+
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError("Unsupported output format: " + str(output_format))
+
+        if range_count < 1:
+            raise ValueError("Range count must be at least 1, not " + str(range_count))
+
+        try:
+            cursor = self.conn_obj.cursor()
+            self._execute(cursor, SqlUtils.build_key_range_query(table_name, key_column))
+            min_key, max_key = cursor.fetchall()[0]
+            cursor.close()
+        except Exception as ex:
+            return False
+
+        if min_key is None:
+            return []
+
+        min_key, max_key = int(min_key), int(max_key)
+        range_size = max((max_key - min_key + 1) // range_count, 1)
+
+        task_list = []
+        lower_bound = min_key - 1
+
+        for range_index in range(range_count):
+            if lower_bound >= max_key:
+                break
+
+            upper_bound = max_key if range_index == range_count - 1 else min(lower_bound + range_size, max_key)
+            part_checkpoint = None if checkpoint_path is None else checkpoint_path + ".part" + str(range_index)
+
+            task_list.append((output_path + ".part" + str(range_index), part_checkpoint, lower_bound, upper_bound))
+            lower_bound = upper_bound
+
+        def export_range(task):
+            part_path, part_checkpoint, range_start, range_end = task
+            range_conn = self.clone()
+
+            if not range_conn.connect():
+                return False
+
+            try:
+                return range_conn.export_table(table_name, key_column, part_path, output_format, column_list,
+                                               chunk_size, part_checkpoint, range_start, range_end)
+            finally:
+                range_conn.disconnect()
+
+        worker_pool = ThreadPool(len(task_list))
+
+        try:
+            result_list = worker_pool.map(export_range, task_list)
+        finally:
+            worker_pool.close()
+            worker_pool.join()
+
+        # a range exporting zero rows returns 0, which must not be mistaken for a failure
+        if any(result is False for result in result_list):
+            return False
+
+        return [task[0] for task in task_list]
+
+    def upsert_rows(self, table_name, row_iter, key_field_list, update_field_list=None, chunk_size=500):
+        """
+        Inserts rows into a table, updating the rows whose key already exists, in chunked multi-row statements.
+
+        This replaces a SELECT followed by an INSERT or UPDATE for every row with one statement per chunk.
+        All rows must be dictionaries with the same fields, and may be supplied through a generator.
+
+        Counts are obtained from the driver's statement info ("Records: N  Duplicates: D"), so that rows
+        which already held the supplied values are reported as UNCHANGED rather than UPDATED. If the driver
+        reports no info, as for single-row statements, rows left unchanged are counted as inserted.
+
+        Example of returned report:
+            {"ROWS": 1000, "INSERTED": 400, "UPDATED": 550, "UNCHANGED": 50}
+
+        :param table_name: The table into which rows are to be written.
+        :param row_iter: Iterable of dictionaries, mapping field names to values.
+        :param key_field_list: The list of fields forming the primary or unique key of the table.
+        :param update_field_list: The list of fields to overwrite on existing rows, all non-key fields if not
+                                  supplied.
+        :param chunk_size: The number of rows per statement.
+
+        :return: Dictionary with counts of rows written, inserted, updated and unchanged, False if exception
+                 was raised.
+        :rtype: dict
+        """
+
+        report = {"ROWS": 0,
+                  "INSERTED": 0,
+                  "UPDATED": 0,
+                  "UNCHANGED": 0}
+
+        try:
+            row_iter = iter(row_iter)
+            field_list = None
+
+            while True:
+                chunk = list(itertools.islice(row_iter, chunk_size))
+
+                if len(chunk) == 0:
+                    break
+
+                if field_list is None:
+                    field_list = list(chunk[0].keys())
+
+                inserted, updated, unchanged = self._upsert_chunk(table_name, field_list, key_field_list,
+                                                                  update_field_list, chunk)
+
+                report["ROWS"] += len(chunk)
+                report["INSERTED"] += inserted
+                report["UPDATED"] += updated
+                report["UNCHANGED"] += unchanged
+
+                if len(chunk) < chunk_size:
+                    break
+        except Exception as ex:
+            if self.transaction_depth > 0 or self.batch_open:
+                raise
+
+            return False
+
+        return report
+
+    def _upsert_chunk(self, table_name, field_list, key_field_list, update_field_list, chunk):
+        """
+        Writes one chunk of rows with a single upsert statement.
+
+        :return: Tuple of the counts of rows inserted, updated and left unchanged.
+        :rtype: tuple
+        """
+
+        statement_string = SqlUtils.build_upsert_query(table_name, field_list, len(chunk), key_field_list,
+                                                       update_field_list, self.dialect)
+        param_list = [row.get(field) for row in chunk for field in field_list]
+
+        cursor = self.conn_obj.cursor()
+        self._execute(cursor, statement_string, param_list)
+        affected_rows = cursor.rowcount
+        cursor.close()
+
+        # affected rows count 1 per inserted row, 2 per updated row and 0 per unchanged row
+        info_string = self.conn_obj.info() if hasattr(self.conn_obj, "info") else None
+        info_map = dict([(key.upper(), int(value)) for key, value in LOAD_INFO_PATTERN.findall(info_string or "")])
+
+        if "DUPLICATES" in info_map:
+            inserted = len(chunk) - info_map["DUPLICATES"]
+            updated = (affected_rows - inserted) // 2
+
+            return inserted, updated, info_map["DUPLICATES"] - updated
+
+        updated = max(affected_rows - len(chunk), 0)
+
+        return len(chunk) - updated, updated, 0
+
+    def bulk_load(self, table_name, row_iter, field_list=None, chunk_rows=100000, use_named_pipe=False,
+                  duplicate_mode=None):
+        """
+        Loads rows into a table using LOAD DATA LOCAL INFILE, encoding them to tab-separated data on the fly.
+
+        Rows may be supplied as any iterable, including generators, of value sequences or of dictionaries
+        (such as the reader returned by FileUtils.load_csv). Rows are never held in memory all at once:
+        - by default, they are written to a temporary file 'chunk_rows' rows at a time, and each chunk is
+          loaded with its own statement;
+        - with 'use_named_pipe', they are streamed through a named pipe (POSIX only) into a single statement,
+          so nothing is written to disk.
+
+        The connection must have been created with 'local_infile' enabled, and the server must allow it.
+
+        Example of returned report:
+            {"ROWS_SENT": 1000000, "ROWS_LOADED": 999990, "ROWS_REJECTED": 10, "WARNINGS": 10,
+             "BYTES_SENT": 48000000, "ELAPSED_SEC": 6.2, "ROWS_PER_SEC": 161290.3, "MB_PER_SEC": 7.38}
+
+        :param table_name: The table into which rows are to be loaded.
+        :param row_iter: Iterable of rows, as value sequences or dictionaries.
+        :param field_list: The list of columns the values of each row map to. Required for dictionary rows,
+                           unless they can be obtained from the reader or from the first row.
+        :param chunk_rows: The number of rows per temporary file, when not using a named pipe.
+        :param use_named_pipe: If True, streams all rows through a named pipe into one statement.
+        :param duplicate_mode: Handling of rows with duplicate keys, either 'IGNORE', 'REPLACE' or None (error).
+
+        :return: Dictionary reporting the row counts and throughput of the load, False if exception was raised.
+        :rtype: dict
+        """
+
+        report = {"ROWS_SENT": 0,
+                  "ROWS_LOADED": 0,
+                  "WARNINGS": 0,
+                  "BYTES_SENT": 0}
+        start_time = time.time()
+
+        try:
+            field_list, value_iter = MysqlUtils._prepare_bulk_rows(row_iter, field_list)
+
+            if use_named_pipe:
+                self._bulk_load_pipe(table_name, value_iter, field_list, duplicate_mode, report)
+            else:
+                self._bulk_load_chunks(table_name, value_iter, field_list, chunk_rows, duplicate_mode, report)
+        except Exception as ex:
+            if self.transaction_depth > 0 or self.batch_open:
+                raise
+
+            return False
+
+        return MysqlUtils._complete_load_report(report, start_time)
+
+    @staticmethod
+    def encode_tsv_row(value_list):
+        """
+        Encodes a sequence of values as one line of MySQL tab-separated data.
+
+        None is encoded as \\N, booleans as 1 or 0, floats with all their significant digits and unicode strings
+        as UTF-8. Backslashes, tabs, newlines, carriage returns and NUL characters within values are escaped with
+        a backslash.
+
+        :param value_list: The values of the row.
+
+        :return: The encoded line, including its terminating newline.
+        :rtype: str
+        """
+
+        field_list = []
+
+        for value in value_list:
+            if value is None:
+                field_list.append("\\N")
+                continue
+
+            if isinstance(value, unicode):
+                value = value.encode("utf-8")
+            elif isinstance(value, bool):
+                value = "1" if value else "0"
+            elif isinstance(value, float):
+                # str() rounds floats to 12 significant digits
+                value = repr(value)
+            elif not isinstance(value, str):
+                value = str(value)
+
+            field_list.append(TSV_ESCAPE_PATTERN.sub(MysqlUtils._escape_tsv_char, value))
+
+        return "\t".join(field_list) + "\n"
+
+    @staticmethod
+    def _escape_tsv_char(match):
+        """
+        Returns the escaped form of a character matched within a tab-separated field.
+
+        :param match: The match object of the character to be escaped.
+
+        :return: The escaped character.
+        :rtype: str
+        """
+
+        return TSV_ESCAPE_MAP[match.group(0)]
+
+    @staticmethod
+    def _prepare_bulk_rows(row_iter, field_list):
+        """
+        Resolves the field list of a row iterable and converts its rows into value sequences.
+
+        :param row_iter: Iterable of rows, as value sequences or dictionaries.
+        :param field_list: The list of columns the values of each row map to, if known.
+
+        :return: Tuple of the resolved field list (None if unknown) and an iterator of value sequences.
+        :rtype: tuple
+        """
+
+        row_iter = iter(row_iter)
+
+        if field_list is None:
+            # csv.DictReader exposes its header row
+            field_list = getattr(row_iter, "fieldnames", None)
+
+        first_row = next(row_iter, None)
+
+        if first_row is None:
+            return field_list, iter([])
+
+        row_iter = itertools.chain([first_row], row_iter)
+
+        if not isinstance(first_row, dict):
+            return field_list, row_iter
+
+        if field_list is None:
+            field_list = list(first_row.keys())
+
+        return field_list, ([row.get(field) for field in field_list] for row in row_iter)
+
+    @staticmethod
+    def _write_tsv_rows(output_file, value_iter, row_limit=None, abort_event=None):
+        """
+        Encodes rows as tab-separated data and writes them to a file.
+
+        :param output_file: The file object to write to.
+        :param value_iter: Iterator of value sequences.
+        :param row_limit: Maximum number of rows to write, all remaining rows if not supplied.
+        :param abort_event: Optional event which stops the writing when set.
+
+        :return: Tuple of the count of rows and bytes written.
+        :rtype: tuple
+        """
+
+        row_count = 0
+        byte_count = 0
+
+        if row_limit is not None:
+            value_iter = itertools.islice(value_iter, row_limit)
+
+        for value_list in value_iter:
+            if abort_event is not None and abort_event.is_set():
+                break
+
+            line = MysqlUtils.encode_tsv_row(value_list)
+            output_file.write(line)
+
+            row_count += 1
+            byte_count += len(line)
+
+        return row_count, byte_count
+
+    def _bulk_load_chunks(self, table_name, value_iter, field_list, chunk_rows, duplicate_mode, report):
+        """
+        Loads rows through a sequence of temporary files, holding at most one chunk of rows on disk.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        while True:
+            temp_file = tempfile.NamedTemporaryFile(mode="wb", suffix=".tsv", delete=False)
+
+            try:
+                row_count, byte_count = MysqlUtils._write_tsv_rows(temp_file, value_iter, chunk_rows)
+                temp_file.close()
+
+                if row_count == 0:
+                    break
+
+                report["ROWS_SENT"] += row_count
+                report["BYTES_SENT"] += byte_count
+
+                self._load_data_file(table_name, temp_file.name, field_list, duplicate_mode, report)
+            finally:
+                temp_file.close()
+                os.remove(temp_file.name)
+
+            if row_count < chunk_rows:
+                break
+
+    def _bulk_load_pipe(self, table_name, value_iter, field_list, duplicate_mode, report):
+        """
+        Loads rows through a named pipe, fed by a writer thread while the server reads from it.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        pipe_dir = tempfile.mkdtemp()
+        pipe_path = os.path.join(pipe_dir, "bulk_load.tsv")
+        os.mkfifo(pipe_path)
+
+        writer_state = {"ROWS": 0, "BYTES": 0, "ERROR": None}
+        abort_event = threading.Event()
+
+        def write_pipe():
+            try:
+                with open(pipe_path, "wb") as pipe_file:
+                    writer_state["ROWS"], writer_state["BYTES"] = MysqlUtils._write_tsv_rows(pipe_file,
+                                                                                             value_iter,
+                                                                                             abort_event=abort_event)
+            except Exception as ex:
+                writer_state["ERROR"] = ex
+
+        writer_thread = threading.Thread(target=write_pipe)
+        writer_thread.daemon = True
+        writer_thread.start()
+
+        try:
+            self._load_data_file(table_name, pipe_path, field_list, duplicate_mode, report)
+        finally:
+            if writer_thread.is_alive():
+                # the statement failed before reading all data, so unblock and drain the writer
+                abort_event.set()
+                drain_fd = os.open(pipe_path, os.O_RDONLY | os.O_NONBLOCK)
+
+                try:
+                    while writer_thread.is_alive():
+                        try:
+                            os.read(drain_fd, 65536)
+                        except OSError:
+                            pass
+
+                        writer_thread.join(0.01)
+                finally:
+                    os.close(drain_fd)
+
+            writer_thread.join()
+            os.remove(pipe_path)
+            os.rmdir(pipe_dir)
+
+        if writer_state["ERROR"] is not None:
+            raise writer_state["ERROR"]
+
+        report["ROWS_SENT"] += writer_state["ROWS"]
+        report["BYTES_SENT"] += writer_state["BYTES"]
+
+    def _load_data_file(self, table_name, file_path, field_list, duplicate_mode, report):
+        """
+        Runs a LOAD DATA LOCAL INFILE statement for one data file and adds its counters to the report.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        cursor = self.conn_obj.cursor()
+        self._execute(cursor, SqlUtils.build_load_data_statement(table_name, file_path, field_list, duplicate_mode))
+        affected_rows = cursor.rowcount
+        cursor.close()
+
+        # the driver reports e.g. "Records: 100  Deleted: 0  Skipped: 2  Warnings: 2"
+        info_string = self.conn_obj.info() if hasattr(self.conn_obj, "info") else None
+        info_map = dict([(key.upper(), int(value)) for key, value in LOAD_INFO_PATTERN.findall(info_string or "")])
+
+        report["ROWS_LOADED"] += info_map.get("RECORDS", affected_rows) - info_map.get("SKIPPED", 0)
+        report["WARNINGS"] += info_map.get("WARNINGS", 0)
+
+    @staticmethod
+    def _complete_load_report(report, start_time):
+        """
+        Adds rejected row count and throughput figures to a bulk load report.
+
+        :param report: The report holding the row and byte counters of the load.
+        :param start_time: The time at which the load was started.
+
+        :return: The completed report.
+        :rtype: dict
+        """
+
+        elapsed_sec = max(time.time() - start_time, 1e-6)
+
+        report["ROWS_REJECTED"] = report["ROWS_SENT"] - report["ROWS_LOADED"]
+        report["ELAPSED_SEC"] = round(elapsed_sec, 3)
+        report["ROWS_PER_SEC"] = round(report["ROWS_SENT"] / elapsed_sec, 1)
+        report["MB_PER_SEC"] = round(report["BYTES_SENT"] / elapsed_sec / (1024.0 * 1024.0), 2)
+
+        return report
+
+    @staticmethod
+    def _write_checkpoint(checkpoint_path, last_key):
+        """
+        Atomically records the last exported key in the checkpoint file.
+
+        :param checkpoint_path: The full path of the checkpoint file.
+        :param last_key: The last key written to the output file.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        temp_path = checkpoint_path + ".tmp"
+
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"last_key": last_key}, checkpoint_file, default=str)
+
+        os.rename(temp_path, checkpoint_path)
+
+    def _execute_control(self, statement_string):
+        """
+        Executes a transaction control statement, letting any error propagate to the caller.
+
+        :param statement_string: The statement to be executed.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        cursor = self.conn_obj.cursor()
+        self._execute(cursor, statement_string)
+        cursor.close()
+
+    def set_instrument(self, instrument):
+        """
+        Attaches a query instrument, which is notified of the latency and row count of every executed query.
+
+        The instrument may be a QueryInstrument or any object exposing compatible 'record_query', 'is_slow'
+        and 'capture_explain' members. Supplying None detaches the current instrument.
+
+        :param instrument: The instrument to be attached.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        self.instrument = instrument
+
+    def _execute(self, cursor, query_string, param_list=None):
+        """
+        Executes a query on the supplied cursor, timing it if an instrument is attached.
+
+        :param cursor: The cursor on which the query is to be executed.
+        :param query_string: The query to be executed.
+        :param param_list: Optional sequence of values to bind to the placeholders within the query.
+
+        :return: The value returned by the cursor.
+        """
+
+        if self.instrument is None:
+            if param_list is None:
+                return cursor.execute(query_string)
+
+            return cursor.execute(query_string, param_list)
+
+        return self._execute_instrumented(cursor, query_string, param_list)
+
+    def _execute_instrumented(self, cursor, query_string, param_list=None):
+        """
+        Executes a query on the supplied cursor and reports its latency and row count to the attached instrument.
+
+        The timing covers transferring the result set to the client, which the driver performs on execution.
+        Queries which raise an error are reported as errors, with the time elapsed until the error.
+        Slow SELECT queries have their EXPLAIN output captured if the instrument requests it.
+
+        :param cursor: The cursor on which the query is to be executed.
+        :param query_string: The query to be executed.
+        :param param_list: Optional sequence of values to bind to the placeholders within the query.
+
+        :return: The value returned by the cursor.
+        """
+
+        start_time = time.time()
+
+        try:
+            if param_list is None:
+                execute_res = cursor.execute(query_string)
+            else:
+                execute_res = cursor.execute(query_string, param_list)
+        except Exception:
+            # failed and timed out queries count towards the latency statistics too
+            self.instrument.record_query(query_string, (time.time() - start_time) * 1000.0, None, is_error=True)
+            raise
+
+        elapsed_ms = (time.time() - start_time) * 1000.0
+        explain_rows = None
+
+        if self.instrument.capture_explain and self.instrument.is_slow(elapsed_ms) and \
+                query_string.lstrip().lower().startswith("select"):
+            try:
+                explain_cursor = self.conn_obj.cursor()
+
+                explain_query = SqlUtils.build_explain_query(query_string, self.dialect)
+
+                if param_list is None:
+                    explain_cursor.execute(explain_query)
+                else:
+                    explain_cursor.execute(explain_query, param_list)
+
+                explain_rows = explain_cursor.fetchall()
+                explain_cursor.close()
+            except Exception as ex:
+                explain_rows = None
+
+        self.instrument.record_query(query_string, elapsed_ms, cursor.rowcount, explain_rows)
+
+        return execute_res
+
     def disconnect(self):
         """
         Disconnect from the currently connected database.
@@ -0,0 +1,220 @@
+"""
+Utility module to record timings and statistics of executed SQL queries.
+"""
+
+import re
+import bisect
+import threading
+import collections
+
+from utilbox.os_utils import SysUtils
+from utilbox.os_utils import FileUtils
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# patterns used to reduce a query to its fingerprint, applied in order
+FINGERPRINT_PATTERNS = [(re.compile(r"/\*.*?\*/", re.DOTALL), " "),
+                        (re.compile(r"(--|#)[^\n]*"), " "),
+                        (re.compile(r"'(?:[^'\\]|\\.|'')*'"), "?"),
+                        (re.compile(r'"(?:[^"\\]|\\.|"")*"'), "?"),
+                        (re.compile(r"%(?:\(\w+\))?s"), "?"),
+                        (re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE), "?"),
+                        (re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE), "?"),
+                        (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(?+)"),
+                        (re.compile(r"\b(in\s*)\(\s*\?\s*\)", re.IGNORECASE), r"\1(?+)"),
+                        (re.compile(r"\((\?\+?)\)(?:\s*,\s*\(\1\))+"), r"(\1)"),
+                        (re.compile(r"\s+"), " ")]
+
+# upper bounds, in milliseconds, of the latency histogram buckets; the last bucket is unbounded
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class QueryInstrument:
+    """
+    Utility class which collects per-query statistics for a database connection.
+
+    Queries are grouped by fingerprint, i.e. the query text with literal values replaced by '?', so that
+    queries differing only in their values share one set of statistics.
+    For each fingerprint, it keeps the execution and error counts, total and maximum latency, row count and a
+    latency histogram. Queries slower than the configured threshold are additionally written to the slow-query log.
+
+    An instance is attached to a connection using 'MysqlUtils.set_instrument'. Any object exposing the same
+    'record_query' method can be attached instead, to forward timings elsewhere.
+    """
+
+    def __init__(self, slow_query_threshold_ms=1000, slow_query_log_path=None, capture_explain=False,
+                 slow_query_history=100):
+        """
+        :param slow_query_threshold_ms: Latency, in milliseconds, above which a query is considered slow.
+        :param slow_query_log_path: The full path of the slow-query log file, None to keep slow queries in memory only.
+        :param capture_explain: If True, the EXPLAIN output of slow SELECT queries is captured along with them.
+        :param slow_query_history: Number of most recent slow queries to keep in memory.
+        """
+
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.slow_query_log_path = slow_query_log_path
+        self.capture_explain = capture_explain
+
+        self.stats_map = {}
+        self.fingerprint_cache = {}
+        self.fingerprint_cache_size = 10000
+        self.slow_queries = collections.deque(maxlen=slow_query_history)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(query_string):
+        """
+        Normalizes a query into its fingerprint, by removing comments, replacing literal values and '%s'
+        placeholders with '?', collapsing value lists, repeated row groups and whitespace, and lower-casing the
+        result. Queries built for any number of list values or rows, as by the upsert and bulk load methods,
+        therefore share one fingerprint.
+
+        Example:
+            "SELECT * FROM users WHERE id IN (1, 2, 3) AND name='bob'" becomes
+            "select * from users where id in (?+) and name=?"
+
+        :param query_string: The query to be normalized.
+
+        :return: The query fingerprint.
+        :rtype: str
+        """
+
+        for pattern, replacement in FINGERPRINT_PATTERNS:
+            query_string = pattern.sub(replacement, query_string)
+
+        return query_string.strip().rstrip(";").strip().lower()
+
+    def is_slow(self, elapsed_ms):
+        """
+        Checks if the supplied latency exceeds the slow-query threshold.
+
+        :param elapsed_ms: The query latency in milliseconds.
+
+        :return: True if the query is considered slow, False otherwise.
+        :rtype: bool
+        """
+
+        return elapsed_ms >= self.slow_query_threshold_ms
+
+    def record_query(self, query_string, elapsed_ms, row_count, explain_rows=None, is_error=False):
+        """
+        Records a single execution of a query.
+
+        :param query_string: The executed query.
+        :param elapsed_ms: The time taken to execute the query, in milliseconds.
+        :param row_count: The number of rows returned or affected by the query, None if it failed.
+        :param explain_rows: The EXPLAIN output of the query, if it was captured.
+        :param is_error: If True, the query raised an error, such as a timeout, after the elapsed time.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        with self.lock:
+            query_fingerprint = self.fingerprint_cache.get(query_string)
+
+            if query_fingerprint is None:
+                query_fingerprint = QueryInstrument.fingerprint(query_string)
+
+                if len(self.fingerprint_cache) >= self.fingerprint_cache_size:
+                    self.fingerprint_cache.clear()
+
+                self.fingerprint_cache[query_string] = query_fingerprint
+
+            query_stats = self.stats_map.get(query_fingerprint)
+
+            if query_stats is None:
+                query_stats = {"FINGERPRINT": query_fingerprint,
+                               "COUNT": 0,
+                               "ERRORS": 0,
+                               "TOTAL_MS": 0.0,
+                               "MAX_MS": 0.0,
+                               "ROWS": 0,
+                               "HISTOGRAM": [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)}
+                self.stats_map[query_fingerprint] = query_stats
+
+            query_stats["COUNT"] += 1
+
+            if is_error:
+                query_stats["ERRORS"] += 1
+            query_stats["TOTAL_MS"] += elapsed_ms
+            query_stats["MAX_MS"] = max(query_stats["MAX_MS"], elapsed_ms)
+            query_stats["HISTOGRAM"][bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+
+            if row_count is not None and row_count > 0:
+                query_stats["ROWS"] += row_count
+
+        if self.is_slow(elapsed_ms):
+            self.log_slow_query(query_string, elapsed_ms, row_count, explain_rows)
+
+    def log_slow_query(self, query_string, elapsed_ms, row_count, explain_rows=None):
+        """
+        Adds a query to the in-memory slow-query history, and writes it to the slow-query log file if configured.
+
+        :param query_string: The executed query.
+        :param elapsed_ms: The time taken to execute the query, in milliseconds.
+        :param row_count: The number of rows returned or affected by the query.
+        :param explain_rows: The EXPLAIN output of the query, if it was captured.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        timestamp = SysUtils.get_timestamp("%Y-%m-%d %H:%M:%S")
+
+        self.slow_queries.append({"TIMESTAMP": timestamp,
+                                  "QUERY": query_string,
+                                  "ELAPSED_MS": elapsed_ms,
+                                  "ROWS": row_count,
+                                  "EXPLAIN": explain_rows})
+
+        if self.slow_query_log_path is not None:
+            log_entry = timestamp + " : " + ("%.3f" % elapsed_ms) + " ms : " + str(row_count) + " rows : " + \
+                        " ".join(query_string.split()) + "\n"
+
+            if explain_rows is not None:
+                for explain_row in explain_rows:
+                    log_entry += "    EXPLAIN " + str(explain_row) + "\n"
+
+            with self.lock:
+                FileUtils.write_to_file(self.slow_query_log_path, log_entry)
+
+    def get_stats(self, sort_key="TOTAL_MS"):
+        """
+        Returns the statistics collected so far, one dictionary per query fingerprint.
+
+        Each dictionary contains the keys FINGERPRINT, COUNT, ERRORS, TOTAL_MS, MAX_MS, AVG_MS, ROWS and
+        HISTOGRAM, where COUNT includes the executions which failed, counted in ERRORS, and HISTOGRAM is a list of (upper bound in ms, count) pairs, the last bound being None (unbounded).
+
+        :param sort_key: The key on which to sort the results, in descending order.
+
+        :return: List of statistics dictionaries.
+        :rtype: list
+        """
+
+        bound_list = HISTOGRAM_BOUNDS_MS + [None]
+        stats_list = []
+
+        with self.lock:
+            for query_stats in self.stats_map.values():
+                stats_entry = dict(query_stats)
+                stats_entry["AVG_MS"] = query_stats["TOTAL_MS"] / query_stats["COUNT"]
+                stats_entry["HISTOGRAM"] = zip(bound_list, query_stats["HISTOGRAM"])
+                stats_list.append(stats_entry)
+
+        return sorted(stats_list, key=lambda entry: entry[sort_key], reverse=True)
+
+    def reset(self):
+        """
+        Discards all statistics and slow queries collected so far.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        with self.lock:
+            self.stats_map.clear()
+            self.fingerprint_cache.clear()
+            self.slow_queries.clear()
@@ -0,0 +1,326 @@
+"""
+Utility module to split reads and writes across a primary database and its read replicas.
+"""
+
+import re
+import time
+import itertools
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# SELECT queries which take locks or write data, and must therefore run on the primary
+LOCKING_READ_PATTERN = re.compile(r"\bfor\s+update\b|\block\s+in\s+share\s+mode\b|\bfor\s+share\b|\binto\b",
+                                  re.IGNORECASE)
+
+
+class ReplicaRouter:
+    """
+    Utility class which routes queries between a primary database and a pool of read replicas.
+
+    Plain SELECT queries are sent to a healthy replica, chosen either in turn ('round_robin') or by lowest
+    observed latency ('least_latency'). Writes, locking reads and every query issued while a transaction or
+    batch is open on the primary are sent to the primary.
+
+    After a write, reads can be kept on the primary for a short stickiness window, so that a client reads its
+    own writes even if the replicas lag behind.
+
+    Replicas are dropped from rotation when a query on them fails, or when a health check finds them lagging
+    by more than the allowed replication delay, and are returned to rotation by a later successful check.
+    Health checks run as part of routing, at most once per check interval, so no background thread is needed.
+
+    Like MysqlUtils, an instance is meant to be used by a single thread at a time.
+    """
+
+    def __init__(self, primary, replica_list, balance_mode="round_robin", sticky_window_ms=0,
+                 max_replica_lag_sec=30, health_check_interval_sec=10):
+        """
+        :param primary: The MysqlUtils instance of the primary database.
+        :param replica_list: List of MysqlUtils instances, one per read replica.
+        :param balance_mode: Replica selection mode, either 'round_robin' or 'least_latency'.
+        :param sticky_window_ms: Duration after a write during which reads are sent to the primary, 0 to disable.
+        :param max_replica_lag_sec: Replication delay above which a replica is dropped, None to ignore delay.
+        :param health_check_interval_sec: Minimum interval between replica health checks.
+        """
+
+        self.primary = primary
+        self.replica_list = list(replica_list)
+        self.balance_mode = balance_mode
+        self.sticky_window_ms = sticky_window_ms
+        self.max_replica_lag_sec = max_replica_lag_sec
+        self.health_check_interval_sec = health_check_interval_sec
+
+        self.last_write_time = None
+        self.last_health_check_time = None
+        self.replica_cycle = itertools.cycle(range(len(self.replica_list)))
+        self.replica_health = [{"HEALTHY": False,
+                                "LATENCY_MS": None,
+                                "LAG_SEC": None,
+                                "ERRORS": 0,
+                                "QUERIES": 0} for _ in self.replica_list]
+
+    def connect(self):
+        """
+        Connects to the primary and to all replicas. Replicas which fail to connect are left out of rotation.
+
+        :return: True if the connection to the primary was successful, False otherwise.
+        :rtype: bool
+        """
+
+        if not self.primary.connect():
+            return False
+
+        for replica_index, replica in enumerate(self.replica_list):
+            self.replica_health[replica_index]["HEALTHY"] = replica.connect()
+
+        self.check_replica_health()
+
+        return True
+
+    def disconnect(self):
+        """
+        Disconnects from the primary and from all replicas.
+
+        :return: True if the primary was disconnected, False otherwise.
+        :rtype: bool
+        """
+
+        for replica in self.replica_list:
+            replica.disconnect()
+
+        return self.primary.disconnect()
+
+    @staticmethod
+    def is_read_query(query_string):
+        """
+        Checks if a query only reads data and may therefore be run on a replica.
+
+        :param query_string: The query to be verified.
+
+        :return: True if the query is a non-locking SELECT, False otherwise.
+        :rtype: bool
+        """
+
+        stripped_query = query_string.lstrip()
+
+        if stripped_query[:6].lower() != "select":
+            return False
+
+        return LOCKING_READ_PATTERN.search(stripped_query) is None
+
+    def get_connection(self, query_string):
+        """
+        Returns the connection on which the supplied query should be run.
+
+        :param query_string: The query to be routed.
+
+        :return: The primary or a replica instance.
+        :rtype: MysqlUtils
+        """
+
+        replica_index = self._select_replica(query_string)
+
+        if replica_index is None:
+            return self.primary
+
+        return self.replica_list[replica_index]
+
+    def run_query(self, query_string):
+        """
+        Runs a query on the routed connection, see MysqlUtils.run_query.
+        """
+
+        return self._run_routed("run_query", query_string)
+
+    def fetch_row_count(self, query_string):
+        """
+        Returns count of rows received after executing the query on the routed connection,
+        see MysqlUtils.fetch_row_count.
+        """
+
+        return self._run_routed("fetch_row_count", query_string)
+
+    def fetch_row_by_query(self, query_string):
+        """
+        Retrieves a single row using the routed connection, see MysqlUtils.fetch_row_by_query.
+        """
+
+        return self._run_routed("fetch_row_by_query", query_string)
+
+    def execute_statement(self, statement_string, param_list=None):
+        """
+        Executes a data-modifying statement on the primary, see MysqlUtils.execute_statement.
+        """
+
+        self.last_write_time = time.time()
+
+        return self.primary.execute_statement(statement_string, param_list)
+
+    def upsert_rows(self, table_name, row_iter, key_field_list, update_field_list=None, chunk_size=500):
+        """
+        Upserts rows on the primary, see MysqlUtils.upsert_rows.
+        """
+
+        self.last_write_time = time.time()
+
+        return self.primary.upsert_rows(table_name, row_iter, key_field_list, update_field_list, chunk_size)
+
+    def bulk_load(self, table_name, row_iter, field_list=None, chunk_rows=100000, use_named_pipe=False,
+                  duplicate_mode=None):
+        """
+        Bulk loads rows on the primary, see MysqlUtils.bulk_load.
+        """
+
+        self.last_write_time = time.time()
+
+        return self.primary.bulk_load(table_name, row_iter, field_list, chunk_rows, use_named_pipe, duplicate_mode)
+
+    def transaction(self):
+        """
+        Opens a transaction on the primary, see MysqlUtils.transaction. All queries within it run on the primary.
+        """
+
+        self.last_write_time = time.time()
+
+        return self.primary.transaction()
+
+    def batch(self, max_statements=1000, max_interval_ms=1000):
+        """
+        Opens a write batch on the primary, see MysqlUtils.batch. All queries within it run on the primary.
+        """
+
+        self.last_write_time = time.time()
+
+        return self.primary.batch(max_statements, max_interval_ms)
+
+    def check_replica_health(self):
+        """
+        Checks connectivity and replication delay of every replica, updating which replicas are in rotation.
+
+        Replicas which cannot be queried are reconnected once. The delay is read from the Seconds_Behind_Master
+        field of SHOW SLAVE STATUS, and a replica whose replication is stopped is treated as lagging.
+
+        :return: Count of healthy replicas.
+        :rtype: int
+        """
+
+        self.last_health_check_time = time.time()
+
+        for replica_index, replica in enumerate(self.replica_list):
+            health = self.replica_health[replica_index]
+            slave_status = replica.fetch_row_by_query("SHOW SLAVE STATUS;") if replica.conn_obj else False
+
+            if slave_status is False and replica.connect():
+                slave_status = replica.fetch_row_by_query("SHOW SLAVE STATUS;")
+
+            if slave_status is False:
+                health["HEALTHY"] = False
+                continue
+
+            health["LAG_SEC"] = slave_status.get("Seconds_Behind_Master")
+            health["ERRORS"] = 0
+
+            if self.max_replica_lag_sec is None:
+                health["HEALTHY"] = True
+            else:
+                health["HEALTHY"] = health["LAG_SEC"] is not None and health["LAG_SEC"] <= self.max_replica_lag_sec
+
+        return len([health for health in self.replica_health if health["HEALTHY"]])
+
+    def get_replica_health(self):
+        """
+        Returns the health status of every replica, in the order the replicas were supplied.
+
+        Each dictionary contains the keys HEALTHY, LATENCY_MS (moving average), LAG_SEC, ERRORS and QUERIES.
+
+        :return: List of health status dictionaries.
+        :rtype: list
+        """
+
+        return [dict(health) for health in self.replica_health]
+
+    def _select_replica(self, query_string):
+        """
+        Selects the replica on which a query should be run.
+
+        :param query_string: The query to be routed.
+
+        :return: Index of the selected replica, None if the query should run on the primary.
+        :rtype: int
+        """
+
+        if not ReplicaRouter.is_read_query(query_string):
+            self.last_write_time = time.time()
+            return None
+
+        if self.primary.transaction_depth > 0 or self.primary.batch_open:
+            return None
+
+        current_time = time.time()
+
+        if self.sticky_window_ms > 0 and self.last_write_time is not None and \
+                (current_time - self.last_write_time) * 1000.0 < self.sticky_window_ms:
+            return None
+
+        if self.last_health_check_time is None or \
+                current_time - self.last_health_check_time >= self.health_check_interval_sec:
+            self.check_replica_health()
+
+        healthy_list = [replica_index for replica_index, health in enumerate(self.replica_health)
+                        if health["HEALTHY"]]
+
+        if len(healthy_list) == 0:
+            return None
+
+        if self.balance_mode == "least_latency":
+            # replicas without a latency sample yet are tried first
+            return min(healthy_list, key=lambda replica_index: (self.replica_health[replica_index]["LATENCY_MS"]
+                                                                is not None,
+                                                                self.replica_health[replica_index]["LATENCY_MS"]))
+
+        for _ in range(len(self.replica_list)):
+            replica_index = next(self.replica_cycle)
+
+            if self.replica_health[replica_index]["HEALTHY"]:
+                return replica_index
+
+        return None
+
+    def _run_routed(self, method_name, query_string):
+        """
+        Runs a query method on the routed connection, falling back to the primary if the replica fails.
+
+        :param method_name: The name of the MysqlUtils method to be called.
+        :param query_string: The query to be run.
+
+        :return: The value returned by the method.
+        """
+
+        replica_index = self._select_replica(query_string)
+
+        if replica_index is None:
+            return getattr(self.primary, method_name)(query_string)
+
+        replica = self.replica_list[replica_index]
+        health = self.replica_health[replica_index]
+        start_time = time.time()
+        query_res = getattr(replica, method_name)(query_string)
+        elapsed_ms = (time.time() - start_time) * 1000.0
+
+        if replica.last_error is not None:
+            # False is also returned for empty results, so failures are detected through the recorded exception,
+            # and the replica is taken out until the next health check
+            health["ERRORS"] += 1
+            health["HEALTHY"] = False
+
+            return getattr(self.primary, method_name)(query_string)
+
+        health["QUERIES"] += 1
+
+        if health["LATENCY_MS"] is None:
+            health["LATENCY_MS"] = elapsed_ms
+        else:
+            health["LATENCY_MS"] = 0.8 * health["LATENCY_MS"] + 0.2 * elapsed_ms
+
+        return query_res
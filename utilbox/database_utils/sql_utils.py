@@ -2,10 +2,30 @@
 Utility module to work with SQL queries.
 """
 
+import re
+
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
 __status__ = "Alpha"
 
+# syntax differences between the supported SQL dialects
+DIALECT_MAP = {
+    "mysql": {
+        "placeholder": "%s",
+        "begin": "START TRANSACTION;",
+        "explain": "EXPLAIN "
+    },
+    "sqlite": {
+        "placeholder": "?",
+        "begin": "BEGIN;",
+        "explain": "EXPLAIN QUERY PLAN "
+    }
+}
+
+# tokens of a parameterized query which are rewritten between dialects; string literals are matched so that the
+# placeholders within them are left unchanged
+PLACEHOLDER_TOKEN_PATTERN = re.compile(r"""'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|%%|%s""")
+
 
 class SqlUtils:
     """
@@ -242,3 +262,296 @@ class SqlUtils:
         statement_string += clause_string + ";"
 
         return statement_string
+
+    @staticmethod
+    def get_dialect_syntax(dialect, element):
+        """
+        Returns the syntax of a language element in the specified SQL dialect.
+
+        :param dialect: The SQL dialect, either 'mysql' or 'sqlite'.
+        :param element: The language element, one of 'placeholder', 'begin' or 'explain'.
+
+        :return: The dialect-specific syntax of the element.
+        :rtype: str
+
+        :raises ValueError: Raised if the dialect is not supported.
+        """
+
+        if dialect not in DIALECT_MAP:
+            raise ValueError("Unsupported SQL dialect: " + str(dialect))
+
+        return DIALECT_MAP[dialect][element]
+
+    @staticmethod
+    def get_placeholder(dialect="mysql"):
+        """
+        Returns the parameter placeholder used by the database driver of the specified SQL dialect.
+
+        :param dialect: The SQL dialect, either 'mysql' or 'sqlite'.
+
+        :return: The parameter placeholder.
+        :rtype: str
+        """
+
+        return SqlUtils.get_dialect_syntax(dialect, "placeholder")
+
+    @staticmethod
+    def render_placeholders(query_string, dialect="mysql"):
+        """
+        Rewrites the '%s' placeholders of a query written for MySQLdb into the placeholders of the specified SQL
+        dialect, outside of string literals. For dialects which do not use '%s' placeholders, '%%' signs, which
+        MySQLdb unescapes within parameterized queries, are unescaped as well.
+
+        :param query_string: The parameterized query, using '%s' placeholders.
+        :param dialect: The SQL dialect, either 'mysql' or 'sqlite'.
+
+        :return: The query string to be executed.
+        :rtype: str
+        """
+
+        placeholder = SqlUtils.get_placeholder(dialect)
+
+        if placeholder == "%s" or "%" not in query_string:
+            return query_string
+
+        def render_token(match):
+            token = match.group(0)
+
+            if token == "%s":
+                return placeholder
+
+            return token.replace("%%", "%")
+
+        return PLACEHOLDER_TOKEN_PATTERN.sub(render_token, query_string)
+
+    @staticmethod
+    def build_begin_statement(dialect="mysql"):
+        """
+        Builds the statement which opens an explicit transaction.
+
+        :param dialect: The SQL dialect, either 'mysql' or 'sqlite'.
+
+        :return: The statement string to be executed.
+        :rtype: str
+        """
+
+        return SqlUtils.get_dialect_syntax(dialect, "begin")
+
+    @staticmethod
+    def build_explain_query(query_string, dialect="mysql"):
+        """
+        Builds the query which reports the execution plan of the supplied query.
+
+        :param query_string: The query whose execution plan is required.
+        :param dialect: The SQL dialect, either 'mysql' or 'sqlite'.
+
+        :return: The query string to be executed.
+        :rtype: str
+        """
+
+        return SqlUtils.get_dialect_syntax(dialect, "explain") + query_string
+
+    @staticmethod
+    def build_savepoint_statement(savepoint_name):
+        """
+        Builds the statement which marks a named savepoint within the current transaction.
+
+        :param savepoint_name: The name of the savepoint to be created.
+
+        :return: The statement string to be executed.
+        :rtype: str
+        """
+
+        return "SAVEPOINT " + str(savepoint_name) + ";"
+
+    @staticmethod
+    def build_rollback_to_savepoint_statement(savepoint_name):
+        """
+        Builds the statement which discards all changes made after the named savepoint.
+
+        :param savepoint_name: The name of the savepoint to roll back to.
+
+        :return: The statement string to be executed.
+        :rtype: str
+        """
+
+        return "ROLLBACK TO SAVEPOINT " + str(savepoint_name) + ";"
+
+    @staticmethod
+    def build_release_savepoint_statement(savepoint_name):
+        """
+        Builds the statement which removes the named savepoint, keeping the changes made after it.
+
+        :param savepoint_name: The name of the savepoint to be released.
+
+        :return: The statement string to be executed.
+        :rtype: str
+        """
+
+        return "RELEASE SAVEPOINT " + str(savepoint_name) + ";"
+
+    @staticmethod
+    def build_keyset_select_query(table_name,
+                                  key_column,
+                                  column_list=None,
+                                  chunk_size=1000,
+                                  has_lower_bound=False,
+                                  has_upper_bound=False,
+                                  placeholder="%s"):
+        """
+        Combines required components to form a keyset-paginated SQL SELECT query.
+
+        Rows are ordered on the key column and the previous page is skipped through a WHERE condition on the
+        last key seen, so every page costs the same index range scan, unlike LIMIT/OFFSET pagination.
+
+        Example:
+            SELECT id, name FROM users WHERE id > %s ORDER BY id LIMIT 1000;
+
+        :param table_name: The name of table on which query is to be executed.
+        :param key_column: The unique, indexed column used to order and page through the rows.
+        :param column_list: The list of columns whose data is to be retrieved.
+        :param chunk_size: The maximum number of rows to be returned by the query.
+        :param has_lower_bound: If True, adds an exclusive lower bound placeholder for the key column.
+        :param has_upper_bound: If True, adds an inclusive upper bound placeholder for the key column.
+        :param placeholder: The parameter placeholder used by the database driver.
+
+        :return: The final query string to be executed, with bound values supplied separately.
+        :rtype: str
+        """
+
+        if column_list is None or len(column_list) == 0:
+            column_string = "*"
+        else:
+            column_string = ", ".join([str(column) for column in column_list])
+
+        condition_list = []
+
+        if has_lower_bound:
+            condition_list.append(str(key_column) + " > " + placeholder)
+
+        if has_upper_bound:
+            condition_list.append(str(key_column) + " <= " + placeholder)
+
+        query_string = "SELECT " + column_string + " FROM " + str(table_name)
+
+        if len(condition_list) > 0:
+            query_string += " WHERE " + " AND ".join(condition_list)
+
+        query_string += " ORDER BY " + str(key_column) + " LIMIT " + str(int(chunk_size)) + ";"
+
+        return query_string
+
+    @staticmethod
+    def build_key_range_query(table_name, key_column):
+        """
+        Combines required components to form an SQL query returning the lowest and highest values of a key column.
+
+        Example:
+            SELECT MIN(id), MAX(id) FROM users;
+
+        :param table_name: The name of table on which query is to be executed.
+        :param key_column: The indexed column whose range is to be retrieved.
+
+        :return: The final query string to be executed.
+        :rtype: str
+        """
+
+        return "SELECT MIN(" + str(key_column) + "), MAX(" + str(key_column) + ") FROM " + str(table_name) + ";"
+
+    @staticmethod
+    def build_load_data_statement(table_name,
+                                  file_path,
+                                  field_list=None,
+                                  duplicate_mode=None):
+        """
+        Combines required components to form a MySQL LOAD DATA LOCAL INFILE statement for tab-separated data.
+
+        The data file is expected in the MySQL default format: fields separated by tabs, lines terminated by
+        newlines, special characters escaped with backslashes and NULL values written as \\N.
+
+        :param table_name: The name of table into which the data is to be loaded.
+        :param file_path: The full path of the data file on the client.
+        :param field_list: The list of columns the fields of each line map to, all columns if not supplied.
+        :param duplicate_mode: Handling of rows with duplicate keys, either 'IGNORE', 'REPLACE' or None (error).
+
+        :return: The final statement string to be executed.
+        :rtype: str
+        """
+
+        escaped_path = str(file_path).replace("\\", "\\\\").replace("'", "\\'")
+        statement_string = "LOAD DATA LOCAL INFILE '" + escaped_path + "'"
+
+        if duplicate_mode is not None:
+            statement_string += " " + str(duplicate_mode).upper()
+
+        statement_string += " INTO TABLE " + str(table_name) + " CHARACTER SET utf8" + \
+                            " FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'"
+
+        if field_list is not None and len(field_list) > 0:
+            statement_string += " (" + ", ".join([str(field) for field in field_list]) + ")"
+
+        return statement_string + ";"
+
+    @staticmethod
+    def build_upsert_query(table_name,
+                           field_list,
+                           row_count,
+                           key_field_list,
+                           update_field_list=None,
+                           dialect="mysql"):
+        """
+        Combines required components to form a multi-row SQL INSERT statement which updates existing rows.
+
+        Rows whose key already exists have their update fields overwritten with the supplied values, all other
+        rows are inserted. Values are supplied separately, through one placeholder per field per row.
+
+        Example:
+            mysql:  INSERT INTO users (id, name) VALUES (%s, %s), (%s, %s)
+                    ON DUPLICATE KEY UPDATE name=VALUES(name);
+            sqlite: INSERT INTO users (id, name) VALUES (?, ?), (?, ?)
+                    ON CONFLICT (id) DO UPDATE SET name=excluded.name;
+
+        :param table_name: The name of table into which rows are to be written.
+        :param field_list: The list of columns supplied for every row.
+        :param row_count: The number of rows in the statement.
+        :param key_field_list: The list of columns forming the primary or unique key used to detect existing rows.
+        :param update_field_list: The list of columns to overwrite on existing rows, all non-key columns if not
+                                  supplied.
+        :param dialect: The SQL dialect, either 'mysql' or 'sqlite'.
+
+        :return: The final statement string to be executed, False if there are no rows.
+        :rtype: str
+        """
+
+        if row_count < 1 or len(field_list) == 0:
+            return False
+
+        if update_field_list is None:
+            update_field_list = [field for field in field_list if field not in key_field_list]
+
+        placeholder = SqlUtils.get_placeholder(dialect)
+        row_string = "(" + ", ".join([placeholder] * len(field_list)) + ")"
+
+        statement_string = "INSERT INTO " + str(table_name) + \
+                           " (" + ", ".join([str(field) for field in field_list]) + ")" + \
+                           " VALUES " + ", ".join([row_string] * row_count)
+
+        if dialect == "sqlite":
+            statement_string += " ON CONFLICT (" + ", ".join([str(field) for field in key_field_list]) + ")"
+
+            if len(update_field_list) > 0:
+                statement_string += " DO UPDATE SET " + \
+                                    ", ".join([str(field) + "=excluded." + str(field) for field in update_field_list])
+            else:
+                statement_string += " DO NOTHING"
+        else:
+            if len(update_field_list) == 0:
+                # a no-op assignment keeps existing rows untouched, without raising duplicate key errors
+                update_string = str(key_field_list[0]) + "=" + str(key_field_list[0])
+            else:
+                update_string = ", ".join([str(field) + "=VALUES(" + str(field) + ")"
+                                           for field in update_field_list])
+
+            statement_string += " ON DUPLICATE KEY UPDATE " + update_string
+
+        return statement_string + ";"
@@ -0,0 +1,299 @@
+"""
+Utility module to work with embedded SQLite databases.
+"""
+
+import time
+import sqlite3
+import itertools
+
+from sql_utils import SqlUtils
+from mysql_utils import MysqlUtils
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# pragmas applied on connection, tuned for throughput over durability on power loss
+DEFAULT_PRAGMA_MAP = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY"
+}
+
+# largest number of bound parameters per statement in SQLite builds before 3.32
+SQLITE_MAX_VARIABLE_NUMBER = 999
+
+
+class SqliteUtils(MysqlUtils):
+    """
+    Utility class containing methods for working with embedded SQLite databases.
+
+    This exposes the same methods as MysqlUtils, including transactions, write-batching and table export,
+    so that code written against MysqlUtils can run against a local database file or an in-memory database.
+    Queries built using SqlUtils are rendered for the SQLite dialect through the 'dialect' attribute, and
+    parameterized queries written for MysqlUtils, with '%s' placeholders, are rewritten to use '?' placeholders,
+    so the same query runs on both. Other syntax, such as MySQL-specific functions, is not translated.
+
+    The connection runs in autocommit mode, like MysqlUtils, with explicit transactions opened by
+    'transaction', 'begin_transaction' or 'begin_batch'. Grouping writes into batches matters even more
+    than with MySQL, as every commit outside of a transaction syncs the database file.
+    """
+
+    def __init__(self, database=":memory:", pragma_map=None):
+        """
+        :param database: The full path of the database file, or ':memory:' for an in-memory database.
+        :param pragma_map: Pragmas to apply on connection, overriding the throughput-oriented defaults.
+        """
+
+        MysqlUtils.__init__(self, None, None, None, database)
+
+        self.dialect = "sqlite"
+        self.pragma_map = dict(DEFAULT_PRAGMA_MAP)
+
+        if pragma_map is not None:
+            self.pragma_map.update(pragma_map)
+
+    def is_in_memory(self):
+        """
+        Checks if the database is held in memory rather than in a file.
+
+        :return: True if the database is in-memory, False otherwise.
+        :rtype: bool
+        """
+
+        return self.db_name == ":memory:" or self.db_name == ""
+
+    def connect(self):
+        """
+        Connects to the SQLite database, creating it if it does not exist, and applies the configured pragmas.
+
+        WAL journal mode and memory-mapped I/O are skipped for in-memory databases, which have no file.
+
+        :return: True is connection was successful, False if not.
+        :rtype: bool
+        """
+
+        try:
+            self.conn_obj = sqlite3.connect(self.db_name, isolation_level=None, check_same_thread=False)
+
+            for pragma_name, pragma_value in self.pragma_map.items():
+                if self.is_in_memory() and pragma_name in ("journal_mode", "mmap_size"):
+                    continue
+
+                self.set_pragma(pragma_name, pragma_value)
+
+            return True
+        except Exception:
+            return False
+
+    def _execute(self, cursor, query_string, param_list=None):
+        """
+        Executes a query on the supplied cursor, rewriting its '%s' placeholders if it is parameterized.
+
+        :param cursor: The cursor on which the query is to be executed.
+        :param query_string: The query to be executed.
+        :param param_list: Optional sequence of values to bind to the placeholders within the query.
+
+        :return: The value returned by the cursor.
+        """
+
+        if param_list is not None:
+            query_string = SqlUtils.render_placeholders(query_string, self.dialect)
+
+        return MysqlUtils._execute(self, cursor, query_string, param_list)
+
+    def set_pragma(self, pragma_name, pragma_value):
+        """
+        Sets the value of a pragma on the current connection.
+
+        :param pragma_name: The name of the pragma.
+        :param pragma_value: The value to be set.
+
+        :return: The value reported by SQLite after setting the pragma, False if exception was raised.
+        :rtype: str
+        """
+
+        try:
+            cursor = self.conn_obj.cursor()
+            self._execute(cursor, "PRAGMA " + str(pragma_name) + "=" + str(pragma_value) + ";")
+            query_res = cursor.fetchall()
+            cursor.close()
+
+            if len(query_res) > 0:
+                return str(query_res[0][0])
+
+            return self.get_pragma(pragma_name)
+        except Exception as ex:
+            return False
+
+    def get_pragma(self, pragma_name):
+        """
+        Gets the value of a pragma on the current connection.
+
+        :param pragma_name: The name of the pragma.
+
+        :return: The value of the pragma, False if exception was raised.
+        :rtype: str
+        """
+
+        return self.run_query("PRAGMA " + str(pragma_name) + ";")
+
+    def bulk_load(self, table_name, row_iter, field_list=None, chunk_rows=100000, use_named_pipe=False,
+                  duplicate_mode=None):
+        """
+        Loads rows into a table in chunks, each inserted with a single prepared statement within a transaction.
+
+        SQLite has no LOAD DATA statement, so 'use_named_pipe' is ignored. Rows are consumed from the iterable
+        one chunk at a time, and the returned report has the same keys as MysqlUtils.bulk_load, with
+        BYTES_SENT and MB_PER_SEC left at zero.
+
+        :param table_name: The table into which rows are to be loaded.
+        :param row_iter: Iterable of rows, as value sequences or dictionaries.
+        :param field_list: The list of columns the values of each row map to.
+        :param chunk_rows: The number of rows inserted per transaction.
+        :param use_named_pipe: Ignored.
+        :param duplicate_mode: Handling of rows with duplicate keys, either 'IGNORE', 'REPLACE' or None (error).
+
+        :return: Dictionary reporting the row counts and throughput of the load, False if exception was raised.
+        :rtype: dict
+        """
+
+        report = {"ROWS_SENT": 0,
+                  "ROWS_LOADED": 0,
+                  "WARNINGS": 0,
+                  "BYTES_SENT": 0}
+        start_time = time.time()
+
+        try:
+            field_list, value_iter = MysqlUtils._prepare_bulk_rows(row_iter, field_list)
+            statement_string = None
+
+            while True:
+                chunk = list(itertools.islice(value_iter, chunk_rows))
+
+                if len(chunk) == 0:
+                    break
+
+                if statement_string is None:
+                    statement_string = self._build_bulk_insert_statement(table_name, field_list, len(chunk[0]),
+                                                                         duplicate_mode)
+
+                with self.transaction():
+                    cursor = self.conn_obj.cursor()
+                    cursor.executemany(statement_string, chunk)
+                    report["ROWS_LOADED"] += cursor.rowcount
+                    cursor.close()
+
+                report["ROWS_SENT"] += len(chunk)
+
+                if len(chunk) < chunk_rows:
+                    break
+        except Exception as ex:
+            if self.transaction_depth > 0 or self.batch_open:
+                raise
+
+            return False
+
+        return MysqlUtils._complete_load_report(report, start_time)
+
+    @staticmethod
+    def _build_bulk_insert_statement(table_name, field_list, field_count, duplicate_mode):
+        """
+        Builds the parameterized INSERT statement used for bulk loading.
+
+        :param table_name: The table into which rows are to be loaded.
+        :param field_list: The list of columns the values of each row map to, None for all columns.
+        :param field_count: The number of values in each row.
+        :param duplicate_mode: Handling of rows with duplicate keys, either 'IGNORE', 'REPLACE' or None (error).
+
+        :return: The statement string to be executed.
+        :rtype: str
+        """
+
+        statement_string = "INSERT "
+
+        if duplicate_mode is not None:
+            statement_string += "OR " + str(duplicate_mode).upper() + " "
+
+        statement_string += "INTO " + str(table_name)
+
+        if field_list is not None and len(field_list) > 0:
+            statement_string += " (" + ", ".join([str(field) for field in field_list]) + ")"
+
+        return statement_string + " VALUES (" + ", ".join(["?"] * field_count) + ");"
+
+    def _upsert_chunk(self, table_name, field_list, key_field_list, update_field_list, chunk):
+        """
+        Writes one chunk of rows with upsert statements, within a transaction.
+
+        The chunk is split so that no statement binds more than SQLITE_MAX_VARIABLE_NUMBER parameters.
+        SQLite reports every inserted or updated row as one change, so the keys which already exist are fetched
+        beforehand, which is cheap for an in-process database. A key repeated within the chunk is counted as
+        inserted once, then as updated. Rows are never reported as unchanged.
+
+        :return: Tuple of the counts of rows inserted, updated and left unchanged.
+        :rtype: tuple
+        """
+
+        statement_rows = max(SQLITE_MAX_VARIABLE_NUMBER // len(field_list), 1)
+        inserted = 0
+
+        with self.transaction():
+            for row_index in range(0, len(chunk), statement_rows):
+                inserted += self._upsert_rows(table_name, field_list, key_field_list, update_field_list,
+                                              chunk[row_index:row_index + statement_rows])
+
+        return inserted, len(chunk) - inserted, 0
+
+    def _upsert_rows(self, table_name, field_list, key_field_list, update_field_list, row_list):
+        """
+        Writes rows with a single upsert statement, fitting within the parameter limit.
+
+        :return: The count of rows inserted.
+        :rtype: int
+        """
+
+        statement_string = SqlUtils.build_upsert_query(table_name, field_list, len(row_list), key_field_list,
+                                                       update_field_list, self.dialect)
+        param_list = [row.get(field) for row in row_list for field in field_list]
+
+        key_string = ", ".join([str(field) for field in key_field_list])
+        key_row_string = "(" + ", ".join(["?"] * len(key_field_list)) + ")"
+        key_query = "SELECT " + key_string + " FROM " + str(table_name) + \
+                    " WHERE (" + key_string + ") IN (VALUES " + ", ".join([key_row_string] * len(row_list)) + ");"
+        key_param_list = [row.get(field) for row in row_list for field in key_field_list]
+
+        cursor = self.conn_obj.cursor()
+        self._execute(cursor, key_query, key_param_list)
+        written_keys = set(cursor.fetchall())
+        self._execute(cursor, statement_string, param_list)
+        cursor.close()
+
+        inserted = 0
+
+        for row in row_list:
+            row_key = tuple([row.get(field) for field in key_field_list])
+
+            if row_key not in written_keys:
+                written_keys.add(row_key)
+                inserted += 1
+
+        return inserted
+
+    def clone(self):
+        """
+        Creates a new, unconnected instance using the same database, pragmas and query instrument.
+
+        An in-memory database is private to its connection, so the clone of an in-memory instance connects
+        to a new, empty database.
+
+        :return: The new instance.
+        :rtype: SqliteUtils
+        """
+
+        new_instance = SqliteUtils(self.db_name, self.pragma_map)
+        new_instance.instrument = self.instrument
+
+        return new_instance
@@ -1,3 +1,13 @@
+from json_backend import JsonBackend
+from json_schema_decoder import JsonSchemaDecoder
+from json_stream_parser import JsonStreamParser
+from json_stream_writer import JsonStreamWriter
+from json_type_registry import JsonTypeRegistry
 from json_utils import JsonUtils
 
-__all__ = ["JsonUtils"]
+__all__ = ["JsonBackend",
+           "JsonSchemaDecoder",
+           "JsonStreamParser",
+           "JsonStreamWriter",
+           "JsonTypeRegistry",
+           "JsonUtils"]
@@ -0,0 +1,420 @@
+"""
+Utility module to encode and decode JSON with the fastest available library, with identical output.
+"""
+
+import re
+import json
+import timeit
+import decimal
+import datetime
+import importlib
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# backends tried by automatic selection, fastest first
+BACKEND_PRIORITY = ("orjson", "ujson", "rapidjson", "json")
+
+# separators of the standard library, and the compact separators all backends produce natively
+DEFAULT_SEPARATORS = (", ", ": ")
+COMPACT_SEPARATORS = (",", ":")
+
+# values a backend must encode and decode exactly as the standard library does to be selected
+CONFORMANCE_PAYLOADS = [{"text": u"caf\u00e9 \u2028 \U0001f600 / \\ \" \x01 \t", "empty": ""},
+                        [0.1, 1.5, 1.0 / 3, -0.0, 1e16, 1.5e-7, 2 ** 53, -2 ** 63, 2 ** 70],
+                        {"b": [True, False, None], "a": {}, "c": [], "B": {"y": 1, "x": [{"z": 2}]}},
+                        {2: "int", 10: "int", 2.5: "float", True: "bool", None: "null"}]
+
+# values of the types converted by a JsonTypeRegistry, which some backends encode natively, and differently
+TYPED_CONFORMANCE_PAYLOADS = [[datetime.datetime(2001, 2, 3, 4, 5, 6, 7), datetime.date(2001, 2, 3),
+                               decimal.Decimal("1.10"), set([2, 1]), bytearray("ab"), "\xff\xfe"]]
+
+# non-ASCII characters, escaped after encoding by backends which cannot produce ASCII output
+NON_ASCII_PATTERN = re.compile(u"[^\x00-\x7f]")
+
+# selected backends, by requested name and encoding options
+BACKEND_CACHE = {}
+
+
+class JsonBackend:
+    """
+    Utility class which encodes and decodes JSON with orjson, ujson or rapidjson when they are installed,
+    falling back to the standard library.
+
+    A normalization layer makes every backend produce exactly the output of the standard library json module:
+    encoding options such as 'sort_keys' and 'separators' are translated to each backend, non-ASCII characters
+    are escaped, and values a backend rejects, such as non-string keys or very large integers, are encoded or
+    decoded by the standard library instead. A backend is only selected if it reproduces the standard library
+    output for a set of conformance payloads, under the requested options. Backends which cannot produce the
+    requested separators are skipped, so the default separators usually select the standard library; the compact
+    separators (',', ':') can use every backend. Non-finite floats, which are not valid JSON, are encoded as
+    each backend chooses.
+
+    With a JsonTypeRegistry, types unknown to the standard library, such as datetime and Decimal, are
+    converted by the registry, and the conformance check also covers the types it converts by default.
+
+    Example:
+        json_backend = JsonBackend.get_backend(separators=(",", ":"))
+        print json_backend.name
+        json_text = json_backend.encode(record)
+    """
+
+    def __init__(self, name=None, sort_keys=False, separators=None, verify=True, decode_only=False,
+                 type_registry=None):
+        """
+        :param name: The name of the backend library, the fastest conforming backend if not supplied.
+        :param sort_keys: If True, object members are sorted by key.
+        :param separators: The item and key separators, as in json.dumps, (', ', ': ') if not supplied.
+        :param verify: If True, a named backend must pass the conformance check.
+        :param decode_only: If True, only decoding is checked for conformance, for backends used to decode only.
+        :param type_registry: The JsonTypeRegistry converting types unknown to the standard library, if any.
+
+        :raises ValueError: Raised if the named backend is unavailable, or cannot reproduce the standard output.
+        """
+
+        self.sort_keys = sort_keys
+        self.separators = tuple(separators) if separators is not None else DEFAULT_SEPARATORS
+        self.type_registry = type_registry
+
+        if type_registry is not None:
+            self.fallback_encoder = type_registry.get_encoder(sort_keys, self.separators)
+        else:
+            self.fallback_encoder = json.JSONEncoder(sort_keys=sort_keys, separators=self.separators)
+
+        self.fallback_decoder = json.JSONDecoder()
+
+        for backend_name in ([name] if name is not None else BACKEND_PRIORITY):
+            default_func = type_registry.default if type_registry is not None else None
+            codec = JsonBackend._build_codec(backend_name, sort_keys, self.separators, default_func)
+
+            if codec is None:
+                continue
+
+            self.name = backend_name
+            self.encode_func, self.decode_func = codec
+
+            if backend_name == "json":
+                self.encode_func = self.fallback_encoder.encode
+
+            if name is None and not self.is_conforming(not decode_only):
+                continue
+
+            if name is not None and verify and not self.is_conforming(not decode_only):
+                raise ValueError("Backend " + name + " cannot reproduce the standard library output.")
+
+            return
+
+        raise ValueError("Backend " + str(name) + " is unavailable, or cannot produce the requested separators.")
+
+    @staticmethod
+    def get_backend(name=None, sort_keys=False, separators=None, type_registry=None):
+        """
+        Returns the backend for a set of encoding options, selecting it on the first call only.
+
+        :param name: The name of the backend library, the fastest conforming backend if not supplied.
+        :param sort_keys: If True, object members are sorted by key.
+        :param separators: The item and key separators, as in json.dumps, (', ', ': ') if not supplied.
+        :param type_registry: The JsonTypeRegistry converting types unknown to the standard library, if any.
+
+        :return: The shared backend.
+        :rtype: JsonBackend
+        """
+
+        cache_key = (name, bool(sort_keys), tuple(separators) if separators is not None else DEFAULT_SEPARATORS,
+                     type_registry)
+
+        if cache_key not in BACKEND_CACHE:
+            BACKEND_CACHE[cache_key] = JsonBackend(name, sort_keys, separators, type_registry=type_registry)
+
+        return BACKEND_CACHE[cache_key]
+
+    @staticmethod
+    def get_decoder(name=None):
+        """
+        Returns the backend used for decoding, selecting it on the first call only. As only decoding has to
+        conform, a faster backend than for encoding may be selected.
+
+        :param name: The name of the backend library, the fastest conforming backend if not supplied.
+
+        :return: The shared backend.
+        :rtype: JsonBackend
+        """
+
+        cache_key = (name, "decode")
+
+        if cache_key not in BACKEND_CACHE:
+            BACKEND_CACHE[cache_key] = JsonBackend(name, separators=COMPACT_SEPARATORS, decode_only=True)
+
+        return BACKEND_CACHE[cache_key]
+
+    @staticmethod
+    def get_available_backends():
+        """
+        Returns the names of the backend libraries which are installed, fastest first.
+
+        :return: List of backend names.
+        :rtype: list
+        """
+
+        available_list = []
+
+        for backend_name in BACKEND_PRIORITY:
+            try:
+                importlib.import_module(backend_name)
+                available_list.append(backend_name)
+            except ImportError:
+                pass
+
+        return available_list
+
+    def encode(self, data_obj):
+        """
+        Encodes a data object as JSON.
+
+        :param data_obj: Data object to be encoded.
+
+        :return: The JSON formatted string.
+        :rtype: str
+
+        :raises TypeError: Raised if the object is not serializable by the standard library either.
+        """
+
+        if self.type_registry is not None:
+            data_obj = self.type_registry.convert_records(data_obj)
+
+        try:
+            return self.encode_func(data_obj)
+        except (TypeError, ValueError, OverflowError):
+            # rejected by the backend, such as non-string keys or integers beyond 64 bits
+            return self.fallback_encoder.encode(data_obj)
+
+    def decode(self, json_text):
+        """
+        Decodes a JSON formatted string.
+
+        :param json_text: The JSON formatted string.
+
+        :return: The decoded data object.
+
+        :raises ValueError: Raised if the string is not valid JSON.
+        """
+
+        try:
+            return self.decode_func(json_text)
+        except (ValueError, OverflowError):
+            # rejected by the backend, such as integers beyond 64 bits, or invalid, for the standard error message
+            return self.fallback_decoder.decode(json_text)
+
+    def is_conforming(self, check_encoding=True):
+        """
+        Checks if the backend encodes and decodes the conformance payloads exactly as the standard library does.
+
+        :param check_encoding: If False, only decoding is checked.
+
+        :return: True if the backend conforms, False otherwise.
+        :rtype: bool
+        """
+
+        if self.name == "json":
+            return True
+
+        canonical_encoder = json.JSONEncoder(sort_keys=True)
+        payload_list = CONFORMANCE_PAYLOADS
+
+        if check_encoding and self.type_registry is not None:
+            payload_list = CONFORMANCE_PAYLOADS + TYPED_CONFORMANCE_PAYLOADS
+
+        for payload in payload_list:
+            try:
+                json_text = self.fallback_encoder.encode(payload)
+
+                if check_encoding and self.encode(payload) != json_text:
+                    return False
+
+                if canonical_encoder.encode(self.decode(json_text)) != canonical_encoder.encode(json.loads(json_text)):
+                    return False
+            except (TypeError, ValueError, OverflowError):
+                return False
+
+        return True
+
+    @staticmethod
+    def benchmark(payload_map=None, backend_names=None, min_duration=0.2):
+        """
+        Measures the encoding and decoding throughput of every installed backend, through the normalization
+        layer, on representative payloads.
+
+        :param payload_map: Dictionary of payload names and data objects, sample payloads if not supplied.
+        :param backend_names: The names of the backends to be measured, all installed backends if not supplied.
+        :param min_duration: The minimum time, in seconds, spent on each measurement.
+
+        :return: List of dictionaries, one per backend and payload, sorted by payload and encoding throughput.
+        :rtype: list
+        """
+
+        if payload_map is None:
+            payload_map = JsonBackend._build_sample_payloads()
+
+        if backend_names is None:
+            backend_names = JsonBackend.get_available_backends()
+
+        result_list = []
+
+        for backend_name in backend_names:
+            json_backend = JsonBackend(backend_name, separators=COMPACT_SEPARATORS, verify=False)
+            is_conforming = json_backend.is_conforming()
+
+            for payload_name, payload in payload_map.items():
+                json_text = json_backend.encode(payload)
+                encode_rate = JsonBackend._measure_rate(json_backend.encode, payload, min_duration)
+                decode_rate = JsonBackend._measure_rate(json_backend.decode, json_text, min_duration)
+
+                result_list.append({"BACKEND": backend_name,
+                                    "PAYLOAD": payload_name,
+                                    "IS_CONFORMING": is_conforming,
+                                    "IS_DECODING_CONFORMING": is_conforming or json_backend.is_conforming(False),
+                                    "SIZE_BYTES": len(json_text),
+                                    "ENCODE_PER_SEC": encode_rate,
+                                    "DECODE_PER_SEC": decode_rate,
+                                    "ENCODE_MB_PER_SEC": encode_rate * len(json_text) / 1048576.0,
+                                    "DECODE_MB_PER_SEC": decode_rate * len(json_text) / 1048576.0})
+
+        return sorted(result_list, key=lambda result: (result["PAYLOAD"], -result["ENCODE_MB_PER_SEC"]))
+
+    @staticmethod
+    def _build_codec(backend_name, sort_keys, separators, default_func=None):
+        """
+        Builds the encoding and decoding functions of a backend, translating the encoding options. The default
+        function, if any, is passed to the backends which accept one.
+
+        :return: Tuple of the encoding and decoding functions, None if the backend is unavailable or does not
+                 support the separators.
+        :rtype: tuple
+        """
+
+        try:
+            backend_module = importlib.import_module(backend_name)
+        except ImportError:
+            return None
+
+        if backend_name == "json":
+            return (json.JSONEncoder(sort_keys=sort_keys, separators=separators).encode,
+                    json.JSONDecoder().decode)
+
+        if backend_name == "orjson":
+            if separators != COMPACT_SEPARATORS:
+                return None
+
+            dump_option = backend_module.OPT_SORT_KEYS if sort_keys else 0
+
+            def encode_orjson(data_obj):
+                return JsonBackend._escape_non_ascii(backend_module.dumps(data_obj, default_func, dump_option)
+                                                     .decode("utf-8"))
+
+            return encode_orjson, backend_module.loads
+
+        if backend_name == "ujson":
+            dump_kwargs = {"sort_keys": sort_keys, "ensure_ascii": True, "escape_forward_slashes": False}
+
+            if separators != COMPACT_SEPARATORS:
+                dump_kwargs["separators"] = separators
+
+            if default_func is not None:
+                dump_kwargs["default"] = default_func
+
+            try:
+                # older releases support neither separators, default functions nor exact float parsing
+                backend_module.dumps({}, **dump_kwargs)
+            except TypeError:
+                return None
+
+            try:
+                backend_module.loads("0.1", precise_float=True)
+                load_kwargs = {"precise_float": True}
+            except TypeError:
+                load_kwargs = {}
+
+            return (lambda data_obj: backend_module.dumps(data_obj, **dump_kwargs),
+                    lambda json_text: backend_module.loads(json_text, **load_kwargs))
+
+        if backend_name == "rapidjson":
+            if separators != COMPACT_SEPARATORS:
+                return None
+
+            return (lambda data_obj: backend_module.dumps(data_obj, sort_keys=sort_keys, ensure_ascii=True,
+                                                          default=default_func),
+                    backend_module.loads)
+
+        return None
+
+    @staticmethod
+    def _escape_non_ascii(json_text):
+        """
+        Escapes the non-ASCII characters of a JSON formatted string as the standard library does.
+
+        :return: The ASCII JSON formatted string.
+        :rtype: str
+        """
+
+        if NON_ASCII_PATTERN.search(json_text) is None:
+            return json_text
+
+        def escape_char(char_match):
+            code_point = ord(char_match.group())
+
+            if code_point > 0xffff:
+                code_point -= 0x10000
+                return "\\u%04x\\u%04x" % (0xd800 | (code_point >> 10), 0xdc00 | (code_point & 0x3ff))
+
+            return "\\u%04x" % code_point
+
+        return NON_ASCII_PATTERN.sub(escape_char, json_text)
+
+    @staticmethod
+    def _measure_rate(func, argument, min_duration):
+        """
+        Calls a function repeatedly, doubling the call count until the calls take at least the minimum duration.
+
+        :return: The number of calls per second.
+        :rtype: float
+        """
+
+        call_count = 1
+
+        while True:
+            start_time = timeit.default_timer()
+
+            for _ in xrange(call_count):
+                func(argument)
+
+            elapsed_time = timeit.default_timer() - start_time
+
+            if elapsed_time >= min_duration:
+                return call_count / elapsed_time
+
+            call_count *= 2
+
+    @staticmethod
+    def _build_sample_payloads():
+        """
+        Builds payloads representative of API responses, exports and numeric data.
+
+        :return: Dictionary of payload names and data objects.
+        :rtype: dict
+        """
+
+        record_list = [{"id": record_id,
+                        "name": "customer " + str(record_id),
+                        "email": "customer" + str(record_id) + "@example.com",
+                        "balance": record_id * 10.25,
+                        "is_active": record_id % 3 != 0,
+                        "tags": ["retail", "priority"] if record_id % 2 else [],
+                        "address": {"city": u"M\u00fcnchen", "postcode": "80331"}}
+                       for record_id in xrange(1000)]
+
+        return {"small_record": record_list[1],
+                "record_list": record_list,
+                "number_array": [value * 0.001 for value in xrange(10000)],
+                "text_heavy": [u"Line %d: " % line_number + u"lorem ipsum dolor sit amet \u2014 " * 8
+                               for line_number in xrange(500)]}
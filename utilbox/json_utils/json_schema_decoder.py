@@ -0,0 +1,422 @@
+"""
+Utility module to decode homogeneous JSON objects into compact records or columns, following a schema.
+"""
+
+import re
+import json
+import array
+import keyword
+import decimal
+import datetime
+import collections
+
+from utilbox.json_utils.json_stream_parser import JsonStreamParser
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# field and class names allowed in generated record classes
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+# array type codes of the column types stored unboxed in columnar mode
+COLUMN_TYPECODE_MAP = {int: "l", float: "d", bool: "b"}
+
+# number of objects coerced before being moved into records or columns
+VALUE_BATCH_SIZE = 1000
+
+# source of the constructor of generated record classes
+RECORD_INIT_TEMPLATE = """def __init__(self, {field_args}):
+    {field_assignments}
+"""
+
+
+class JsonSchemaDecoder:
+    """
+    Utility class which decodes JSON objects sharing a schema into compact records, or into one array per field.
+
+    A decoded JSON object is a dictionary, costing several hundred bytes even for a few fields. The decoder
+    instead generates a record class with '__slots__' for the schema, or a namedtuple class, and converts every
+    object into an instance, while the dictionaries only live until their record is built. In columnar mode,
+    values are appended to one column per field, stored unboxed in an array.array for int, float and bool
+    fields.
+
+    The schema is a list of (name, type) or (name, type, default) tuples. The coercion function of every field
+    is chosen once, from its type: int, long, float, bool, str, unicode, Decimal, datetime, date, or any other
+    callable, which then receives the decoded value. Values are validated and coerced by that function only.
+    A field with a default may be missing or null; a field without one must be present and not null. Objects
+    are coerced in batches, and columns extended one batch at a time.
+
+    Example:
+        schema_decoder = JsonSchemaDecoder([("id", int), ("name", str), ("price", float, 0.0)])
+        product_list = schema_decoder.decode_items("products.json", "products.*")
+        print product_list[0].name
+    """
+
+    def __init__(self, field_list, record_format="slots", class_name="Record"):
+        """
+        :param field_list: The schema, as a list of (name, type) or (name, type, default) tuples.
+        :param record_format: Either 'slots', for instances of a generated class with '__slots__', 'tuple', for
+                              namedtuples, or 'columns', for a dictionary of one array or list per field.
+        :param class_name: The name of the generated record class.
+        """
+
+        if record_format not in ("slots", "tuple", "columns"):
+            raise ValueError("Unsupported record format: " + str(record_format))
+
+        for field_name in [field_spec[0] for field_spec in field_list] + [class_name]:
+            if not IDENTIFIER_PATTERN.match(field_name) or keyword.iskeyword(field_name):
+                raise ValueError("Invalid field or class name: " + str(field_name))
+
+        self.record_format = record_format
+        self.field_names = tuple(field_spec[0] for field_spec in field_list)
+        self.field_types = tuple(field_spec[1] for field_spec in field_list)
+        self.coerce_funcs = tuple(JsonSchemaDecoder._build_coerce_func(*field_spec) for field_spec in field_list)
+
+        if record_format == "tuple":
+            self.record_class = collections.namedtuple(class_name, self.field_names)
+        elif record_format == "slots":
+            self.record_class = JsonSchemaDecoder._build_record_class(class_name, self.field_names)
+        else:
+            self.record_class = None
+
+    def decode(self, json_text):
+        """
+        Decodes a JSON array of objects.
+
+        :param json_text: The JSON formatted string.
+
+        :return: List of records, or dictionary of columns in columnar mode.
+
+        :raises ValueError: Raised if the text is not valid JSON, or an object does not match the schema.
+        """
+
+        return self.decode_objects(json.loads(json_text))
+
+    def decode_items(self, source, path="*", chunk_size=65536):
+        """
+        Decodes the objects found at a path of a JSON file, reading it incrementally. See JsonStreamParser.
+
+        :param source: The full path of the JSON file, or a file object opened for reading.
+        :param path: The dot-separated path of the objects, '*' for the elements of a top-level array.
+        :param chunk_size: The number of bytes read at a time.
+
+        :return: List of records, or dictionary of columns in columnar mode.
+
+        :raises ValueError: Raised if the file is not valid JSON, or an object does not match the schema.
+        """
+
+        return self.decode_objects(JsonStreamParser(source, chunk_size).iterate_items(path))
+
+    def decode_lines(self, source, batch_size=1000):
+        """
+        Decodes the objects of a JSON Lines file, in batches. See JsonStreamParser.
+
+        :param source: The full path of the JSON Lines file, or a file object opened for reading.
+        :param batch_size: The number of records per batch.
+
+        :return: List of records, or dictionary of columns in columnar mode.
+
+        :raises ValueError: Raised if a line is not valid JSON, or an object does not match the schema.
+        """
+
+        return self.decode_objects(JsonStreamParser.iterate_lines(source, batch_size))
+
+    def decode_objects(self, object_iter):
+        """
+        Converts already decoded objects, consuming the iterable lazily.
+
+        :param object_iter: Iterable of dictionaries, such as a generator.
+
+        :return: List of records, or dictionary of columns in columnar mode.
+
+        :raises ValueError: Raised if an object does not match the schema.
+        """
+
+        if self.record_format == "columns":
+            return self._fill_columns(object_iter)
+
+        record_class = self.record_class
+        record_list = []
+
+        for value_batch in self._iterate_value_batches(object_iter):
+            if self.record_format == "tuple":
+                # tuple.__new__ skips the Python-level constructor of namedtuples
+                record_list.extend([tuple.__new__(record_class, value_list) for value_list in value_batch])
+            else:
+                record_list.extend([record_class(*value_list) for value_list in value_batch])
+
+        return record_list
+
+    def _fill_columns(self, object_iter):
+        """
+        Extends the column of each field with the coerced values of every batch of objects.
+
+        A typed column is rebuilt as a list if a value does not fit its array, such as a null default.
+
+        :return: Ordered dictionary of field names and columns.
+        :rtype: collections.OrderedDict
+        """
+
+        column_map = collections.OrderedDict()
+
+        for field_name, field_type in zip(self.field_names, self.field_types):
+            typecode = COLUMN_TYPECODE_MAP.get(field_type)
+            column_map[field_name] = array.array(typecode) if typecode is not None else []
+
+        for value_batch in self._iterate_value_batches(object_iter):
+            for field_name, column_values in zip(self.field_names, zip(*value_batch)):
+                column = column_map[field_name]
+                column_length = len(column)
+
+                try:
+                    column.extend(column_values)
+                except (TypeError, OverflowError):
+                    del column[column_length:]
+                    column_map[field_name] = column.tolist() + list(column_values)
+
+        return column_map
+
+    def _iterate_value_batches(self, object_iter):
+        """
+        Coerces the field values of every object, in batches.
+
+        :return: Generator yielding lists of value lists, one value list per object, in field order.
+        :rtype: generator
+
+        :raises ValueError: Raised if an object does not match the schema.
+        """
+
+        field_plan = zip(self.field_names, self.coerce_funcs)
+        value_batch = []
+        record_count = 0
+
+        for decoded_obj in object_iter:
+            try:
+                value_batch.append([coerce_func(decoded_obj.get(field_name)) for field_name, coerce_func in field_plan])
+            except (TypeError, ValueError, AttributeError, decimal.InvalidOperation):
+                self._raise_schema_error(decoded_obj, record_count + len(value_batch))
+
+            if len(value_batch) == VALUE_BATCH_SIZE:
+                yield value_batch
+
+                record_count += len(value_batch)
+                value_batch = []
+
+        if value_batch:
+            yield value_batch
+
+    def _raise_schema_error(self, decoded_obj, record_index):
+        """
+        Finds the field of an object which does not match the schema, and raises an error naming it.
+
+        :raises ValueError: Always raised.
+        """
+
+        if not isinstance(decoded_obj, dict):
+            raise ValueError("Record " + str(record_index) + " is not an object.")
+
+        for field_name, coerce_func in zip(self.field_names, self.coerce_funcs):
+            try:
+                coerce_func(decoded_obj.get(field_name))
+            except (TypeError, ValueError, AttributeError, decimal.InvalidOperation) as error:
+                raise ValueError("Record " + str(record_index) + ", field '" + field_name + "': " + str(error))
+
+        raise ValueError("Record " + str(record_index) + " does not match the schema.")
+
+    @staticmethod
+    def _build_coerce_func(field_name, field_type, *default):
+        """
+        Builds the function validating and coercing the values of a field, once per field.
+
+        :return: The coercion function.
+        :rtype: function
+        """
+
+        coerce_func_map = {int: JsonSchemaDecoder._coerce_int,
+                           long: JsonSchemaDecoder._coerce_int,
+                           float: JsonSchemaDecoder._coerce_float,
+                           bool: JsonSchemaDecoder._coerce_bool,
+                           unicode: JsonSchemaDecoder._coerce_unicode,
+                           str: JsonSchemaDecoder._coerce_str,
+                           decimal.Decimal: JsonSchemaDecoder._coerce_decimal,
+                           datetime.datetime: JsonSchemaDecoder._coerce_datetime,
+                           datetime.date: JsonSchemaDecoder._coerce_date}
+        coerce_func = coerce_func_map.get(field_type, field_type)
+
+        if not default:
+            if field_type in coerce_func_map:
+                # built-in coercion functions reject null values themselves
+                return coerce_func
+
+            def coerce_required(value):
+                if value is None:
+                    raise ValueError("missing or null value")
+
+                return coerce_func(value)
+
+            return coerce_required
+
+        default_value = default[0]
+
+        def coerce_optional(value):
+            return default_value if value is None else coerce_func(value)
+
+        return coerce_optional
+
+    @staticmethod
+    def _build_record_class(class_name, field_names):
+        """
+        Generates a record class with '__slots__' and a positional constructor.
+
+        :return: The record class.
+        :rtype: type
+        """
+
+        init_source = RECORD_INIT_TEMPLATE.format(
+            field_args=", ".join(field_names),
+            field_assignments="\n    ".join("self." + field_name + " = " + field_name for field_name in field_names)
+            if field_names else "pass")
+        class_namespace = {}
+
+        exec init_source in class_namespace
+
+        def record_repr(self):
+            return class_name + "(" + ", ".join(field_name + "=" + repr(getattr(self, field_name))
+                                                for field_name in field_names) + ")"
+
+        def record_eq(self, other):
+            return type(other) is type(self) and all(getattr(self, field_name) == getattr(other, field_name)
+                                                     for field_name in field_names)
+
+        return type(class_name, (object,), {"__slots__": field_names,
+                                            "__init__": class_namespace["__init__"],
+                                            "__repr__": record_repr,
+                                            "__eq__": record_eq,
+                                            "__ne__": lambda self, other: not record_eq(self, other),
+                                            "_fields": field_names})
+
+    @staticmethod
+    def _coerce_int(value):
+        """
+        Coerces a JSON number, or a string of digits, to an integer. Floats must be integral.
+        """
+
+        value_type = type(value)
+
+        if value_type is int or value_type is long:
+            return value
+
+        if value_type is float and value.is_integer():
+            return int(value)
+
+        if value_type is unicode or value_type is str:
+            return int(value)
+
+        raise ValueError("expected an integer, not " + repr(value))
+
+    @staticmethod
+    def _coerce_float(value):
+        """
+        Coerces a JSON number, or a numeric string, to a float.
+        """
+
+        value_type = type(value)
+
+        if value_type is float:
+            return value
+
+        if value_type is int or value_type is long or value_type is unicode or value_type is str:
+            return float(value)
+
+        raise ValueError("expected a number, not " + repr(value))
+
+    @staticmethod
+    def _coerce_bool(value):
+        """
+        Validates a JSON boolean.
+        """
+
+        if type(value) is bool:
+            return value
+
+        raise ValueError("expected a boolean, not " + repr(value))
+
+    @staticmethod
+    def _coerce_unicode(value):
+        """
+        Coerces a JSON string or number to unicode.
+        """
+
+        value_type = type(value)
+
+        if value_type is unicode:
+            return value
+
+        if value_type is float:
+            # unicode() rounds floats to 12 significant digits
+            return unicode(repr(value))
+
+        if value_type is str or value_type is int or value_type is long:
+            return unicode(value)
+
+        raise ValueError("expected a string, not " + repr(value))
+
+    @staticmethod
+    def _coerce_str(value):
+        """
+        Coerces a JSON string or number to a UTF-8 str, which takes less memory than unicode.
+        """
+
+        value_type = type(value)
+
+        if value_type is unicode:
+            return value.encode("utf-8")
+
+        if value_type is str:
+            return value
+
+        if value_type is float:
+            # str() rounds floats to 12 significant digits
+            return repr(value)
+
+        if value_type is int or value_type is long:
+            return str(value)
+
+        raise ValueError("expected a string, not " + repr(value))
+
+    @staticmethod
+    def _coerce_decimal(value):
+        """
+        Coerces a JSON number or numeric string to a Decimal, converting floats through their shortest repr.
+        """
+
+        if type(value) is float:
+            return decimal.Decimal(repr(value))
+
+        if type(value) is bool or not isinstance(value, (int, long, basestring)):
+            raise ValueError("expected a number, not " + repr(value))
+
+        return decimal.Decimal(value)
+
+    @staticmethod
+    def _coerce_datetime(value):
+        """
+        Parses an ISO 8601 date and time, with or without fractional seconds.
+        """
+
+        if not isinstance(value, basestring):
+            raise ValueError("expected a date and time, not " + repr(value))
+
+        return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f" if "." in value else "%Y-%m-%dT%H:%M:%S")
+
+    @staticmethod
+    def _coerce_date(value):
+        """
+        Parses an ISO 8601 date.
+        """
+
+        if not isinstance(value, basestring):
+            raise ValueError("expected a date, not " + repr(value))
+
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
@@ -0,0 +1,450 @@
+"""
+Utility module to extract parts of very large JSON documents and JSON Lines files, incrementally.
+"""
+
+import re
+import json
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# tokens recognized by the scanner, matched against the buffer
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+STRING_END_PATTERN = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+SCALAR_RUN_PATTERN = re.compile(r"[-+.0-9a-zA-Z]*")
+SCALAR_PATTERN = re.compile(r"(?:true|false|null|-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)$")
+STRUCTURE_PATTERN = re.compile(r'["\[\]{}]')
+
+# decoder shared by all JSON Lines parsers, decoding one line per call
+LINE_DECODER = json.JSONDecoder()
+
+
+class JsonStreamParser:
+    """
+    Utility class which reads a JSON document in chunks and yields only the values found at a given path.
+
+    A path is a dot-separated list of object keys and array indices, where '*' matches every member of an
+    object or element of an array. For example, 'items.*.id' selects the 'id' of every element of the
+    top-level 'items' array, and '*' every element of a top-level array. An empty path selects the whole
+    document.
+
+    Parts of the document outside the path are skipped by a scanner which only looks for quotes and brackets,
+    without decoding them, and each selected value is decoded in one call to the standard JSON decoder. Objects
+    and arrays smaller than 'item_size_limit' which the rest of the path selects from without wildcards, such
+    as the elements of 'items' for 'items.*.id', are also decoded in one call and searched in memory. Only the
+    current chunk and the value being decoded are held in memory.
+
+    Example:
+        json_parser = JsonStreamParser("huge.json")
+        for item_id in json_parser.iterate_items("items.*.id"):
+            print item_id
+    """
+
+    def __init__(self, source, chunk_size=65536, item_size_limit=1048576):
+        """
+        :param source: The full path of the JSON file, or a file object opened for reading.
+        :param chunk_size: The number of bytes read at a time.
+        :param item_size_limit: The largest size, in bytes, of objects and arrays decoded in a single call.
+        """
+
+        self.source = source
+        self.chunk_size = chunk_size
+        self.item_size_limit = item_size_limit
+        self.decoder = json.JSONDecoder()
+
+        self.file_handle = None
+        self.buffer = ""
+        self.position = 0
+        self.mark = None
+        self.is_exhausted = False
+
+    def iterate_items(self, path=""):
+        """
+        Parses the document, yielding every value found at the path, in document order.
+
+        :param path: The dot-separated path of the values to be selected.
+
+        :return: Generator yielding the decoded values.
+        :rtype: generator
+
+        :raises ValueError: Raised if the document is not valid JSON.
+        """
+
+        path_component_list = path.split(".") if path else []
+
+        self.file_handle = open(self.source, "rb") if isinstance(self.source, basestring) else self.source
+        self.buffer = ""
+        self.position = 0
+        self.mark = None
+        self.is_exhausted = False
+
+        try:
+            for value in self._walk(path_component_list, 0):
+                yield value
+        finally:
+            if self.file_handle is not self.source:
+                self.file_handle.close()
+
+    @staticmethod
+    def iterate_line_batches(source, batch_size=1000):
+        """
+        Parses a JSON Lines file in batches of records, each line being decoded on its own by a shared decoder.
+
+        Blank lines are ignored.
+
+        :param source: The full path of the JSON Lines file, or a file object opened for reading.
+        :param batch_size: The number of records per batch.
+
+        :return: Generator yielding lists of decoded records.
+        :rtype: generator
+
+        :raises ValueError: Raised if a line is not valid JSON, with its line number.
+        """
+
+        file_handle = open(source, "rb") if isinstance(source, basestring) else source
+        line_batch = []
+        line_number_list = []
+
+        try:
+            for line_number, line in enumerate(file_handle, 1):
+                if not line.strip():
+                    continue
+
+                line_batch.append(line)
+                line_number_list.append(line_number)
+
+                if len(line_batch) == batch_size:
+                    yield JsonStreamParser._decode_line_batch(line_batch, line_number_list)
+                    line_batch = []
+                    line_number_list = []
+
+            if line_batch:
+                yield JsonStreamParser._decode_line_batch(line_batch, line_number_list)
+        finally:
+            if file_handle is not source:
+                file_handle.close()
+
+    @staticmethod
+    def iterate_lines(source, batch_size=1000):
+        """
+        Parses a JSON Lines file, yielding one record at a time, decoded in batches. See 'iterate_line_batches'.
+
+        :param source: The full path of the JSON Lines file, or a file object opened for reading.
+        :param batch_size: The number of records per batch.
+
+        :return: Generator yielding the decoded records.
+        :rtype: generator
+        """
+
+        for record_batch in JsonStreamParser.iterate_line_batches(source, batch_size):
+            for record in record_batch:
+                yield record
+
+    @staticmethod
+    def _decode_line_batch(line_batch, line_number_list):
+        """
+        Decodes a batch of JSON lines, each of which must hold exactly one value.
+
+        :return: List of the decoded records.
+        :rtype: list
+
+        :raises ValueError: Raised if a line is not valid JSON, with its line number.
+        """
+
+        raw_decode = LINE_DECODER.raw_decode
+        record_list = []
+
+        for line_number, line in zip(line_number_list, line_batch):
+            try:
+                record, end_position = raw_decode(line)
+
+                if end_position == len(line) or not line[end_position:].strip():
+                    record_list.append(record)
+                    continue
+            except ValueError:
+                pass
+
+            # leading whitespace, trailing data or invalid JSON: decode the whole line to report the error
+            try:
+                record_list.append(LINE_DECODER.decode(line))
+            except ValueError as error:
+                raise ValueError("Line " + str(line_number) + ": " + str(error))
+
+        return record_list
+
+    def _walk(self, path_component_list, path_index):
+        """
+        Descends into the value at the current position, following the path.
+
+        :return: Generator yielding the decoded values found at the path.
+        :rtype: generator
+        """
+
+        if path_index == len(path_component_list):
+            yield self._read_value()
+            return
+
+        path_component = path_component_list[path_index]
+        next_char = self._peek()
+
+        if next_char in ("{", "[") and "*" not in path_component_list[path_index:]:
+            is_decoded, value = self._read_small_value()
+
+            if is_decoded:
+                for path_component in path_component_list[path_index:]:
+                    if isinstance(value, dict) and path_component in value:
+                        value = value[path_component]
+                    elif isinstance(value, list) and path_component.isdigit() and int(path_component) < len(value):
+                        value = value[int(path_component)]
+                    else:
+                        return
+
+                yield value
+                return
+
+        if next_char == "{":
+            self.position += 1
+
+            if self._peek() == "}":
+                self.position += 1
+                return
+
+            while True:
+                member_key = self._read_key()
+                self._expect(":")
+
+                if path_component == "*" or path_component == member_key:
+                    for value in self._walk(path_component_list, path_index + 1):
+                        yield value
+                else:
+                    self._skip_value()
+
+                if self._expect(",}") == "}":
+                    return
+
+        elif next_char == "[":
+            self.position += 1
+
+            if self._peek() == "]":
+                self.position += 1
+                return
+
+            element_index = 0
+
+            while True:
+                if path_component == "*" or path_component == str(element_index):
+                    for value in self._walk(path_component_list, path_index + 1):
+                        yield value
+                else:
+                    self._skip_value()
+
+                if self._expect(",]") == "]":
+                    return
+
+                element_index += 1
+
+        else:
+            # a scalar cannot contain the rest of the path
+            self._skip_value()
+
+    def _read_value(self):
+        """
+        Decodes the value at the current position.
+
+        :return: The decoded value.
+        """
+
+        self._peek()
+        self.mark = self.position
+        self._skip_value()
+
+        try:
+            value, _ = self.decoder.raw_decode(self.buffer, self.mark)
+        finally:
+            self.mark = None
+
+        return value
+
+    def _read_small_value(self):
+        """
+        Decodes the object or array at the current position in a single call, if it is smaller than the limit.
+
+        :return: Tuple of True and the decoded value, or of False and None if the value is too large.
+        :rtype: tuple
+        """
+
+        self.mark = self.position
+
+        try:
+            while True:
+                try:
+                    value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+                    return True, value
+                except ValueError:
+                    # incomplete, or invalid, which the structural walk will then report
+                    if len(self.buffer) - self.position >= self.item_size_limit or not self._fill():
+                        return False, None
+        finally:
+            self.mark = None
+
+    def _read_key(self):
+        """
+        Decodes the object key at the current position.
+
+        :return: The decoded key.
+        :rtype: unicode
+        """
+
+        if self._peek() != '"':
+            raise ValueError("Expected object key at offset " + str(self.position))
+
+        return self._read_value()
+
+    def _skip_value(self):
+        """
+        Moves the position past the value at the current position, without decoding it.
+        """
+
+        next_char = self._peek()
+
+        if next_char == '"':
+            self._skip_string()
+        elif next_char in ("{", "["):
+            self._skip_structure()
+        elif next_char:
+            self._skip_scalar()
+        else:
+            raise ValueError("Unexpected end of document")
+
+    def _skip_string(self):
+        """
+        Moves the position past the string starting at the current position.
+        """
+
+        while True:
+            # the position stays on the opening quote until the string is complete, keeping it in the buffer
+            string_match = STRING_END_PATTERN.match(self.buffer, self.position + 1)
+
+            if string_match is not None:
+                self.position = string_match.end()
+                return
+
+            if not self._fill():
+                raise ValueError("Unterminated string")
+
+    def _skip_structure(self):
+        """
+        Moves the position past the object or array starting at the current position.
+        """
+
+        depth = 0
+
+        while True:
+            structure_match = STRUCTURE_PATTERN.search(self.buffer, self.position)
+
+            if structure_match is None:
+                self.position = len(self.buffer)
+
+                if not self._fill():
+                    raise ValueError("Unexpected end of document")
+
+                continue
+
+            structure_char = structure_match.group()
+
+            if structure_char == '"':
+                self.position = structure_match.start()
+                self._skip_string()
+                continue
+
+            self.position = structure_match.end()
+            depth += 1 if structure_char in ("{", "[") else -1
+
+            if depth == 0:
+                return
+
+    def _skip_scalar(self):
+        """
+        Moves the position past the number or literal starting at the current position.
+        """
+
+        while True:
+            scalar_end = SCALAR_RUN_PATTERN.match(self.buffer, self.position).end()
+
+            # a run of characters reaching the end of the buffer may continue in the next chunk
+            if scalar_end == len(self.buffer) and self._fill():
+                continue
+
+            if not SCALAR_PATTERN.match(self.buffer[self.position:scalar_end]):
+                raise ValueError("Invalid value at offset " + str(self.position))
+
+            self.position = scalar_end
+            return
+
+    def _peek(self):
+        """
+        Skips whitespace, reading more of the document if needed.
+
+        :return: The next character, or an empty string at the end of the document.
+        :rtype: str
+        """
+
+        while True:
+            self.position = WHITESPACE_PATTERN.match(self.buffer, self.position).end()
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self._fill():
+                return ""
+
+    def _expect(self, expected_chars):
+        """
+        Consumes the next character, which must be one of the expected characters.
+
+        :return: The consumed character.
+        :rtype: str
+
+        :raises ValueError: Raised if another character is found.
+        """
+
+        next_char = self._peek()
+
+        if not next_char or next_char not in expected_chars:
+            raise ValueError("Expected one of '" + expected_chars + "' at offset " + str(self.position))
+
+        self.position += 1
+
+        return next_char
+
+    def _fill(self):
+        """
+        Reads the next chunk into the buffer, first discarding the consumed part of the buffer. The part from the
+        mark on, if any, is kept, and the position and mark are shifted accordingly.
+
+        :return: True if data was read, False at the end of the document.
+        :rtype: bool
+        """
+
+        if self.is_exhausted:
+            return False
+
+        chunk = self.file_handle.read(self.chunk_size)
+
+        if not chunk:
+            self.is_exhausted = True
+            return False
+
+        keep_offset = self.position if self.mark is None else min(self.mark, self.position)
+
+        if keep_offset:
+            self.buffer = self.buffer[keep_offset:]
+            self.position -= keep_offset
+
+            if self.mark is not None:
+                self.mark -= keep_offset
+
+        self.buffer += chunk
+
+        return True
@@ -0,0 +1,189 @@
+"""
+Utility module to write large sequences of records as JSON, incrementally.
+"""
+
+import os
+import json
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class JsonStreamWriter:
+    """
+    Utility class which serializes records one at a time to a file, as a single JSON array or as JSON Lines.
+
+    Encoded records are collected in a write buffer and written out whenever the buffer exceeds 'buffer_size'
+    characters, so memory use depends on the buffer size and the largest record, never on the record count.
+    Output can be gzip-compressed on the fly. Used as a context manager, the writer is closed when the block
+    exits normally, and aborted if an exception is raised within it.
+
+    Example:
+        with JsonStreamWriter("export.jsonl.gz", output_format="lines", compress=True) as json_writer:
+            json_writer.write_all(mysql_utils.iterate_table_chunks(...))
+    """
+
+    def __init__(self, destination, output_format="array", buffer_size=65536, compress=False, encoder=None):
+        """
+        :param destination: The full path of the output file, or a file object opened for writing in binary mode.
+        :param output_format: Either 'array', for a JSON array of the records, or 'lines', for JSON Lines.
+        :param buffer_size: The number of characters buffered before each write.
+        :param compress: If True, the output is gzip-compressed.
+        :param encoder: The json.JSONEncoder, or other object with an 'encode' method such as a JsonBackend, used
+                        for every record, a json.JSONEncoder with default settings if not supplied.
+        """
+
+        if output_format not in ("array", "lines"):
+            raise ValueError("Unsupported output format: " + str(output_format))
+
+        self.destination = destination
+        self.output_format = output_format
+        self.buffer_size = buffer_size
+        self.encoder = encoder if encoder is not None else json.JSONEncoder()
+
+        self.file_handle = open(destination, "wb") if isinstance(destination, basestring) else destination
+        self.output_handle = self.file_handle
+
+        if compress:
+            import gzip
+            self.output_handle = gzip.GzipFile(fileobj=self.file_handle, mode="wb")
+
+        self.buffer_list = []
+        self.buffer_length = 0
+        self.record_count = 0
+        self.is_closed = False
+
+        if output_format == "array":
+            self._append("[")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record):
+        """
+        Serializes a single record.
+
+        :param record: The record to be written.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        encoded_record = self.encoder.encode(record)
+
+        if self.output_format == "lines":
+            self._append(encoded_record + "\n")
+        elif self.record_count:
+            self._append("," + encoded_record)
+        else:
+            self._append(encoded_record)
+
+        self.record_count += 1
+
+    def write_all(self, record_iter):
+        """
+        Serializes every record of an iterable, consuming it lazily.
+
+        :param record_iter: Iterable of records, such as a generator.
+
+        :return: The count of records written by this call.
+        :rtype: int
+        """
+
+        start_count = self.record_count
+        write = self.write
+
+        for record in record_iter:
+            write(record)
+
+        return self.record_count - start_count
+
+    def flush(self):
+        """
+        Writes out the buffered records.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        if self.buffer_list:
+            buffered_text = "".join(self.buffer_list)
+
+            if isinstance(buffered_text, unicode):
+                buffered_text = buffered_text.encode("utf-8")
+
+            self.output_handle.write(buffered_text)
+
+            self.buffer_list = []
+            self.buffer_length = 0
+
+    def close(self):
+        """
+        Terminates the JSON array, if any, writes out the buffer and closes the compressor and any file opened
+        from a path. A file object supplied as destination is flushed, but left open.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        if self.is_closed:
+            return
+
+        if self.output_format == "array":
+            self._append("]")
+
+        self._close_handles()
+
+    def abort(self):
+        """
+        Closes the writer after a failure, without terminating the JSON array, so that incomplete output is never
+        mistaken for a complete export. A file opened from a path is removed. A file object supplied as
+        destination is flushed and left open, holding the records written so far, as an unterminated array in
+        the 'array' format.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        if self.is_closed:
+            return
+
+        self._close_handles()
+
+        if self.file_handle is not self.destination and os.path.exists(self.destination):
+            os.remove(self.destination)
+
+    def _close_handles(self):
+        """
+        Writes out the buffer and closes the compressor and any file opened from a path.
+        """
+
+        self.flush()
+
+        if self.output_handle is not self.file_handle:
+            self.output_handle.close()
+
+        if self.file_handle is not self.destination:
+            self.file_handle.close()
+        else:
+            self.file_handle.flush()
+
+        self.is_closed = True
+
+    def _append(self, text):
+        """
+        Adds text to the write buffer, flushing the buffer once it is full.
+        """
+
+        self.buffer_list.append(text)
+        self.buffer_length += len(text)
+
+        if self.buffer_length >= self.buffer_size:
+            self.flush()
@@ -0,0 +1,265 @@
+"""
+Utility module to serialize types unknown to the JSON encoder through a registry of per-type encoders.
+"""
+
+import json
+import base64
+import decimal
+import datetime
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class JsonTypeRegistry:
+    """
+    Registry of functions converting values of types unknown to the JSON encoder, such as datetime and Decimal
+    values of database rows, to values it can encode.
+
+    The registry is used as the 'default' hook of the C encoder, which calls it for such values only. It looks
+    up the converter by the exact type of the value in a dictionary, so each value costs a single lookup. Types
+    which are not registered are resolved once, on their first value, and cached: subclasses use the
+    converter of their closest registered base, and classes with '__slots__' are encoded as objects of their
+    slots.
+
+    Built-in converters:
+     - datetime, date and time values are encoded in ISO 8601 format, timedelta values as seconds
+     - Decimal values as strings, preserving their precision, or as floats with the 'float' decimal format
+     - bytearray values, and str values which are not valid UTF-8, as Base64 strings (see 'convert_binary')
+     - sets as sorted arrays
+     - namedtuples as objects, at the top level and as elements of a top-level list or tuple, such as rows of an
+       export; nested deeper, the encoder handles them natively, as arrays
+
+    Example:
+        type_registry = JsonTypeRegistry()
+        type_registry.register(uuid.UUID, str)
+        json_encoder = type_registry.get_encoder()
+        json_text = json_encoder.encode(mysql_utils.fetch_row_by_query(...))
+    """
+
+    def __init__(self, decimal_format="string"):
+        """
+        :param decimal_format: Either 'string', to encode Decimal values as strings, or 'float'.
+        """
+
+        if decimal_format not in ("string", "float"):
+            raise ValueError("Unsupported decimal format: " + str(decimal_format))
+
+        self.registered_map = {datetime.datetime: datetime.datetime.isoformat,
+                               datetime.date: datetime.date.isoformat,
+                               datetime.time: datetime.time.isoformat,
+                               datetime.timedelta: datetime.timedelta.total_seconds,
+                               decimal.Decimal: str if decimal_format == "string" else float,
+                               bytearray: base64.b64encode,
+                               set: JsonTypeRegistry._convert_set,
+                               frozenset: JsonTypeRegistry._convert_set}
+
+        # converters by exact type, including resolved subclasses, '__slots__' classes and namedtuples
+        self.converter_map = dict(self.registered_map)
+
+    def register(self, data_type, convert_func):
+        """
+        Registers the converter of a type, also used for its subclasses which are not registered themselves.
+
+        :param data_type: The type to be converted.
+        :param convert_func: Function converting a value of the type to a value the JSON encoder can encode.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        self.registered_map[data_type] = convert_func
+
+        # types resolved earlier may now resolve to the new converter
+        self.converter_map = dict(self.registered_map)
+
+    def default(self, value):
+        """
+        Converts a value the JSON encoder cannot encode, to be used as the 'default' hook of a json.JSONEncoder.
+
+        :param value: The value to be converted.
+
+        :return: The converted value.
+
+        :raises TypeError: Raised if no converter applies to the type of the value.
+        """
+
+        convert_func = self.converter_map.get(type(value))
+
+        if convert_func is None:
+            convert_func = self._resolve_converter(type(value))
+
+        return convert_func(value)
+
+    def convert_records(self, data_obj):
+        """
+        Converts a namedtuple, or the namedtuples of a list or tuple, to dictionaries of their fields.
+
+        :param data_obj: The data object to be encoded.
+
+        :return: The data object, with its records converted.
+        """
+
+        data_type = type(data_obj)
+
+        if data_type is list or data_type is tuple:
+            if data_obj and JsonTypeRegistry._is_namedtuple(data_obj[0]):
+                return [self.convert_records(record) for record in data_obj]
+        elif JsonTypeRegistry._is_namedtuple(data_obj):
+            return dict(zip(data_type._fields, data_obj))
+
+        return data_obj
+
+    def get_encoder(self, sort_keys=False, separators=None):
+        """
+        Returns a JSON encoder using the registry.
+
+        :param sort_keys: If True, object members are sorted by key.
+        :param separators: The item and key separators, as in json.dumps.
+
+        :return: The JSON encoder, whose 'encode' method also converts records and binary strings.
+        :rtype: json.JSONEncoder
+        """
+
+        return RegistryJsonEncoder(self, sort_keys=sort_keys, separators=separators)
+
+    def convert_binary(self, data_obj):
+        """
+        Converts the str values of a data object which are not valid UTF-8 to Base64 strings.
+
+        This walks the whole object, so it is only used when the encoder has failed on such a value. As the
+        decision is made per value, a binary column such as a BLOB is encoded inconsistently: its values which
+        happen to be valid UTF-8 stay text, while the others become Base64. Binary values which must always be
+        encoded as Base64 should be supplied as bytearray values, which the registry always converts.
+
+        :param data_obj: The data object to be encoded.
+
+        :return: The converted data object.
+        """
+
+        data_type = type(data_obj)
+
+        if data_type is str:
+            try:
+                data_obj.decode("utf-8")
+                return data_obj
+            except UnicodeDecodeError:
+                return base64.b64encode(data_obj)
+
+        if isinstance(data_obj, dict):
+            return dict((self.convert_binary(key) if type(key) is str else key, self.convert_binary(value))
+                        for key, value in data_obj.iteritems())
+
+        if isinstance(data_obj, (list, tuple)):
+            return [self.convert_binary(value) for value in self.convert_records(data_obj)]
+
+        return data_obj
+
+    def _resolve_converter(self, data_type):
+        """
+        Finds the converter of a type which is not registered, and caches it.
+
+        :return: The converter function.
+
+        :raises TypeError: Raised if no converter applies to the type.
+        """
+
+        convert_func = None
+
+        for base_type in data_type.__mro__[1:]:
+            if base_type in self.registered_map:
+                convert_func = self.registered_map[base_type]
+                break
+
+        if convert_func is None:
+            slot_names = JsonTypeRegistry._get_slot_names(data_type)
+
+            if not slot_names:
+                raise TypeError(repr(data_type) + " is not JSON serializable")
+
+            def convert_func(value):
+                return dict((slot_name, getattr(value, slot_name)) for slot_name in slot_names
+                            if hasattr(value, slot_name))
+
+        self.converter_map[data_type] = convert_func
+
+        return convert_func
+
+    @staticmethod
+    def _get_slot_names(data_type):
+        """
+        Collects the slot names of a class and its bases, excluding private and special slots.
+
+        :return: List of slot names.
+        :rtype: list
+        """
+
+        slot_names = []
+
+        for base_type in reversed(data_type.__mro__):
+            base_slots = base_type.__dict__.get("__slots__", ())
+
+            for slot_name in ([base_slots] if isinstance(base_slots, basestring) else base_slots):
+                if not slot_name.startswith("_") and slot_name not in slot_names:
+                    slot_names.append(slot_name)
+
+        return slot_names
+
+    @staticmethod
+    def _is_namedtuple(value):
+        """
+        Checks if a value is a namedtuple.
+
+        :return: True if the value is a namedtuple, False otherwise.
+        :rtype: bool
+        """
+
+        return isinstance(value, tuple) and hasattr(type(value), "_fields")
+
+    @staticmethod
+    def _convert_set(value):
+        """
+        Converts a set to a list, sorted if its members can be compared.
+
+        :return: List of the set members.
+        :rtype: list
+        """
+
+        try:
+            return sorted(value)
+        except TypeError:
+            return list(value)
+
+
+class RegistryJsonEncoder(json.JSONEncoder):
+    """
+    JSON encoder which converts unknown types through a JsonTypeRegistry. See JsonTypeRegistry.get_encoder.
+    """
+
+    def __init__(self, type_registry, **encoder_kwargs):
+        """
+        :param type_registry: The registry converting unknown types.
+        :param encoder_kwargs: Keyword arguments of json.JSONEncoder.
+        """
+
+        json.JSONEncoder.__init__(self, default=type_registry.default, **encoder_kwargs)
+
+        self.type_registry = type_registry
+
+    def encode(self, data_obj):
+        """
+        Encodes a data object as JSON, converting its records, and its str values which are not valid UTF-8.
+
+        :param data_obj: Data object to be encoded.
+
+        :return: The JSON formatted string.
+        :rtype: str
+        """
+
+        data_obj = self.type_registry.convert_records(data_obj)
+
+        try:
+            return json.JSONEncoder.encode(self, data_obj)
+        except UnicodeDecodeError:
+            return json.JSONEncoder.encode(self, self.type_registry.convert_binary(data_obj))
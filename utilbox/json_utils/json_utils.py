@@ -2,12 +2,19 @@
 Utility module to support manipulation of JSON data.
 """
 
-import json
+from utilbox.json_utils.json_backend import JsonBackend
+from utilbox.json_utils.json_type_registry import JsonTypeRegistry
+from utilbox.json_utils.json_stream_writer import JsonStreamWriter
+from utilbox.json_utils.json_stream_parser import JsonStreamParser
+from utilbox.json_utils.json_schema_decoder import JsonSchemaDecoder
 
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
 __status__ = "Alpha"
 
+# converters of types unknown to the JSON encoders, shared by all JsonUtils methods
+JSON_TYPE_REGISTRY = JsonTypeRegistry()
+
 
 class JsonUtils:
     """
@@ -18,14 +25,144 @@ class JsonUtils:
         pass
 
     @staticmethod
-    def convert_to_json(data_obj):
+    def convert_to_json(data_obj, sort_keys=False, separators=None, backend=None):
         """
         Converts supplied data object to JSON formatted string.
 
+        The fastest installed backend able to reproduce the output of the standard library is used. See
+        JsonBackend. Values of types unknown to the standard library, such as datetime and Decimal values of
+        database rows, are converted through the shared type registry. See JsonTypeRegistry and
+        'register_json_type'.
+
         :param data_obj: Data object to be converted to JSON.
+        :param sort_keys: If True, object members are sorted by key.
+        :param separators: The item and key separators, as in json.dumps. Compact separators (',', ':') allow
+                           every backend to be used.
+        :param backend: The name of the backend library, selected automatically if not supplied.
 
         :return: The JSON formatted string.
         :rtype: str
         """
 
-        return json.dumps(data_obj)
+        return JsonBackend.get_backend(backend, sort_keys, separators, JSON_TYPE_REGISTRY).encode(data_obj)
+
+    @staticmethod
+    def register_json_type(data_type, convert_func):
+        """
+        Registers how values of a type are converted for 'convert_to_json' and 'write_json_stream'.
+
+        :param data_type: The type to be converted. Its subclasses use the same converter.
+        :param convert_func: Function converting a value of the type to a value the JSON encoder can encode.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        JSON_TYPE_REGISTRY.register(data_type, convert_func)
+
+    @staticmethod
+    def convert_from_json(json_text, backend=None):
+        """
+        Converts supplied JSON formatted string to a data object.
+
+        :param json_text: The JSON formatted string.
+        :param backend: The name of the backend library, selected automatically if not supplied.
+
+        :return: The decoded data object.
+        """
+
+        return JsonBackend.get_decoder(backend).decode(json_text)
+
+    @staticmethod
+    def benchmark_json_backends(payload_map=None, min_duration=0.2):
+        """
+        Measures the encoding and decoding throughput of every installed JSON backend. See JsonBackend.benchmark.
+
+        :param payload_map: Dictionary of payload names and data objects, sample payloads if not supplied.
+        :param min_duration: The minimum time, in seconds, spent on each measurement.
+
+        :return: List of dictionaries, one per backend and payload, with their throughput.
+        :rtype: list
+        """
+
+        return JsonBackend.benchmark(payload_map, min_duration=min_duration)
+
+    @staticmethod
+    def write_json_stream(record_iter, destination, output_format="array", buffer_size=65536, compress=False):
+        """
+        Serializes an iterable of records to a file incrementally, as a JSON array or as JSON Lines.
+
+        Unlike 'convert_to_json', the complete JSON text is never held in memory. See JsonStreamWriter.
+
+        :param record_iter: Iterable of records, such as a generator.
+        :param destination: The full path of the output file, or a file object opened for writing in binary mode.
+        :param output_format: Either 'array', for a JSON array of the records, or 'lines', for JSON Lines.
+        :param buffer_size: The number of characters buffered before each write.
+        :param compress: If True, the output is gzip-compressed.
+
+        :return: The count of records written.
+        :rtype: int
+        """
+
+        json_encoder = JsonBackend.get_backend(type_registry=JSON_TYPE_REGISTRY)
+
+        with JsonStreamWriter(destination, output_format, buffer_size, compress, json_encoder) as json_writer:
+            return json_writer.write_all(record_iter)
+
+    @staticmethod
+    def iterate_json_items(source, path="", chunk_size=65536):
+        """
+        Parses a JSON document incrementally, yielding only the values found at a dot-separated path, such as
+        'items.*.id'. See JsonStreamParser.
+
+        :param source: The full path of the JSON file, or a file object opened for reading.
+        :param path: The dot-separated path of the values to be selected, '*' matching every member or element.
+        :param chunk_size: The number of bytes read at a time.
+
+        :return: Generator yielding the decoded values.
+        :rtype: generator
+        """
+
+        return JsonStreamParser(source, chunk_size).iterate_items(path)
+
+    @staticmethod
+    def iterate_json_lines(source, batch_size=1000):
+        """
+        Parses a JSON Lines file, yielding one record at a time, decoded in batches. See JsonStreamParser.
+
+        :param source: The full path of the JSON Lines file, or a file object opened for reading.
+        :param batch_size: The number of records per batch.
+
+        :return: Generator yielding the decoded records.
+        :rtype: generator
+        """
+
+        return JsonStreamParser.iterate_lines(source, batch_size)
+
+    @staticmethod
+    def read_json_records(source, field_list, record_format="slots", input_format="array", path="*"):
+        """
+        Reads homogeneous JSON objects from a file into compact records or columns, following a schema. See
+        JsonSchemaDecoder.
+
+        :param source: The full path of the JSON file, or a file object opened for reading.
+        :param field_list: The schema, as a list of (name, type) or (name, type, default) tuples.
+        :param record_format: Either 'slots', 'tuple' or 'columns'.
+        :param input_format: Either 'array', for objects found at a path of a JSON document, or 'lines', for
+                             JSON Lines.
+        :param path: The dot-separated path of the objects in a JSON document, '*' for a top-level array.
+
+        :return: List of records, or dictionary of columns in columnar mode.
+
+        :raises ValueError: Raised if the file is not valid JSON, or an object does not match the schema.
+        """
+
+        if input_format not in ("array", "lines"):
+            raise ValueError("Unsupported input format: " + str(input_format))
+
+        schema_decoder = JsonSchemaDecoder(field_list, record_format)
+
+        if input_format == "lines":
+            return schema_decoder.decode_lines(source)
+
+        return schema_decoder.decode_items(source, path)
@@ -1,3 +1,5 @@
+from gap_finder import GapFinder
 from number_utils import NumberUtils
 
-__all__ = ["NumberUtils"]
+__all__ = ["GapFinder",
+           "NumberUtils"]
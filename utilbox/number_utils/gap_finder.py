@@ -0,0 +1,195 @@
+"""
+Utility module to find the missing numbers of large integer sequences, as ranges.
+"""
+
+import operator
+import itertools
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# input length from which sequences are diffed with NumPy, when it is installed
+NUMPY_MIN_SIZE = 10000
+
+# largest ratio of the spanned range to the input length for which unsorted input is marked in a bitmap
+BITMAP_MAX_SPAN_RATIO = 8
+
+
+class GapFinder:
+    """
+    Utility class which finds the numbers missing from a sequence of integers, such as the holes in a column of
+    database IDs, and reports them as inclusive (start, end) ranges rather than one by one.
+
+    Sorted input, including streams, is scanned in a single pass, keeping only the previous number in memory.
+    Large sequences are diffed with NumPy when it is installed. Unsorted input is either marked in a bitmap of
+    one byte per number of the spanned range, when the input is dense enough, or sorted first.
+
+    Example:
+        print GapFinder.find_gaps([1, 2, 5, 6, 9])
+        [(3, 4), (7, 8)]
+
+        for gap_start, gap_end in GapFinder.iterate_gaps(mysql_utils.iterate_ids(...), start=1):
+            print gap_start, gap_end
+    """
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def iterate_gaps(sorted_number_iter, start=None, end=None):
+        """
+        Finds the gaps of a sorted sequence in a single pass, consuming it lazily. Duplicates are allowed. With an
+        end, the sequence is only consumed up to the first number beyond it.
+
+        :param sorted_number_iter: Iterable of integers in ascending order, such as a generator.
+        :param start: The first number expected, the first number of the sequence if not supplied.
+        :param end: The last number expected, the last number of the sequence if not supplied.
+
+        :return: Generator yielding (start, end) tuples of the missing ranges, in ascending order.
+        :rtype: generator
+
+        :raises ValueError: Raised if the sequence is not sorted.
+        """
+
+        previous_number = start - 1 if start is not None else None
+
+        for number in sorted_number_iter:
+            if start is not None and number < start:
+                continue
+
+            if end is not None and number > end:
+                break
+
+            if previous_number is not None:
+                if number > previous_number + 1:
+                    yield previous_number + 1, number - 1
+                elif number < previous_number:
+                    raise ValueError("Sequence is not sorted: " + str(number) + " follows " + str(previous_number))
+
+            previous_number = number
+
+        if end is not None and previous_number is not None and previous_number < end:
+            yield previous_number + 1, end
+
+    @staticmethod
+    def find_gaps(number_list, start=None, end=None):
+        """
+        Finds the gaps of a sequence, sorted or not, choosing the fastest method for its size and order.
+
+        :param number_list: The list of integers, or a NumPy array.
+        :param start: The first number expected, the smallest number of the sequence if not supplied.
+        :param end: The last number expected, the largest number of the sequence if not supplied.
+
+        :return: List of (start, end) tuples of the missing ranges, in ascending order.
+        :rtype: list
+        """
+
+        if len(number_list) >= NUMPY_MIN_SIZE or hasattr(number_list, "dtype"):
+            gap_list = GapFinder._find_gaps_numpy(number_list, start, end)
+
+            if gap_list is not None:
+                return gap_list
+
+        if all(itertools.imap(operator.le, number_list, itertools.islice(number_list, 1, None))):
+            return list(GapFinder.iterate_gaps(number_list, start, end))
+
+        # unsorted: mark the numbers in a bitmap if their range is dense enough, otherwise sort them
+        low_number = start if start is not None else min(number_list)
+        high_number = end if end is not None else max(number_list)
+
+        if high_number < low_number:
+            return []
+
+        if high_number - low_number + 1 <= BITMAP_MAX_SPAN_RATIO * len(number_list):
+            return GapFinder._find_gaps_bitmap(number_list, low_number, high_number)
+
+        return list(GapFinder.iterate_gaps(sorted(number_list), start, end))
+
+    @staticmethod
+    def count_missing(gap_list):
+        """
+        Counts the numbers of a list of gaps.
+
+        :param gap_list: List of (start, end) tuples.
+
+        :return: The count of missing numbers.
+        :rtype: int
+        """
+
+        return sum(gap_end - gap_start + 1 for gap_start, gap_end in gap_list)
+
+    @staticmethod
+    def expand_gaps(gap_list):
+        """
+        Expands a list of gaps into the missing numbers.
+
+        :param gap_list: List of (start, end) tuples.
+
+        :return: Iterator over the missing numbers, in ascending order.
+        :rtype: iterator
+        """
+
+        return itertools.chain.from_iterable(xrange(gap_start, gap_end + 1) for gap_start, gap_end in gap_list)
+
+    @staticmethod
+    def _find_gaps_numpy(number_list, start, end):
+        """
+        Finds the gaps of a sequence by sorting it if needed and diffing it with NumPy.
+
+        :return: List of (start, end) tuples, None if NumPy is not installed or the numbers do not fit 64 bits.
+        :rtype: list
+        """
+
+        try:
+            import numpy
+        except ImportError:
+            return None
+
+        try:
+            number_array = numpy.asarray(number_list, dtype=numpy.int64)
+        except (OverflowError, TypeError, ValueError):
+            return None
+
+        if number_array.size > 1 and (number_array[1:] < number_array[:-1]).any():
+            number_array = numpy.sort(number_array)
+
+        if start is not None:
+            number_array = numpy.concatenate(([start - 1], number_array[number_array >= start]))
+
+        if end is not None:
+            number_array = numpy.concatenate((number_array[number_array <= end], [end + 1]))
+
+        gap_indices = numpy.flatnonzero(numpy.diff(number_array) > 1)
+
+        return zip((number_array[gap_indices] + 1).tolist(), (number_array[gap_indices + 1] - 1).tolist())
+
+    @staticmethod
+    def _find_gaps_bitmap(number_list, low_number, high_number):
+        """
+        Finds the gaps of an unsorted sequence by marking its numbers in a bitmap, then searching it for runs of
+        unmarked numbers.
+
+        :return: List of (start, end) tuples.
+        :rtype: list
+        """
+
+        number_bitmap = bytearray(high_number - low_number + 1)
+
+        for number in number_list:
+            if low_number <= number <= high_number:
+                number_bitmap[number - low_number] = 1
+
+        gap_list = []
+        gap_position = number_bitmap.find("\x00")
+
+        while gap_position != -1:
+            run_end = number_bitmap.find("\x01", gap_position)
+
+            if run_end == -1:
+                run_end = len(number_bitmap)
+
+            gap_list.append((low_number + gap_position, low_number + run_end - 1))
+            gap_position = number_bitmap.find("\x00", run_end)
+
+        return gap_list
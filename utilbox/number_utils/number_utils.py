@@ -2,6 +2,7 @@
 Utility module to handle manipulation of numeric data.
 """
 
+from utilbox.number_utils.gap_finder import GapFinder
 
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
@@ -19,21 +20,56 @@ class NumberUtils():
     @staticmethod
     def get_missing_numbers(number_list):
         """
-        Takes a sequence of numbers and returns a copy additionally containing all the missing numbers in the sequence.
+        Takes a sequence of numbers and returns the numbers missing between its smallest and largest numbers.
 
         Example:
-        If a list [1, 4, 6] is provided as input, the returned list value will be [1, 2, 3, 4, 5, 6].
+        If a list [1, 4, 6] is provided as input, the returned list value will be [2, 3, 5].
+
+        The gaps are found as ranges, without materializing the spanned range. See GapFinder.
 
         :param number_list: The list/sequence of numbers.
 
-        :return: Copy of the input list with additional numbers which were 'missing' in the original.
+        :return: List of the numbers which are 'missing' in the original, in ascending order.
         :rtype: list
         """
 
         # make sure all elements are integers
         number_list = list(map(int, number_list))
-        number_list = sorted(number_list)
 
-        start, end = number_list[0], number_list[-1]
+        return list(GapFinder.expand_gaps(GapFinder.find_gaps(number_list)))
+
+    @staticmethod
+    def get_missing_ranges(number_list, start=None, end=None):
+        """
+        Takes a sequence of numbers, sorted or not, and returns the ranges of numbers missing from it.
+
+        Example:
+        If a list [1, 4, 6] is provided as input, the returned list value will be [(2, 3), (5, 5)].
+
+        :param number_list: The list/sequence of integers.
+        :param start: The first number expected, the smallest number of the sequence if not supplied.
+        :param end: The last number expected, the largest number of the sequence if not supplied.
+
+        :return: List of inclusive (start, end) tuples of the missing ranges, in ascending order.
+        :rtype: list
+        """
+
+        return GapFinder.find_gaps(number_list, start, end)
+
+    @staticmethod
+    def iterate_missing_ranges(sorted_number_iter, start=None, end=None):
+        """
+        Takes a sorted stream of numbers, such as IDs read from an ordered query, and yields the ranges of numbers
+        missing from it, in a single pass.
+
+        :param sorted_number_iter: Iterable of integers in ascending order.
+        :param start: The first number expected, the first number of the stream if not supplied.
+        :param end: The last number expected, the last number of the stream if not supplied.
+
+        :return: Generator yielding inclusive (start, end) tuples of the missing ranges.
+        :rtype: generator
+
+        :raises ValueError: Raised if the stream is not sorted.
+        """
 
-        return sorted(set(xrange(start, end + 1)).difference(number_list))
+        return GapFinder.iterate_gaps(sorted_number_iter, start, end)
@@ -180,6 +180,38 @@ class DirUtils:
 
         return False
 
+    @staticmethod
+    def iterate_files(source_dir, filter_pattern=None):
+        """
+        Walks a directory tree, yielding the full path of every file whose name matches the supplied pattern.
+
+        Unlike 'get_dir_contents', sub-directories are searched recursively and paths are produced lazily, so
+        trees holding many thousands of files can be processed without building a list first. Directories
+        and files are visited in sorted order.
+
+        :param source_dir: The path of the root directory to be searched.
+        :param filter_pattern: The pattern to be searched for in file names, all files if not supplied.
+
+        :return: Generator yielding file paths, nothing if the directory is not valid.
+        :rtype: generator
+        """
+
+        if not DirUtils.check_valid_dir(source_dir):
+            return
+
+        compiled_pattern = None
+
+        if filter_pattern is not None:
+            import re
+            compiled_pattern = re.compile(filter_pattern)
+
+        for dir_path, dir_names, file_names in os.walk(source_dir):
+            dir_names.sort()
+
+            for file_name in sorted(file_names):
+                if compiled_pattern is None or compiled_pattern.search(file_name):
+                    yield os.path.join(dir_path, file_name)
+
     @staticmethod
     def get_dir_metadata(dir_path, size_unit="k", time_format="%Y-%m-%d %I:%M:%S"):
         """
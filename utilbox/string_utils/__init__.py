@@ -1,5 +1,21 @@
+from text_sanitizer import TextSanitizer
 from text_utils import TextUtils
+from line_index import LineIndex
+from line_editor import LineEditor
+from keyword_matcher import KeywordMatcher
+from file_grep import FileGrep
+from text_diff import TextDiff
+from lookup_index import LookupIndex
+from text_pipeline import TextPipeline
 from string_utils import StringUtils
 
-__all__ = ["TextUtils",
+__all__ = ["TextSanitizer",
+           "TextUtils",
+           "LineIndex",
+           "LineEditor",
+           "KeywordMatcher",
+           "FileGrep",
+           "TextDiff",
+           "LookupIndex",
+           "TextPipeline",
            "StringUtils"]
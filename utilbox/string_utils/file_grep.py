@@ -0,0 +1,235 @@
+"""
+Utility module to search many files for a pattern, in parallel.
+"""
+
+import os
+import re
+import mmap
+import sre_parse
+import sre_constants
+
+from utilbox.os_utils import DirUtils
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class FileGrep:
+    """
+    Utility class which searches the lines of files for a regular expression, like the 'grep' command.
+
+    Each file is memory-mapped and searched as raw bytes, without being read into memory or split into lines.
+    Before the regular expression runs, the file is checked for a literal substring which every match must
+    contain, so files which cannot match are skipped after a single fast scan. The literal is extracted from
+    the pattern automatically, or can be supplied.
+
+    Whole trees are searched by distributing files across a pool of processes, results being streamed back
+    file by file, either in the order the files were found or as soon as each file is done.
+
+    Patterns are compiled with re.MULTILINE, so '^' and '$' match at line boundaries. A match is reported on
+    the line where it starts, and each line is reported at most once.
+
+    Example:
+        grep = FileGrep(r"ERROR .* timeout")
+        for file_path, line_number, line in grep.search_tree("/var/log/app", filter_pattern=r"\\.log$"):
+            print file_path, line_number, line
+    """
+
+    def __init__(self, pattern, ignore_case=False, literal=None):
+        """
+        :param pattern: The regular expression to be searched for.
+        :param ignore_case: If True, matches regardless of case. Disables the literal prefilter.
+        :param literal: Substring which every match contains, extracted from the pattern if not supplied.
+        """
+
+        self.pattern = pattern
+        self.flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        # compiled here so that invalid patterns fail before any file is searched
+        self.compiled_pattern = re.compile(pattern, self.flags)
+
+        if ignore_case:
+            self.literal = None
+        elif literal is not None:
+            self.literal = literal
+        else:
+            self.literal = FileGrep.extract_literal(pattern)
+
+    @staticmethod
+    def extract_literal(pattern):
+        """
+        Extracts the longest run of literal characters which every match of the pattern must contain.
+
+        Only characters at the top level of the pattern are considered, so patterns with a top-level
+        alternation, or made entirely of groups and classes, have no literal. Neither have patterns setting the
+        inline '(?i)' flag, as their literal characters match regardless of case.
+
+        :param pattern: The regular expression.
+
+        :return: The literal substring, None if the pattern has none.
+        :rtype: str
+        """
+
+        try:
+            parsed_pattern = sre_parse.parse(pattern)
+        except (sre_constants.error, ValueError):
+            return None
+
+        if parsed_pattern.pattern.flags & re.IGNORECASE:
+            return None
+
+        longest_literal = ""
+        current_literal = ""
+
+        for op_code, op_value in parsed_pattern:
+            if op_code == sre_constants.LITERAL and op_value < 256:
+                current_literal += chr(op_value)
+            else:
+                current_literal = ""
+
+            if len(current_literal) > len(longest_literal):
+                longest_literal = current_literal
+
+        return longest_literal or None
+
+    def search_file(self, file_path):
+        """
+        Searches a single file.
+
+        :param file_path: The full path of the file to be searched.
+
+        :return: List of (file path, line number, line) tuples, empty if the file is empty or cannot be read.
+        :rtype: list
+        """
+
+        return _search_file((file_path, self.pattern, self.flags, self.literal))[1]
+
+    def search_files(self, file_paths, process_count=None, ordered=True, chunk_size=8):
+        """
+        Searches a sequence of files on a pool of processes.
+
+        :param file_paths: Iterable of full file paths, consumed lazily.
+        :param process_count: The number of worker processes, the number of CPUs if not supplied. With 1, files
+                              are searched in the current process.
+        :param ordered: If True, results follow the order of 'file_paths', otherwise each file's results are
+                        yielded as soon as it is searched.
+        :param chunk_size: The number of files handed to a worker at a time.
+
+        :return: Generator yielding (file path, line number, line) tuples.
+        :rtype: generator
+        """
+
+        task_iter = ((file_path, self.pattern, self.flags, self.literal) for file_path in file_paths)
+
+        if process_count == 1:
+            for task in task_iter:
+                for result in _search_file(task)[1]:
+                    yield result
+
+            return
+
+        import multiprocessing
+
+        worker_pool = multiprocessing.Pool(process_count)
+
+        try:
+            if ordered:
+                file_result_iter = worker_pool.imap(_search_file, task_iter, chunk_size)
+            else:
+                file_result_iter = worker_pool.imap_unordered(_search_file, task_iter, chunk_size)
+
+            for _, result_list in file_result_iter:
+                for result in result_list:
+                    yield result
+
+            worker_pool.close()
+        finally:
+            # also stops the workers if the consumer abandons the generator
+            worker_pool.terminate()
+            worker_pool.join()
+
+    def search_tree(self, source_dir, filter_pattern=None, process_count=None, ordered=True, chunk_size=8):
+        """
+        Searches every file of a directory tree, see 'search_files'.
+
+        :param source_dir: The path of the root directory to be searched.
+        :param filter_pattern: The pattern to be searched for in file names, all files if not supplied.
+
+        :return: Generator yielding (file path, line number, line) tuples.
+        :rtype: generator
+        """
+
+        return self.search_files(DirUtils.iterate_files(source_dir, filter_pattern), process_count, ordered,
+                                 chunk_size)
+
+
+def _search_file(task):
+    """
+    Searches a memory-mapped file for a pattern. Defined at module level, so it can be run by pool workers.
+
+    :param task: Tuple of the file path, the pattern, its flags and its literal prefilter.
+
+    :return: Tuple of the file path and its list of (file path, line number, line) tuples.
+    :rtype: tuple
+    """
+
+    file_path, pattern, flags, literal = task
+    result_list = []
+
+    try:
+        file_handle = open(file_path, "rb")
+    except (IOError, OSError):
+        return file_path, result_list
+
+    try:
+        # empty files cannot be memory-mapped
+        file_map = None
+
+        if os.fstat(file_handle.fileno()).st_size > 0:
+            file_map = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, mmap.error):
+        file_map = None
+
+    if file_map is None:
+        file_handle.close()
+        return file_path, result_list
+
+    try:
+        if literal is not None and file_map.find(literal) == -1:
+            return file_path, result_list
+
+        # compiled patterns are cached by the re module, once per worker process
+        compiled_pattern = re.compile(pattern, flags)
+        file_size = file_map.size()
+        line_number = 1
+        counted_offset = 0
+        search_offset = 0
+
+        while search_offset < file_size:
+            match = compiled_pattern.search(file_map, search_offset)
+
+            if match is None:
+                break
+
+            if match.start() == file_size and file_map[file_size - 1] == "\n":
+                # empty match after the final newline, which does not start a line
+                break
+
+            line_start = file_map.rfind("\n", 0, match.start()) + 1
+            line_end = file_map.find("\n", match.start())
+
+            if line_end == -1:
+                line_end = file_size
+
+            line_number += file_map[counted_offset:line_start].count("\n")
+            counted_offset = line_start
+
+            result_list.append((file_path, line_number, file_map[line_start:line_end]))
+
+            # continue on the next line, so each line is reported once
+            search_offset = line_end + 1
+    finally:
+        file_map.close()
+        file_handle.close()
+
+    return file_path, result_list
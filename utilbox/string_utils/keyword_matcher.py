@@ -0,0 +1,208 @@
+"""
+Utility module to search text for many literal keywords at once.
+"""
+
+import collections
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class KeywordMatcher:
+    """
+    Utility class which finds all occurrences of a set of literal keywords in a single pass over a text.
+
+    The keywords are compiled once into an Aho-Corasick automaton, so searching costs time linear in the
+    length of the text plus the number of matches, however many keywords there are. Overlapping matches and
+    keywords contained within other keywords are all reported.
+
+    Example:
+        matcher = KeywordMatcher(["error", "timeout", "refused"], ignore_case=True)
+        for line_number, keyword in matcher.find_in_lines(log_text):
+            print line_number, keyword
+    """
+
+    def __init__(self, keyword_list, ignore_case=False):
+        """
+        :param keyword_list: The keywords to search for. Empty keywords are ignored.
+        :param ignore_case: If True, keywords and text are compared regardless of case.
+        """
+
+        self.ignore_case = ignore_case
+        self.keyword_list = []
+
+        # per-state transitions, failure link, keywords ending at the state and link to the next state with output
+        self.goto_list = [{}]
+        self.fail_list = [0]
+        self.output_list = [[]]
+        self.output_link_list = [0]
+
+        for keyword in keyword_list:
+            self.add_keyword(keyword)
+
+        self.build()
+
+    def add_keyword(self, keyword):
+        """
+        Adds a keyword to the automaton. The automaton must be rebuilt, using 'build', before searching again.
+
+        :param keyword: The keyword to be added.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        if not keyword:
+            return
+
+        keyword_index = len(self.keyword_list)
+        self.keyword_list.append(keyword)
+
+        if self.ignore_case:
+            keyword = keyword.lower()
+
+        state = 0
+
+        for char in keyword:
+            next_state = self.goto_list[state].get(char)
+
+            if next_state is None:
+                next_state = len(self.goto_list)
+                self.goto_list.append({})
+                self.fail_list.append(0)
+                self.output_list.append([])
+                self.output_link_list.append(0)
+                self.goto_list[state][char] = next_state
+
+            state = next_state
+
+        self.output_list[state].append(keyword_index)
+
+    def build(self):
+        """
+        Computes the failure and output links of the automaton, breadth-first from the root.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        state_queue = collections.deque()
+
+        for next_state in self.goto_list[0].values():
+            self.fail_list[next_state] = 0
+            self.output_link_list[next_state] = 0
+            state_queue.append(next_state)
+
+        while state_queue:
+            state = state_queue.popleft()
+
+            for char, next_state in self.goto_list[state].items():
+                state_queue.append(next_state)
+
+                fail_state = self.fail_list[state]
+
+                while fail_state and char not in self.goto_list[fail_state]:
+                    fail_state = self.fail_list[fail_state]
+
+                fail_state = self.goto_list[fail_state].get(char, 0)
+                self.fail_list[next_state] = fail_state
+
+                if self.output_list[fail_state]:
+                    self.output_link_list[next_state] = fail_state
+                else:
+                    self.output_link_list[next_state] = self.output_link_list[fail_state]
+
+    def find_all(self, text):
+        """
+        Finds all keyword occurrences within the text.
+
+        :param text: The text to be searched.
+
+        :return: Generator yielding (start offset, keyword) tuples, in order of their end offset.
+        :rtype: generator
+        """
+
+        if self.ignore_case:
+            text = text.lower()
+
+        goto_list = self.goto_list
+        fail_list = self.fail_list
+        state = 0
+
+        for offset, char in enumerate(text):
+            while state and char not in goto_list[state]:
+                state = fail_list[state]
+
+            state = goto_list[state].get(char, 0)
+
+            if state:
+                for keyword_index in self._get_outputs(state):
+                    keyword = self.keyword_list[keyword_index]
+                    yield offset - len(keyword) + 1, keyword
+
+    def contains_any(self, text):
+        """
+        Checks if the text contains at least one of the keywords, stopping at the first match.
+
+        :param text: The text to be searched.
+
+        :return: True if a keyword was found, False otherwise.
+        :rtype: bool
+        """
+
+        for _ in self.find_all(text):
+            return True
+
+        return False
+
+    def count_matches(self, text):
+        """
+        Counts the occurrences of each keyword within the text.
+
+        :param text: The text to be searched.
+
+        :return: Dictionary mapping each keyword found to its occurrence count.
+        :rtype: dict
+        """
+
+        match_count_map = collections.defaultdict(int)
+
+        for _, keyword in self.find_all(text):
+            match_count_map[keyword] += 1
+
+        return dict(match_count_map)
+
+    def find_in_lines(self, text):
+        """
+        Finds all keyword occurrences, reporting the line on which each was found.
+
+        Keywords spanning a newline are not reported, as matching restarts on every line.
+
+        :param text: The text to be searched, or an iterable of lines such as an open file.
+
+        :return: Generator yielding (line number, keyword) tuples, with line numbers starting from 1.
+        :rtype: generator
+        """
+
+        line_iter = text.split("\n") if isinstance(text, basestring) else text
+
+        for line_number, line in enumerate(line_iter, 1):
+            for _, keyword in self.find_all(line.rstrip("\n")):
+                yield line_number, keyword
+
+    def _get_outputs(self, state):
+        """
+        Collects the keywords ending at a state, following its output links.
+
+        :param state: The automaton state.
+
+        :return: Generator yielding keyword indices.
+        :rtype: generator
+        """
+
+        while state:
+            for keyword_index in self.output_list[state]:
+                yield keyword_index
+
+            state = self.output_link_list[state]
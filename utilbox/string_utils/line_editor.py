@@ -0,0 +1,307 @@
+"""
+Utility module to delete and edit many lines of a text in a single pass.
+"""
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class LineEditor:
+    """
+    Utility class which collects line deletions and edits, and applies all of them in one linear pass.
+
+    Lines are selected by line number (starting from 1, negative numbers counting back from the last line),
+    by range of line numbers, or by a predicate receiving the line text. All selections refer to the line
+    numbers of the original text, so they are not affected by earlier deletions. A deleted line is never
+    edited, and when several edits select the same line they are applied in the order they were added.
+
+    Example:
+        editor = LineEditor()
+        editor.delete_lines([1, -1]).delete_range(10, 20).delete_matching(StringUtils.is_blank)
+        updated_text = editor.apply(text)
+        editor.apply_file("in.log", "out.log")
+    """
+
+    def __init__(self):
+        self.delete_line_list = []
+        self.delete_range_list = []
+        self.delete_predicate_list = []
+        self.replace_line_map = {}
+        self.transform_list = []
+
+    def delete_lines(self, line_numbers):
+        """
+        Selects lines for deletion by line number.
+
+        :param line_numbers: Iterable of line numbers, starting from 1, negative numbers counting from the end.
+
+        :return: The current instance, to allow chaining.
+        :rtype: LineEditor
+        """
+
+        self.delete_line_list.extend(line_numbers)
+
+        return self
+
+    def delete_range(self, start_line_number, end_line_number):
+        """
+        Selects a range of lines for deletion.
+
+        :param start_line_number: The first line of the range, starting from 1, negative counting from the end.
+        :param end_line_number: The last line of the range, included in the deletion.
+
+        :return: The current instance, to allow chaining.
+        :rtype: LineEditor
+        """
+
+        self.delete_range_list.append((start_line_number, end_line_number))
+
+        return self
+
+    def delete_matching(self, predicate):
+        """
+        Selects lines for deletion using a predicate.
+
+        :param predicate: Function receiving the line text, without newline, and returning True to delete it.
+
+        :return: The current instance, to allow chaining.
+        :rtype: LineEditor
+        """
+
+        self.delete_predicate_list.append(predicate)
+
+        return self
+
+    def replace_line(self, line_number, new_line):
+        """
+        Replaces the text of a single line.
+
+        :param line_number: The line number, starting from 1, negative counting from the end.
+        :param new_line: The replacement text, which may itself contain newlines.
+
+        :return: The current instance, to allow chaining.
+        :rtype: LineEditor
+        """
+
+        self.replace_line_map[line_number] = new_line
+
+        return self
+
+    def transform_matching(self, predicate, transform_func):
+        """
+        Replaces the text of every line selected by a predicate with the result of a function.
+
+        :param predicate: Function receiving the line text and returning True to transform it.
+        :param transform_func: Function receiving the line text and returning its replacement.
+
+        :return: The current instance, to allow chaining.
+        :rtype: LineEditor
+        """
+
+        self.transform_list.append((predicate, transform_func))
+
+        return self
+
+    def has_relative_selections(self):
+        """
+        Checks if any selection counts lines from the end, which requires knowing the total line count.
+
+        :return: True if negative line numbers were used, False otherwise.
+        :rtype: bool
+        """
+
+        for line_number in self.delete_line_list + list(self.replace_line_map.keys()):
+            if line_number < 0:
+                return True
+
+        for start_line_number, end_line_number in self.delete_range_list:
+            if start_line_number < 0 or end_line_number < 0:
+                return True
+
+        return False
+
+    def apply(self, text):
+        """
+        Applies all deletions and edits to an in-memory text.
+
+        Lines follow the semantics of text.split("\\n"), so a text ending with a newline has an empty last line.
+
+        :param text: The text to be edited.
+
+        :return: The edited text.
+        :rtype: str
+        """
+
+        text_lines = text.split("\n")
+
+        return "\n".join(self.iterate_edited(text_lines, len(text_lines)))
+
+    def apply_file(self, source, destination, chunk_size=1048576):
+        """
+        Applies all deletions and edits to a file, streaming it line by line, in constant memory.
+
+        Lines are numbered as the file yields them, so a trailing newline does not start an extra, empty line.
+        If lines are selected relative to the end, the source is read twice: once to count its lines, and
+        once to edit it. This requires the source to be a path or a seekable file object.
+
+        :param source: The full path of the source file, or a file object opened for reading.
+        :param destination: The full path of the destination file, or a file object opened for writing.
+        :param chunk_size: The block size used when counting lines.
+
+        :return: The count of lines written.
+        :rtype: int
+        """
+
+        source_handle = open(source, "rb") if isinstance(source, basestring) else source
+        destination_handle = open(destination, "wb") if isinstance(destination, basestring) else destination
+
+        try:
+            line_count = None
+
+            if self.has_relative_selections():
+                start_position = source_handle.tell()
+                line_count = LineEditor.count_file_lines(source_handle, chunk_size)
+                source_handle.seek(start_position)
+
+            written_count = 0
+
+            for line in self.iterate_edited(LineEditor._strip_line_endings(source_handle), line_count):
+                destination_handle.write(line + "\n")
+                written_count += 1
+
+            return written_count
+        finally:
+            if source_handle is not source:
+                source_handle.close()
+
+            if destination_handle is not destination:
+                destination_handle.close()
+
+    @staticmethod
+    def count_file_lines(file_handle, chunk_size=1048576):
+        """
+        Counts the lines of an open file by reading it in fixed-size blocks from its current position.
+
+        A last line without a trailing newline is counted as a line.
+
+        :param file_handle: The file object to be read.
+        :param chunk_size: The block size in bytes.
+
+        :return: The line count.
+        :rtype: int
+        """
+
+        line_count = 0
+        last_chunk = ""
+
+        while True:
+            chunk = file_handle.read(chunk_size)
+
+            if not chunk:
+                break
+
+            line_count += chunk.count("\n")
+            last_chunk = chunk
+
+        if last_chunk and not last_chunk.endswith("\n"):
+            line_count += 1
+
+        return line_count
+
+    def iterate_edited(self, line_iter, line_count=None):
+        """
+        Applies all deletions and edits to a sequence of lines, yielding the resulting lines one at a time.
+
+        :param line_iter: Iterable of lines, without newline characters.
+        :param line_count: The total number of lines, required only if lines are selected relative to the end.
+
+        :return: Generator yielding the edited lines.
+        :rtype: generator
+        """
+
+        if line_count is None and self.has_relative_selections():
+            raise ValueError("Line count is required for selections relative to the last line.")
+
+        # merge single lines and ranges into sorted, absolute ranges, walked with a single pointer
+        range_list = [(line_number, line_number) for line_number in self.delete_line_list]
+        range_list.extend(self.delete_range_list)
+        range_list = sorted([(LineEditor._resolve(start, line_count), LineEditor._resolve(end, line_count))
+                             for start, end in range_list])
+
+        replace_map = dict([(LineEditor._resolve(line_number, line_count), new_line)
+                            for line_number, new_line in self.replace_line_map.items()])
+
+        range_index = 0
+        line_number = 0
+
+        for line in line_iter:
+            line_number += 1
+
+            while range_index < len(range_list) and range_list[range_index][1] < line_number:
+                range_index += 1
+
+            if range_index < len(range_list) and range_list[range_index][0] <= line_number:
+                continue
+
+            if self._is_deleted_by_predicate(line):
+                continue
+
+            if line_number in replace_map:
+                line = replace_map[line_number]
+
+            for predicate, transform_func in self.transform_list:
+                if predicate(line):
+                    line = transform_func(line)
+
+            yield line
+
+    def _is_deleted_by_predicate(self, line):
+        """
+        Checks if any deletion predicate selects the line.
+
+        :param line: The line text.
+
+        :return: True if the line is to be deleted, False otherwise.
+        :rtype: bool
+        """
+
+        for predicate in self.delete_predicate_list:
+            if predicate(line):
+                return True
+
+        return False
+
+    @staticmethod
+    def _resolve(line_number, line_count):
+        """
+        Converts a line number counting from the end into an absolute line number.
+
+        :param line_number: The line number, negative numbers counting from the end.
+        :param line_count: The total number of lines.
+
+        :return: The absolute line number.
+        :rtype: int
+        """
+
+        if line_number < 0:
+            return line_count + line_number + 1
+
+        return line_number
+
+    @staticmethod
+    def _strip_line_endings(file_handle):
+        """
+        Iterates over the lines of a file, removing the trailing newline of each line.
+
+        :param file_handle: The file object to be read.
+
+        :return: Generator yielding the lines.
+        :rtype: generator
+        """
+
+        for line in file_handle:
+            if line.endswith("\n"):
+                yield line[:-1]
+            else:
+                yield line
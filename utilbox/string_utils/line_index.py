@@ -0,0 +1,201 @@
+"""
+Utility module providing random access to the lines of large texts.
+"""
+
+import os
+import mmap
+import array
+import bisect
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class LineIndex:
+    """
+    Index of the line start offsets within a text, held in memory or in a memory-mapped file.
+
+    Offsets are computed once, in a single scan, and stored in a compact array. Afterwards, fetching a line or
+    a range of lines is a constant-time slice of the text, and mapping a character offset back to its line
+    number is a binary search, regardless of the size of the text.
+
+    Lines are numbered from 1 and follow the semantics of text.split("\\n") used throughout StringUtils, so a
+    text ending with a newline has an empty last line.
+
+    Example:
+        line_index = LineIndex.from_file("path/to/large.log")
+        print line_index.get_line(1000000)
+        line_index.close()
+    """
+
+    def __init__(self, text):
+        """
+        :param text: The text to be indexed, either a string or a memory-mapped file.
+        """
+
+        self.text = text
+        self.text_length = len(text)
+        self.file_handle = None
+
+        # start offset of every line
+        self.line_offsets = array.array("l", [0])
+
+        newline_offset = text.find("\n")
+
+        while newline_offset != -1:
+            self.line_offsets.append(newline_offset + 1)
+            newline_offset = text.find("\n", newline_offset + 1)
+
+    @staticmethod
+    def from_file(file_path):
+        """
+        Creates an index over the lines of a file, memory-mapping the file instead of reading it into memory.
+
+        The file is opened read-only and stays open until 'close' is called.
+
+        :param file_path: The full path of the file to be indexed.
+
+        :return: The line index of the file.
+        :rtype: LineIndex
+        """
+
+        file_handle = open(file_path, "rb")
+
+        if os.fstat(file_handle.fileno()).st_size == 0:
+            # empty files cannot be memory-mapped
+            file_handle.close()
+            return LineIndex("")
+
+        line_index = LineIndex(mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ))
+        line_index.file_handle = file_handle
+
+        return line_index
+
+    def close(self):
+        """
+        Releases the memory-mapped file, if any. The index cannot be used afterwards.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        if self.file_handle is not None:
+            self.text.close()
+            self.file_handle.close()
+            self.file_handle = None
+
+    def __len__(self):
+        return len(self.line_offsets)
+
+    def get_line_count(self):
+        """
+        Returns the number of lines in the text.
+
+        :return: The line count.
+        :rtype: int
+        """
+
+        return len(self.line_offsets)
+
+    def get_line_span(self, line_number):
+        """
+        Returns the start and end offsets of the specified line, excluding its newline character.
+
+        :param line_number: The line number, starting from 1.
+
+        :return: Tuple of the start and end offsets of the line.
+        :rtype: tuple
+
+        :raises IndexError: Raised if the line number is out of range.
+        """
+
+        if line_number < 1 or line_number > len(self.line_offsets):
+            raise IndexError("Line number out of range: " + str(line_number))
+
+        line_start = self.line_offsets[line_number - 1]
+
+        if line_number < len(self.line_offsets):
+            return line_start, self.line_offsets[line_number] - 1
+
+        return line_start, self.text_length
+
+    def get_line(self, line_number):
+        """
+        Extracts the specified line, equivalent to StringUtils.extract_line.
+
+        :param line_number: The line number, starting from 1.
+
+        :return: The extracted line, without its newline character.
+        :rtype: str
+        """
+
+        line_start, line_end = self.get_line_span(line_number)
+
+        return self.text[line_start:line_end]
+
+    def get_text_range(self, start_line_number, end_line_number):
+        """
+        Extracts a range of lines as a single block of text, with a single slice of the underlying text.
+
+        :param start_line_number: The first line of the range, starting from 1.
+        :param end_line_number: The last line of the range, included in the result.
+
+        :return: The text of the lines, separated by newlines, without a trailing newline.
+        :rtype: str
+        """
+
+        if end_line_number < start_line_number:
+            return ""
+
+        return self.text[self.get_line_span(start_line_number)[0]:self.get_line_span(end_line_number)[1]]
+
+    def get_lines(self, start_line_number, end_line_number):
+        """
+        Extracts a range of lines as a list.
+
+        :param start_line_number: The first line of the range, starting from 1.
+        :param end_line_number: The last line of the range, included in the result.
+
+        :return: List of the extracted lines, without newline characters.
+        :rtype: list
+        """
+
+        if end_line_number < start_line_number:
+            return []
+
+        return self.get_text_range(start_line_number, end_line_number).split("\n")
+
+    def get_line_number(self, offset):
+        """
+        Determines the line containing the character at the specified offset, using a binary search.
+
+        :param offset: The character offset within the text, starting from 0.
+
+        :return: The line number, starting from 1.
+        :rtype: int
+
+        :raises IndexError: Raised if the offset is out of range.
+        """
+
+        if offset < 0 or offset > self.text_length:
+            raise IndexError("Offset out of range: " + str(offset))
+
+        return bisect.bisect_right(self.line_offsets, offset)
+
+    def iterate_lines(self, start_line_number=1, end_line_number=None):
+        """
+        Iterates over a range of lines, slicing each line from the text only when it is reached.
+
+        :param start_line_number: The first line of the range, starting from 1.
+        :param end_line_number: The last line of the range, the last line of the text if not supplied.
+
+        :return: Generator yielding the lines, without newline characters.
+        :rtype: generator
+        """
+
+        if end_line_number is None:
+            end_line_number = len(self.line_offsets)
+
+        for line_number in xrange(max(start_line_number, 1), end_line_number + 1):
+            yield self.get_line(line_number)
@@ -0,0 +1,294 @@
+"""
+Utility module to look up strings by exact value, case-insensitively, by prefix or by similarity.
+"""
+
+import math
+import array
+import bisect
+import unicodedata
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class LookupIndex:
+    """
+    Index over a collection of names, answering lookups without comparing the query against every name.
+
+    Each name is normalized once when added: unicode names are NFKC-normalized, and all names are lowercased
+    and stripped of surrounding whitespace. Lookups then cost:
+     - exact and case-insensitive membership: one hash lookup, O(1).
+     - prefix search: a binary search over the sorted normalized keys, plus O(k) for k results.
+     - similarity search: a scan of the n-gram posting lists of the rarest n-grams of the query only, followed
+       by an exact Dice similarity check of the few candidates found.
+
+    Example:
+        lookup_index = LookupIndex(country_names)
+        lookup_index.contains_ignore_case("INDIA")
+        lookup_index.find_similar("Indai", threshold=0.4)
+    """
+
+    def __init__(self, name_list=None, ngram_size=3):
+        """
+        :param name_list: The names to be indexed.
+        :param ngram_size: The length of the n-grams used for similarity search.
+        """
+
+        self.ngram_size = ngram_size
+        self.name_set = set()
+
+        # normalized key -> id, and per id, the key, its original names and its n-gram count
+        self.key_id_map = {}
+        self.key_list = []
+        self.key_name_list = []
+        self.key_ngram_count = array.array("l")
+
+        # n-gram -> ids of the keys containing it
+        self.ngram_posting_map = {}
+
+        # sorted normalized keys, rebuilt on the first prefix search after names are added
+        self.sorted_key_list = None
+
+        if name_list is not None:
+            self.add_all(name_list)
+
+    @staticmethod
+    def normalize_key(name):
+        """
+        Normalizes a name for case-insensitive comparison.
+
+        :param name: The name to be normalized.
+
+        :return: The normalized name.
+        :rtype: str
+        """
+
+        if isinstance(name, unicode):
+            name = unicodedata.normalize("NFKC", name)
+
+        return name.strip().lower()
+
+    def get_ngrams(self, key):
+        """
+        Breaks a normalized key into its distinct n-grams, padding both ends so that short keys have n-grams too.
+
+        :param key: The normalized key.
+
+        :return: Set of the n-grams of the key.
+        :rtype: set
+        """
+
+        padded_key = "$" + key + "$"
+
+        if len(padded_key) <= self.ngram_size:
+            return {padded_key}
+
+        return set([padded_key[i:i + self.ngram_size] for i in xrange(len(padded_key) - self.ngram_size + 1)])
+
+    def add(self, name):
+        """
+        Adds a name to the index.
+
+        :param name: The name to be added.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        if name in self.name_set:
+            return
+
+        self.name_set.add(name)
+        key = LookupIndex.normalize_key(name)
+        key_id = self.key_id_map.get(key)
+
+        if key_id is not None:
+            self.key_name_list[key_id].append(name)
+            return
+
+        key_id = len(self.key_list)
+        self.key_id_map[key] = key_id
+        self.key_list.append(key)
+        self.key_name_list.append([name])
+
+        ngram_set = self.get_ngrams(key)
+        self.key_ngram_count.append(len(ngram_set))
+
+        for ngram in ngram_set:
+            posting_list = self.ngram_posting_map.get(ngram)
+
+            if posting_list is None:
+                posting_list = self.ngram_posting_map[ngram] = array.array("l")
+
+            posting_list.append(key_id)
+
+        self.sorted_key_list = None
+
+    def add_all(self, name_list):
+        """
+        Adds several names to the index.
+
+        :param name_list: Iterable of the names to be added.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        for name in name_list:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.name_set)
+
+    def __contains__(self, name):
+        return name in self.name_set
+
+    def contains(self, name):
+        """
+        Checks if the exact name was indexed.
+
+        :param name: The name to be looked up.
+
+        :return: True if the name was indexed, False otherwise.
+        :rtype: bool
+        """
+
+        return name in self.name_set
+
+    def contains_ignore_case(self, name):
+        """
+        Checks if a name equal to the supplied name, regardless of case, was indexed.
+
+        Names are compared by their normalized keys, see 'normalize_key'. This is more lenient than calling
+        StringUtils.equals_ignore_case against every indexed name, as surrounding whitespace is ignored and
+        unicode names which differ only in compatibility forms, such as full-width letters, are equal.
+
+        :param name: The name to be looked up.
+
+        :return: True if a matching name was indexed, False otherwise.
+        :rtype: bool
+        """
+
+        return LookupIndex.normalize_key(name) in self.key_id_map
+
+    def get_matches_ignore_case(self, name):
+        """
+        Returns the indexed names equal to the supplied name, regardless of case.
+
+        :param name: The name to be looked up.
+
+        :return: List of the matching names, in the order they were added.
+        :rtype: list
+        """
+
+        key_id = self.key_id_map.get(LookupIndex.normalize_key(name))
+
+        if key_id is None:
+            return []
+
+        return list(self.key_name_list[key_id])
+
+    def find_prefix(self, prefix, limit=None):
+        """
+        Returns the indexed names starting with the supplied prefix, regardless of case.
+
+        :param prefix: The prefix to be looked up.
+        :param limit: The largest number of names to return, all if not supplied.
+
+        :return: List of the matching names, in order of their normalized keys.
+        :rtype: list
+        """
+
+        if self.sorted_key_list is None:
+            self.sorted_key_list = sorted(self.key_list)
+
+        prefix = LookupIndex.normalize_key(prefix)
+        position = bisect.bisect_left(self.sorted_key_list, prefix)
+        match_list = []
+
+        while position < len(self.sorted_key_list) and self.sorted_key_list[position].startswith(prefix):
+            match_list.extend(self.key_name_list[self.key_id_map[self.sorted_key_list[position]]])
+            position += 1
+
+            if limit is not None and len(match_list) >= limit:
+                return match_list[:limit]
+
+        return match_list
+
+    def find_similar(self, name, threshold=0.5, limit=10):
+        """
+        Returns the indexed names most similar to the supplied name, for "did you mean" suggestions.
+
+        Similarity is the Dice coefficient of the n-gram sets of the normalized names, from 0 to 1. Candidates
+        are gathered only from the posting lists of the rarest n-grams of the query, as any name reaching the
+        threshold must share at least one of them, and names whose n-gram count rules out the threshold are
+        skipped before their similarity is computed.
+
+        :param name: The name to be looked up.
+        :param threshold: The lowest similarity of the returned names.
+        :param limit: The largest number of names to return, all if not supplied.
+
+        :return: List of (name, similarity) tuples, most similar first, then in alphabetical order.
+        :rtype: list
+        """
+
+        query_ngram_set = self.get_ngrams(LookupIndex.normalize_key(name))
+        query_ngram_count = len(query_ngram_set)
+
+        # a key sharing 'overlap' n-grams has a similarity of at most 2 * overlap / (query count + overlap)
+        min_overlap = max(1, int(math.ceil(threshold * query_ngram_count / (2.0 - threshold) - 1e-9)))
+
+        if threshold > 0:
+            min_ngram_count = threshold * query_ngram_count / (2.0 - threshold)
+            max_ngram_count = query_ngram_count * (2.0 - threshold) / threshold
+        else:
+            min_ngram_count = 0
+            max_ngram_count = float("inf")
+
+        ngram_list = sorted([ngram for ngram in query_ngram_set if ngram in self.ngram_posting_map],
+                            key=lambda ngram: len(self.ngram_posting_map[ngram]))
+
+        candidate_set = set()
+
+        for ngram in ngram_list[:max(0, query_ngram_count - min_overlap + 1)]:
+            candidate_set.update(self.ngram_posting_map[ngram])
+
+        scored_list = []
+
+        for key_id in candidate_set:
+            ngram_count = self.key_ngram_count[key_id]
+
+            if ngram_count < min_ngram_count - 1e-9 or ngram_count > max_ngram_count + 1e-9:
+                continue
+
+            overlap = len(query_ngram_set & self.get_ngrams(self.key_list[key_id]))
+            similarity = 2.0 * overlap / (query_ngram_count + ngram_count)
+
+            if similarity >= threshold:
+                scored_list.extend([(indexed_name, similarity) for indexed_name in self.key_name_list[key_id]])
+
+        scored_list.sort(key=lambda scored_name: (-scored_name[1], scored_name[0]))
+
+        if limit is not None:
+            return scored_list[:limit]
+
+        return scored_list
+
+    def suggest(self, name, threshold=0.5):
+        """
+        Returns the indexed name most similar to the supplied name.
+
+        :param name: The name to be looked up.
+        :param threshold: The lowest acceptable similarity.
+
+        :return: The most similar name, None if no name reaches the threshold.
+        :rtype: str
+        """
+
+        similar_list = self.find_similar(name, threshold, 1)
+
+        if similar_list:
+            return similar_list[0][0]
+
+        return None
@@ -5,6 +5,9 @@ Utility module to manipulate strings.
 import re
 import types
 
+from utilbox.string_utils.line_editor import LineEditor
+from utilbox.string_utils.keyword_matcher import KeywordMatcher
+
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
 __status__ = "Alpha"
@@ -65,36 +68,20 @@ class StringUtils:
         :rtype: str
         """
 
-        text_lines = text.split("\n")
-
-        if len(text_lines) > 0:
-            if line_count > 0:
-                for index in range(0, line_count):
-                    text_lines.remove(text_lines[index])
-            elif line_count < 0:
-                text_lines_r = text_lines
-                text_lines_r.reverse()
-
-                # print "baa... " + str(text_lines) + "...aab"
-                # print "baaR... " + str(text_lines_r) + "...Raab"
-
-                for index in range(0, line_count):
-                    text_lines_r.remove(text_lines_r[index])
-
-                text_lines = text_lines_r
-                text_lines.reverse()
-            else:
-                pass
+        if line_count > 0:
+            return LineEditor().delete_range(1, line_count).apply(text)
+        elif line_count < 0:
+            return LineEditor().delete_range(line_count, -1).apply(text)
 
-        updated_text = StringUtils.join_list_elements(text_lines, "\n")
-
-        return updated_text
+        return text
 
     @staticmethod
     def remove_lines_range(text, start_line_number, end_line_number):
         """
         Removes a range of lines from the supplied text.
 
+        Line numbers are zero-based, and the ending line is not removed.
+
         :param text: Text from which lines are to be removed.
         :param start_line_number: Starting line number where removal will begin.
         :param end_line_number: Ending line number where removal will end.
@@ -103,21 +90,15 @@ class StringUtils:
         :rtype: str
         """
 
-        text_lines = text.split("\n")
-
-        if len(text_lines) > 0:
-            for index in range(start_line_number, end_line_number):
-                text_lines.remove(text_lines[index])
-
-        updated_text = StringUtils.join_list_elements(text_lines, "\n")
-
-        return updated_text
+        return LineEditor().delete_range(start_line_number + 1, end_line_number).apply(text)
 
     @staticmethod
     def remove_lines_list(text, line_list):
         """
         Removes specified lines from the supplied text.
 
+        Line numbers are zero-based, negative numbers counting back from the last line as in list indexing.
+
         :param text: Text from which lines are to be removed.
         :param line_list: List containing specific lines to remove from the text.
 
@@ -125,15 +106,9 @@ class StringUtils:
         :rtype: str
         """
 
-        text_lines = text.split("\n")
-
-        if len(text_lines) > 0:
-            for line_index in line_list:
-                text_lines.remove(text_lines[line_index])
+        line_numbers = [line_index + 1 if line_index >= 0 else line_index for line_index in line_list]
 
-        updated_text = StringUtils.join_list_elements(text_lines, "\n")
-
-        return updated_text
+        return LineEditor().delete_lines(line_numbers).apply(text)
 
     @staticmethod
     def remove_leading_blanks(string):
@@ -258,6 +233,23 @@ class StringUtils:
 
         return False
 
+    @staticmethod
+    def find_keywords(text, keyword_list, ignore_case=False):
+        """
+        Finds the lines containing any of the given keywords, in a single pass over the text.
+
+        For repeated searches with the same keywords, create a KeywordMatcher once and reuse it instead.
+
+        :param text: Text in which the keywords are to be searched.
+        :param keyword_list: List of literal keywords to locate within given text.
+        :param ignore_case: If True, keywords are matched regardless of case.
+
+        :return: List of (line number, keyword) tuples, with line numbers starting from 1.
+        :rtype: list
+        """
+
+        return list(KeywordMatcher(keyword_list, ignore_case).find_in_lines(text))
+
     @staticmethod
     def equals_ignore_case(string1, string2):
         """
@@ -0,0 +1,589 @@
+"""
+Utility module to compare large texts and files line by line.
+"""
+
+import array
+import bisect
+
+from utilbox.string_utils.line_index import LineIndex
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class TextDiff:
+    """
+    Utility class which computes the line differences between two texts, as opcodes, hunks or a unified diff.
+
+    Every line is first interned to an integer id, so the diff algorithms compare integers rather than strings,
+    and lines shared by both sides are stored once. Lines common to the start and end of both sides are
+    skipped before any algorithm runs, so texts differing in a few places cost little more than one scan.
+
+    Two algorithms are available:
+     - 'patience', which anchors the diff on lines occurring exactly once on each side, then diffs the regions
+       between anchors, falling back to Myers for regions without such lines. It is the default, as it is
+       fast on large texts and tends to produce readable hunks.
+     - 'myers', which computes a minimal diff.
+
+    Regions requiring more than 'max_edit_cost' insertions and deletions are reported as a single replaced
+    block, which keeps the cost bounded for unrelated texts. The diff is still correct, but not minimal.
+
+    Lines follow the semantics of text.split("\\n") used throughout StringUtils.
+
+    Example:
+        text_diff = TextDiff.from_files("before.conf", "after.conf")
+        for diff_line in text_diff.iterate_unified_diff("before.conf", "after.conf"):
+            print diff_line
+        text_diff.close()
+    """
+
+    def __init__(self, old_lines, new_lines, algorithm="patience", max_edit_cost=2000):
+        """
+        :param old_lines: The list of lines of the old text.
+        :param new_lines: The list of lines of the new text.
+        :param algorithm: The diff algorithm, either 'patience' or 'myers'.
+        :param max_edit_cost: The largest edit distance computed exactly for a single region.
+        """
+
+        if algorithm not in ("patience", "myers"):
+            raise ValueError("Unsupported diff algorithm: " + str(algorithm))
+
+        self.algorithm = algorithm
+        self.max_edit_cost = max_edit_cost
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+        self.line_index_list = []
+        self.opcode_list = None
+
+        line_id_map = {}
+        self.old_ids = TextDiff._intern_lines(old_lines, line_id_map)
+        self.new_ids = TextDiff._intern_lines(new_lines, line_id_map)
+
+    @staticmethod
+    def from_texts(old_text, new_text, algorithm="patience", max_edit_cost=2000):
+        """
+        Creates a diff of two in-memory texts.
+
+        :param old_text: The old text.
+        :param new_text: The new text.
+        :param algorithm: The diff algorithm, either 'patience' or 'myers'.
+        :param max_edit_cost: The largest edit distance computed exactly for a single region.
+
+        :return: The diff of the texts.
+        :rtype: TextDiff
+        """
+
+        return TextDiff(old_text.split("\n"), new_text.split("\n"), algorithm, max_edit_cost)
+
+    @staticmethod
+    def from_files(old_file_path, new_file_path, algorithm="patience", max_edit_cost=2000):
+        """
+        Creates a diff of two files, without reading either file into memory.
+
+        Both files are memory-mapped through LineIndex. Lines are interned by their hash, keeping only the
+        position of the first occurrence of each distinct line, and line text is sliced from the mapped files
+        only when it is compared or output. The files stay open until 'close' is called.
+
+        :param old_file_path: The full path of the old file.
+        :param new_file_path: The full path of the new file.
+        :param algorithm: The diff algorithm, either 'patience' or 'myers'.
+        :param max_edit_cost: The largest edit distance computed exactly for a single region.
+
+        :return: The diff of the files.
+        :rtype: TextDiff
+        """
+
+        old_index = LineIndex.from_file(old_file_path)
+        new_index = LineIndex.from_file(new_file_path)
+
+        text_diff = TextDiff([], [], algorithm, max_edit_cost)
+        text_diff.old_lines = IndexedLines(old_index)
+        text_diff.new_lines = IndexedLines(new_index)
+        text_diff.line_index_list = [old_index, new_index]
+
+        line_hash_map = {}
+        text_diff.old_ids, next_id = TextDiff._intern_indexed_lines(text_diff.old_lines, line_hash_map, 0)
+        text_diff.new_ids, next_id = TextDiff._intern_indexed_lines(text_diff.new_lines, line_hash_map, next_id)
+
+        return text_diff
+
+    def close(self):
+        """
+        Releases the memory-mapped files of a diff created by 'from_files'.
+
+        :return: Does not return a value.
+        :rtype: None
+        """
+
+        for line_index in self.line_index_list:
+            line_index.close()
+
+        self.line_index_list = []
+
+    def is_equal(self):
+        """
+        Checks if both sides have the same lines.
+
+        :return: True if the texts are equal, False otherwise.
+        :rtype: bool
+        """
+
+        return self.old_ids == self.new_ids
+
+    def get_opcodes(self):
+        """
+        Returns the list of operations turning the old lines into the new lines, as difflib.SequenceMatcher does.
+
+        :return: List of (tag, i1, i2, j1, j2) tuples, where tag is 'equal', 'replace', 'delete' or 'insert',
+                 and old_lines[i1:i2] corresponds to new_lines[j1:j2].
+        :rtype: list
+        """
+
+        if self.opcode_list is None:
+            self.opcode_list = TextDiff._build_opcodes(self._get_matching_blocks(), len(self.old_ids),
+                                                       len(self.new_ids))
+
+        return self.opcode_list
+
+    def get_grouped_opcodes(self, context_size=3):
+        """
+        Groups the opcodes into hunks, keeping up to 'context_size' unchanged lines around each change.
+
+        :param context_size: The number of context lines.
+
+        :return: List of hunks, each a list of opcodes.
+        :rtype: list
+        """
+
+        opcode_list = list(self.get_opcodes())
+
+        if not opcode_list or (len(opcode_list) == 1 and opcode_list[0][0] == "equal"):
+            return []
+
+        # trim the leading and trailing unchanged lines to the context
+        if opcode_list[0][0] == "equal":
+            tag, i1, i2, j1, j2 = opcode_list[0]
+            opcode_list[0] = (tag, max(i1, i2 - context_size), i2, max(j1, j2 - context_size), j2)
+
+        if opcode_list[-1][0] == "equal":
+            tag, i1, i2, j1, j2 = opcode_list[-1]
+            opcode_list[-1] = (tag, i1, min(i2, i1 + context_size), j1, min(j2, j1 + context_size))
+
+        group_list = []
+        current_group = []
+
+        for tag, i1, i2, j1, j2 in opcode_list:
+            # split the hunk at unchanged stretches longer than twice the context
+            if tag == "equal" and i2 - i1 > context_size * 2:
+                current_group.append((tag, i1, min(i2, i1 + context_size), j1, min(j2, j1 + context_size)))
+                group_list.append(current_group)
+                current_group = []
+                i1 = max(i1, i2 - context_size)
+                j1 = max(j1, j2 - context_size)
+
+            current_group.append((tag, i1, i2, j1, j2))
+
+        if current_group and not (len(current_group) == 1 and current_group[0][0] == "equal"):
+            group_list.append(current_group)
+
+        return group_list
+
+    def get_hunks(self, context_size=3):
+        """
+        Returns the changes as structured hunks.
+
+        Each hunk is a dictionary with the 1-based start line and line count on each side, and its lines as
+        (prefix, line) tuples, the prefix being ' ' for context, '-' for removed and '+' for added lines.
+
+        :param context_size: The number of context lines.
+
+        :return: List of hunk dictionaries.
+        :rtype: list
+        """
+
+        hunk_list = []
+
+        for opcode_group in self.get_grouped_opcodes(context_size):
+            first_opcode = opcode_group[0]
+            last_opcode = opcode_group[-1]
+            hunk_line_list = []
+
+            for tag, i1, i2, j1, j2 in opcode_group:
+                if tag == "equal":
+                    hunk_line_list.extend([(" ", self.old_lines[i]) for i in xrange(i1, i2)])
+                    continue
+
+                if tag in ("replace", "delete"):
+                    hunk_line_list.extend([("-", self.old_lines[i]) for i in xrange(i1, i2)])
+
+                if tag in ("replace", "insert"):
+                    hunk_line_list.extend([("+", self.new_lines[j]) for j in xrange(j1, j2)])
+
+            hunk_list.append({"OLD_START": first_opcode[1] + 1,
+                              "OLD_COUNT": last_opcode[2] - first_opcode[1],
+                              "NEW_START": first_opcode[3] + 1,
+                              "NEW_COUNT": last_opcode[4] - first_opcode[3],
+                              "LINES": hunk_line_list})
+
+        return hunk_list
+
+    def iterate_unified_diff(self, old_label="old", new_label="new", context_size=3):
+        """
+        Produces the diff in unified format, one line at a time, as difflib.unified_diff does.
+
+        :param old_label: The name of the old text, used in the header.
+        :param new_label: The name of the new text, used in the header.
+        :param context_size: The number of context lines.
+
+        :return: Generator yielding the lines of the diff, without newline characters.
+        :rtype: generator
+        """
+
+        hunk_list = self.get_hunks(context_size)
+
+        if not hunk_list:
+            return
+
+        yield "--- " + old_label
+        yield "+++ " + new_label
+
+        for hunk in hunk_list:
+            yield "@@ -%s +%s @@" % (TextDiff._format_range(hunk["OLD_START"], hunk["OLD_COUNT"]),
+                                     TextDiff._format_range(hunk["NEW_START"], hunk["NEW_COUNT"]))
+
+            for prefix, line in hunk["LINES"]:
+                yield prefix + line
+
+    def get_unified_diff(self, old_label="old", new_label="new", context_size=3):
+        """
+        Returns the diff in unified format.
+
+        :param old_label: The name of the old text, used in the header.
+        :param new_label: The name of the new text, used in the header.
+        :param context_size: The number of context lines.
+
+        :return: The unified diff, empty if the texts are equal.
+        :rtype: str
+        """
+
+        return "\n".join(self.iterate_unified_diff(old_label, new_label, context_size))
+
+    def _get_matching_blocks(self):
+        """
+        Computes the blocks of lines common to both sides.
+
+        :return: Sorted list of (i, j, size) tuples, meaning old_ids[i:i + size] == new_ids[j:j + size].
+        :rtype: list
+        """
+
+        old_ids = self.old_ids
+        new_ids = self.new_ids
+        block_list = []
+
+        # pending regions, as (old start, old end, new start, new end)
+        region_list = [(0, len(old_ids), 0, len(new_ids))]
+
+        while region_list:
+            a_lo, a_hi, b_lo, b_hi = region_list.pop()
+
+            # common prefix and suffix of the region
+            prefix_size = 0
+
+            while a_lo + prefix_size < a_hi and b_lo + prefix_size < b_hi and \
+                    old_ids[a_lo + prefix_size] == new_ids[b_lo + prefix_size]:
+                prefix_size += 1
+
+            if prefix_size:
+                block_list.append((a_lo, b_lo, prefix_size))
+                a_lo += prefix_size
+                b_lo += prefix_size
+
+            suffix_size = 0
+
+            while a_hi - suffix_size > a_lo and b_hi - suffix_size > b_lo and \
+                    old_ids[a_hi - suffix_size - 1] == new_ids[b_hi - suffix_size - 1]:
+                suffix_size += 1
+
+            if suffix_size:
+                block_list.append((a_hi - suffix_size, b_hi - suffix_size, suffix_size))
+                a_hi -= suffix_size
+                b_hi -= suffix_size
+
+            if a_lo == a_hi or b_lo == b_hi:
+                continue
+
+            anchor_list = []
+
+            if self.algorithm == "patience":
+                anchor_list = TextDiff._find_unique_anchors(old_ids, new_ids, a_lo, a_hi, b_lo, b_hi)
+
+            if not anchor_list:
+                block_list.extend(TextDiff._myers_blocks(old_ids, new_ids, a_lo, a_hi, b_lo, b_hi,
+                                                         self.max_edit_cost))
+                continue
+
+            # the anchors split the region into independent sub-regions
+            for i, j in anchor_list:
+                block_list.append((i, j, 1))
+                region_list.append((a_lo, i, b_lo, j))
+                a_lo = i + 1
+                b_lo = j + 1
+
+            region_list.append((a_lo, a_hi, b_lo, b_hi))
+
+        block_list.sort()
+
+        return block_list
+
+    @staticmethod
+    def _find_unique_anchors(old_ids, new_ids, a_lo, a_hi, b_lo, b_hi):
+        """
+        Finds the longest sequence of lines occurring exactly once on each side, in the same order on both.
+
+        :return: List of (i, j) positions of the anchor lines, in increasing order.
+        :rtype: list
+        """
+
+        # line id -> position, or -1 once the line is seen a second time
+        old_position_map = {}
+
+        for i in xrange(a_lo, a_hi):
+            line_id = old_ids[i]
+            old_position_map[line_id] = -1 if line_id in old_position_map else i
+
+        new_position_map = {}
+
+        for j in xrange(b_lo, b_hi):
+            line_id = new_ids[j]
+
+            if old_position_map.get(line_id, -1) != -1:
+                new_position_map[line_id] = -1 if line_id in new_position_map else j
+
+        pair_list = sorted([(old_position_map[line_id], j)
+                            for line_id, j in new_position_map.iteritems() if j != -1])
+
+        # longest increasing subsequence of the new positions, by patience sorting
+        pile_tops = []
+        pile_top_index_list = []
+        predecessor_list = []
+
+        for pair_index, (_, j) in enumerate(pair_list):
+            pile = bisect.bisect_left(pile_tops, j)
+            predecessor_list.append(pile_top_index_list[pile - 1] if pile else -1)
+
+            if pile == len(pile_tops):
+                pile_tops.append(j)
+                pile_top_index_list.append(pair_index)
+            else:
+                pile_tops[pile] = j
+                pile_top_index_list[pile] = pair_index
+
+        anchor_list = []
+        pair_index = pile_top_index_list[-1] if pile_top_index_list else -1
+
+        while pair_index != -1:
+            anchor_list.append(pair_list[pair_index])
+            pair_index = predecessor_list[pair_index]
+
+        anchor_list.reverse()
+
+        return anchor_list
+
+    @staticmethod
+    def _myers_blocks(old_ids, new_ids, a_lo, a_hi, b_lo, b_hi, max_edit_cost):
+        """
+        Computes the matching blocks of a region with the Myers O(ND) algorithm.
+
+        :return: List of (i, j, size) tuples, empty if the region has no common lines or is too costly.
+        :rtype: list
+        """
+
+        n = a_hi - a_lo
+        m = b_hi - b_lo
+        max_cost = min(n + m, max_edit_cost)
+        offset = max_cost + 1
+
+        # furthest x reached on each diagonal k = x - y, indexed by k + offset
+        v = [0] * (2 * max_cost + 3)
+        trace = []
+        final_cost = None
+
+        for d in xrange(max_cost + 1):
+            trace.append(v[offset - d - 1:offset + d + 2])
+
+            for k in xrange(-d, d + 1, 2):
+                if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                    x = v[offset + k + 1]
+                else:
+                    x = v[offset + k - 1] + 1
+
+                y = x - k
+
+                while x < n and y < m and old_ids[a_lo + x] == new_ids[b_lo + y]:
+                    x += 1
+                    y += 1
+
+                v[offset + k] = x
+
+                if x >= n and y >= m:
+                    final_cost = d
+                    break
+
+            if final_cost is not None:
+                break
+
+        if final_cost is None:
+            return []
+
+        # walk back through the recorded states, collecting the diagonal runs
+        block_list = []
+        x = n
+        y = m
+
+        for d in xrange(final_cost, -1, -1):
+            snapshot = trace[d]
+            k = x - y
+
+            if k == -d or (k != d and snapshot[k + d] < snapshot[k + d + 2]):
+                previous_k = k + 1
+            else:
+                previous_k = k - 1
+
+            previous_x = snapshot[previous_k + d + 1] if d else 0
+            previous_y = previous_x - previous_k if d else 0
+
+            if d:
+                snake_start_x = previous_x + (1 if previous_k == k - 1 else 0)
+            else:
+                snake_start_x = 0
+
+            if x > snake_start_x:
+                block_list.append((a_lo + snake_start_x, b_lo + snake_start_x - k, x - snake_start_x))
+
+            x = previous_x
+            y = previous_y
+
+        block_list.reverse()
+
+        return block_list
+
+    @staticmethod
+    def _build_opcodes(block_list, old_size, new_size):
+        """
+        Converts sorted matching blocks into opcodes, merging adjacent blocks.
+
+        :return: List of (tag, i1, i2, j1, j2) tuples.
+        :rtype: list
+        """
+
+        opcode_list = []
+        i = 0
+        j = 0
+
+        for block_i, block_j, size in block_list + [(old_size, new_size, 0)]:
+            if i < block_i and j < block_j:
+                opcode_list.append(("replace", i, block_i, j, block_j))
+            elif i < block_i:
+                opcode_list.append(("delete", i, block_i, j, block_j))
+            elif j < block_j:
+                opcode_list.append(("insert", i, block_i, j, block_j))
+
+            if size:
+                if opcode_list and opcode_list[-1][0] == "equal":
+                    tag, i1, i2, j1, j2 = opcode_list.pop()
+                    opcode_list.append((tag, i1, block_i + size, j1, block_j + size))
+                else:
+                    opcode_list.append(("equal", block_i, block_i + size, block_j, block_j + size))
+
+            i = block_i + size
+            j = block_j + size
+
+        return opcode_list
+
+    @staticmethod
+    def _format_range(start, count):
+        """
+        Formats a hunk range as in unified diffs, where empty ranges refer to the preceding line.
+
+        :return: The formatted range.
+        :rtype: str
+        """
+
+        if count == 1:
+            return str(start)
+
+        if count == 0:
+            start -= 1
+
+        return "%d,%d" % (start, count)
+
+    @staticmethod
+    def _intern_lines(line_list, line_id_map):
+        """
+        Maps lines to integer ids, equal lines receiving equal ids.
+
+        :return: Array of the line ids.
+        :rtype: array.array
+        """
+
+        id_array = array.array("l")
+
+        for line in line_list:
+            line_id = line_id_map.get(line)
+
+            if line_id is None:
+                line_id = line_id_map[line] = len(line_id_map)
+
+            id_array.append(line_id)
+
+        return id_array
+
+    @staticmethod
+    def _intern_indexed_lines(indexed_lines, line_hash_map, next_id):
+        """
+        Maps the lines of a memory-mapped file to integer ids by their hash, without keeping the line text.
+
+        The map holds, per line hash, the id and location of each distinct line with that hash, so that hash
+        collisions are resolved by comparing the actual lines.
+
+        :return: Tuple of the array of line ids and the next unused id.
+        :rtype: tuple
+        """
+
+        id_array = array.array("l")
+        line_number = 0
+
+        for line in indexed_lines.line_index.iterate_lines():
+            candidate_list = line_hash_map.setdefault(hash(line), [])
+            line_id = None
+
+            for candidate_id, candidate_lines, candidate_position in candidate_list:
+                if candidate_lines[candidate_position] == line:
+                    line_id = candidate_id
+                    break
+
+            if line_id is None:
+                line_id = next_id
+                next_id += 1
+                candidate_list.append((line_id, indexed_lines, line_number))
+
+            id_array.append(line_id)
+            line_number += 1
+
+        return id_array, next_id
+
+
+class IndexedLines:
+    """
+    Read-only list-like view of the lines of a LineIndex, with positions starting from 0.
+    """
+
+    def __init__(self, line_index):
+        self.line_index = line_index
+
+    def __len__(self):
+        return self.line_index.get_line_count()
+
+    def __getitem__(self, position):
+        return self.line_index.get_line(position + 1)
@@ -0,0 +1,288 @@
+"""
+Utility module to apply a chain of line transformations to a text or file in a single streaming pass.
+"""
+
+from utilbox.string_utils.line_editor import LineEditor
+from utilbox.string_utils.string_utils import StringUtils
+from utilbox.string_utils.text_sanitizer import TextSanitizer
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+
+class TextPipeline:
+    """
+    Utility class chaining line transformations as generators, so that the text is read, transformed and written
+    one line at a time, without intermediate copies.
+
+    Each stage method adds a step and returns the pipeline, and nothing is read until the pipeline is run with
+    'write_to', 'iterate_lines' or 'to_string'. Blank lines at the end of the text are held back only while
+    they may turn out to be trailing, so memory use is bounded by the longest run of consecutive blank lines.
+
+    The stages mirror the string methods they replace:
+     - strip_leading_blanks / strip_trailing_blanks / strip_blank_edges: StringUtils.remove_leading_blanks and
+       StringUtils.remove_trailing_blanks.
+     - sanitize: TextUtils.filter_text, or any TextSanitizer policy.
+     - drop_lines / drop_range / drop_matching: StringUtils.remove_lines_list, remove_lines_range and LineEditor.
+
+    Example:
+        TextPipeline("in.log").strip_blank_edges().sanitize().drop_matching(StringUtils.is_blank).write_to("out.log")
+    """
+
+    def __init__(self, source):
+        """
+        :param source: The full path of the source file, a file object opened for reading, or an iterable of
+                       lines without newline characters.
+        """
+
+        self.source = source
+        self.stage_list = []
+
+    @staticmethod
+    def from_text(text):
+        """
+        Creates a pipeline over an in-memory text, following the semantics of text.split("\\n").
+
+        :param text: The text to be transformed.
+
+        :return: The pipeline.
+        :rtype: TextPipeline
+        """
+
+        return TextPipeline(text.split("\n"))
+
+    def add_stage(self, stage_func):
+        """
+        Adds a custom stage.
+
+        :param stage_func: Function receiving an iterator of lines and returning an iterator of lines.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        self.stage_list.append(stage_func)
+
+        return self
+
+    def strip_leading_blanks(self):
+        """
+        Removes the blank lines at the start of the text.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.add_stage(TextPipeline._strip_leading_blanks)
+
+    def strip_trailing_blanks(self):
+        """
+        Removes the blank lines at the end of the text.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.add_stage(TextPipeline._strip_trailing_blanks)
+
+    def strip_blank_edges(self):
+        """
+        Removes the blank lines at the start and end of the text.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.strip_leading_blanks().strip_trailing_blanks()
+
+    def sanitize(self, text_sanitizer=None):
+        """
+        Removes control characters from every line.
+
+        :param text_sanitizer: The TextSanitizer policy to apply, one removing control characters if not supplied.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        if text_sanitizer is None:
+            text_sanitizer = TextSanitizer()
+
+        sanitize = text_sanitizer.sanitize
+
+        return self.add_stage(lambda line_iter: (sanitize(line) for line in line_iter))
+
+    def map_lines(self, transform_func):
+        """
+        Replaces every line with the result of a function.
+
+        :param transform_func: Function receiving the line text and returning its replacement.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.add_stage(lambda line_iter: (transform_func(line) for line in line_iter))
+
+    def drop_lines(self, line_numbers):
+        """
+        Removes lines by their number at this point in the pipeline.
+
+        :param line_numbers: Iterable of line numbers, starting from 1. Negative numbers are not supported, as
+                             the line count is not known while streaming.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.edit_lines(LineEditor().delete_lines(line_numbers))
+
+    def drop_range(self, start_line_number, end_line_number):
+        """
+        Removes a range of lines by their number at this point in the pipeline.
+
+        :param start_line_number: The first line of the range, starting from 1.
+        :param end_line_number: The last line of the range, included in the removal.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.edit_lines(LineEditor().delete_range(start_line_number, end_line_number))
+
+    def drop_matching(self, predicate):
+        """
+        Removes the lines selected by a predicate.
+
+        :param predicate: Function receiving the line text and returning True to remove it.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+        """
+
+        return self.add_stage(lambda line_iter: (line for line in line_iter if not predicate(line)))
+
+    def edit_lines(self, line_editor):
+        """
+        Applies the deletions and edits of a LineEditor.
+
+        :param line_editor: The LineEditor to apply, without selections relative to the last line.
+
+        :return: The current instance, to allow chaining.
+        :rtype: TextPipeline
+
+        :raises ValueError: Raised if the editor selects lines relative to the last line.
+        """
+
+        if line_editor.has_relative_selections():
+            raise ValueError("Selections relative to the last line are not supported while streaming.")
+
+        return self.add_stage(line_editor.iterate_edited)
+
+    def iterate_lines(self):
+        """
+        Runs the pipeline, yielding the resulting lines one at a time.
+
+        :return: Generator yielding the lines, without newline characters.
+        :rtype: generator
+        """
+
+        source_handle = None
+
+        if isinstance(self.source, basestring):
+            source_handle = open(self.source, "rb")
+            line_iter = LineEditor._strip_line_endings(source_handle)
+        elif hasattr(self.source, "read"):
+            line_iter = LineEditor._strip_line_endings(self.source)
+        else:
+            line_iter = iter(self.source)
+
+        try:
+            for stage_func in self.stage_list:
+                line_iter = stage_func(line_iter)
+
+            for line in line_iter:
+                yield line
+        finally:
+            if source_handle is not None:
+                source_handle.close()
+
+    def write_to(self, destination):
+        """
+        Runs the pipeline, writing every resulting line followed by a newline.
+
+        :param destination: The full path of the destination file, or a file object opened for writing.
+
+        :return: The count of lines written.
+        :rtype: int
+        """
+
+        destination_handle = open(destination, "wb") if isinstance(destination, basestring) else destination
+        written_count = 0
+
+        try:
+            for line in self.iterate_lines():
+                destination_handle.write(line + "\n")
+                written_count += 1
+
+            return written_count
+        finally:
+            if destination_handle is not destination:
+                destination_handle.close()
+
+    def to_string(self):
+        """
+        Runs the pipeline, joining the resulting lines with newlines.
+
+        :return: The transformed text.
+        :rtype: str
+        """
+
+        return "\n".join(self.iterate_lines())
+
+    @staticmethod
+    def _strip_leading_blanks(line_iter):
+        """
+        Skips blank lines until the first non-blank line.
+
+        :param line_iter: Iterator of lines.
+
+        :return: Generator yielding the remaining lines.
+        :rtype: generator
+        """
+
+        line_iter = iter(line_iter)
+
+        for line in line_iter:
+            if not StringUtils.is_blank(line):
+                yield line
+                break
+
+        for line in line_iter:
+            yield line
+
+    @staticmethod
+    def _strip_trailing_blanks(line_iter):
+        """
+        Holds back runs of blank lines until a non-blank line follows them, dropping the run at the end.
+
+        :param line_iter: Iterator of lines.
+
+        :return: Generator yielding the lines, without the trailing blank lines.
+        :rtype: generator
+        """
+
+        blank_line_list = []
+
+        for line in line_iter:
+            if StringUtils.is_blank(line):
+                blank_line_list.append(line)
+                continue
+
+            for blank_line in blank_line_list:
+                yield blank_line
+
+            blank_line_list = []
+
+            yield line
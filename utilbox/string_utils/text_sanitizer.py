@@ -0,0 +1,217 @@
+"""
+Utility module to strip unwanted characters from text, using translation tables precomputed per policy.
+"""
+
+import re
+import codecs
+import string
+import unicodedata
+
+__author__ = "Jenson Jose"
+__email__ = "jensonjose@live.in"
+__status__ = "Alpha"
+
+# C0 and C1 control characters, as removed by TextUtils.filter_text
+CONTROL_CODES = range(0, 32) + range(127, 160)
+
+
+class CategoryFilterTable(dict):
+    """
+    Translation table for unicode.translate which deletes characters of the given Unicode categories.
+
+    The category of each character is looked up the first time the character is seen and cached, so the
+    table only grows to the set of distinct characters actually sanitized.
+    """
+
+    def __init__(self, base_map, category_prefixes):
+        dict.__init__(self, base_map)
+        self.category_prefixes = tuple(category_prefixes)
+
+    def __missing__(self, code_point):
+        if unicodedata.category(unichr(code_point)).startswith(self.category_prefixes):
+            self[code_point] = None
+        else:
+            self[code_point] = code_point
+
+        return self[code_point]
+
+
+class TextSanitizer:
+    """
+    Utility class which removes or replaces unwanted characters according to a fixed policy.
+
+    All translation tables and patterns are computed once when the sanitizer is created, so sanitizing a
+    message is a single str.translate / unicode.translate call, plus one regular expression substitution
+    when whitespace is normalized. Create one sanitizer per policy and reuse it.
+
+    Byte strings are sanitized byte by byte, so category filters only apply to unicode strings.
+
+    Example:
+        sanitizer = TextSanitizer(newline_mode="space", normalize_whitespace=True, strip_categories=["Cf", "Co"])
+        clean_messages = sanitizer.sanitize_batch(messages)
+    """
+
+    def __init__(self, strip_controls=True, newline_mode="keep", newline_replacement="<br>", keep_chars="",
+                 normalize_whitespace=False, strip_categories=None):
+        """
+        :param strip_controls: If True, removes C0 and C1 control characters, except newlines and 'keep_chars'.
+        :param newline_mode: Handling of newlines: 'keep', 'replace' (with 'newline_replacement'), 'space'
+                             or 'strip'.
+        :param newline_replacement: The string substituted for every newline in 'replace' mode.
+        :param keep_chars: Control characters to keep, such as "\\t" or "\\r".
+        :param normalize_whitespace: If True, converts tabs to spaces and collapses runs of spaces into one.
+        :param strip_categories: Unicode category names or prefixes to remove, e.g. ["Cf", "Co", "Z"].
+        """
+
+        if newline_mode not in ("keep", "replace", "space", "strip"):
+            raise ValueError("Unsupported newline mode: " + str(newline_mode))
+
+        self.newline_mode = newline_mode
+        self.newline_replacement = newline_replacement
+        self.normalize_whitespace = normalize_whitespace
+
+        delete_codes = set(CONTROL_CODES) if strip_controls else set()
+        delete_codes.difference_update([ord(char) for char in keep_chars])
+        delete_codes.discard(ord("\n"))
+
+        translate_map = dict([(code, None) for code in delete_codes])
+
+        if normalize_whitespace:
+            translate_map[ord("\t")] = u" "
+
+        if newline_mode == "replace":
+            translate_map[ord("\n")] = unicode(newline_replacement)
+        elif newline_mode == "space":
+            translate_map[ord("\n")] = u" "
+        elif newline_mode == "strip":
+            translate_map[ord("\n")] = None
+
+        # unicode strings: one table holding deletions and replacements
+        if strip_categories:
+            self.unicode_table = CategoryFilterTable(translate_map, strip_categories)
+        else:
+            self.unicode_table = translate_map
+
+        # byte strings: deletions and single-character replacements through str.translate
+        byte_delete_codes = [code for code in delete_codes if code < 256]
+        self.byte_delete_chars = "".join([chr(code) for code in byte_delete_codes])
+        self.byte_table = None
+
+        byte_from = ""
+        byte_to = ""
+
+        if normalize_whitespace:
+            byte_from += "\t"
+            byte_to += " "
+
+        if newline_mode == "space":
+            byte_from += "\n"
+            byte_to += " "
+        elif newline_mode == "strip":
+            self.byte_delete_chars += "\n"
+
+        if byte_from:
+            self.byte_table = string.maketrans(byte_from, byte_to)
+
+        self.whitespace_pattern = re.compile(" {2,}") if normalize_whitespace else None
+
+    def sanitize(self, text):
+        """
+        Sanitizes a single string.
+
+        :param text: The text to be sanitized, either a byte string or a unicode string.
+
+        :return: The sanitized text, of the same type as the input.
+        :rtype: str
+        """
+
+        if isinstance(text, unicode):
+            text = text.translate(self.unicode_table)
+        else:
+            if self.newline_mode == "replace" and "\n" in text:
+                text = text.replace("\n", self.newline_replacement)
+
+            text = text.translate(self.byte_table, self.byte_delete_chars)
+
+        if self.whitespace_pattern is not None:
+            text = self.whitespace_pattern.sub(" ", text)
+
+        return text
+
+    def sanitize_batch(self, text_list):
+        """
+        Sanitizes a list of strings.
+
+        :param text_list: The list of texts to be sanitized.
+
+        :return: List of the sanitized texts, in the same order.
+        :rtype: list
+        """
+
+        sanitize = self.sanitize
+
+        return [sanitize(text) for text in text_list]
+
+    def sanitize_stream(self, source, destination, chunk_size=1048576, encoding=None):
+        """
+        Sanitizes a large input in fixed-size chunks, writing the result as it is produced.
+
+        Runs of spaces spanning two chunks are collapsed correctly, as trailing spaces are carried over to the
+        next chunk. If an encoding is supplied, the input is decoded incrementally, so that multi-byte
+        characters split between chunks are handled and category filters apply, and the output is encoded
+        with the same encoding.
+
+        :param source: The full path of the source file, or a file object opened for reading.
+        :param destination: The full path of the destination file, or a file object opened for writing.
+        :param chunk_size: The number of bytes read per chunk.
+        :param encoding: The text encoding of the input, None to sanitize raw bytes.
+
+        :return: The count of characters written.
+        :rtype: int
+        """
+
+        source_handle = open(source, "rb") if isinstance(source, basestring) else source
+        destination_handle = open(destination, "wb") if isinstance(destination, basestring) else destination
+        decoder = codecs.getincrementaldecoder(encoding)() if encoding else None
+        written_count = 0
+        carry_over = ""
+
+        try:
+            while True:
+                raw_chunk = source_handle.read(chunk_size)
+                # the end of the input is detected on the raw read, as a chunk ending within a multi-byte character
+                # may decode to nothing
+                is_final = not raw_chunk
+                chunk = decoder.decode(raw_chunk, final=is_final) if decoder is not None else raw_chunk
+
+                if not chunk and not is_final:
+                    continue
+
+                if not chunk and not carry_over:
+                    break
+
+                text = self.sanitize(carry_over + chunk) if chunk else carry_over
+                carry_over = text[0:0]
+
+                if not is_final and self.whitespace_pattern is not None:
+                    stripped_text = text.rstrip(" ")
+                    carry_over = text[len(stripped_text):]
+                    text = stripped_text
+
+                if encoding:
+                    destination_handle.write(text.encode(encoding))
+                else:
+                    destination_handle.write(text)
+
+                written_count += len(text)
+
+                if is_final:
+                    break
+
+            return written_count
+        finally:
+            if source_handle is not source:
+                source_handle.close()
+
+            if destination_handle is not destination:
+                destination_handle.close()
@@ -2,14 +2,17 @@
 Utility module to manipulate multi-line text.
 """
 
-import re
 import pprint
 
+from utilbox.string_utils.text_sanitizer import TextSanitizer
 
 __author__ = "Jenson Jose"
 __email__ = "jensonjose@live.in"
 __status__ = "Alpha"
 
+# policy of filter_text, with its translation tables computed once at import
+FILTER_TEXT_SANITIZER = TextSanitizer(newline_mode="replace", newline_replacement="<br>")
+
 
 class TextUtils:
     """
@@ -39,25 +42,16 @@ class TextUtils:
 
         Based on the Unicode database categorization: http://www.sql-und-xml.de/unicode-database/#kategorien
 
+        For other policies, or for lists of messages and large files, use TextSanitizer directly.
+
         :param text: The text to be filtered.
 
         :return: The filtered text.
         :rtype: str
         """
 
-        # replacing \n with $s$
-        text = text.replace('\n', '<br>')
-
-        # method to remove all control characters from received text:
-        # all_chars = (unichr(i) for i in xrange(0x110000))
-        # control_chars = ''.join(c for c in all_chars if unicodedata.category(c) == 'Cc' and c != '\n' and c != '\r')
-
-        # more efficient method to remove all control characters from received text:
-        control_chars = ''.join(map(unichr, range(0, 32) + range(127, 160)))
-
-        control_char_re = re.compile('[%s]' % re.escape(control_chars))
-
-        return str(control_char_re.sub('', text))
+        # newlines are replaced with <br>, C0 and C1 control characters are removed
+        return str(FILTER_TEXT_SANITIZER.sanitize(text))
 
     @staticmethod
     def get_pretty_text(text):